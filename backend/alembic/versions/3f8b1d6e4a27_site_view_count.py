@@ -0,0 +1,42 @@
+"""site view count"""
+
+# Revision ID: 3f8b1d6e4a27
+# Revises: 7c3e5a91b2d4
+# Create Date: 2026-10-19 14:00:00.000000
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "3f8b1d6e4a27"
+down_revision = "7c3e5a91b2d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sites",
+        sa.Column(
+            "view_count",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+            comment="累计浏览量（随浏览事件累加）",
+        ),
+    )
+
+    # 回填：按已有浏览事件统计
+    op.execute(
+        """
+        UPDATE sites SET view_count = counts.total
+        FROM (
+            SELECT site_id, COUNT(*) AS total FROM document_view_events GROUP BY site_id
+        ) AS counts
+        WHERE sites.id = counts.site_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sites", "view_count")
@@ -0,0 +1,28 @@
+"""chat turn idempotency"""
+
+# Revision ID: 5a2d9c4e7f13
+# Revises: 3f8b1d6e4a27
+# Create Date: 2026-10-19 16:00:00.000000
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "5a2d9c4e7f13"
+down_revision = "3f8b1d6e4a27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_messages", sa.Column("turn_id", sa.String(length=64), nullable=True))
+    op.add_column("chat_messages", sa.Column("turn_seq", sa.Integer(), nullable=True))
+    op.create_unique_constraint("uq_chat_messages_turn", "chat_messages", ["turn_id", "turn_seq"])
+    op.add_column("chat_sessions", sa.Column("last_turn_id", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_sessions", "last_turn_id")
+    op.drop_constraint("uq_chat_messages_turn", "chat_messages", type_="unique")
+    op.drop_column("chat_messages", "turn_seq")
+    op.drop_column("chat_messages", "turn_id")
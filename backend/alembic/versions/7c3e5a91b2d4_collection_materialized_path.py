@@ -0,0 +1,52 @@
+"""collection materialized path"""
+
+# Revision ID: 7c3e5a91b2d4
+# Revises: d161a6891c2d
+# Create Date: 2026-10-19 10:00:00.000000
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "7c3e5a91b2d4"
+down_revision = "d161a6891c2d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 先以可空列加入，回填完成后再加 NOT NULL：遗漏的行会在此失败，而不是留下空路径
+    op.add_column(
+        "collection",
+        sa.Column("path", sa.String(length=1000), nullable=True, comment="物化路径"),
+    )
+
+    # 回填：父合集不存在的孤儿节点按根节点处理
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, '/' || id || '/' AS path FROM collection
+            WHERE parent_id IS NULL OR parent_id NOT IN (SELECT id FROM collection)
+            UNION ALL
+            SELECT c.id, t.path || c.id || '/' FROM collection c
+            INNER JOIN tree t ON c.parent_id = t.id
+        )
+        UPDATE collection SET path = tree.path FROM tree WHERE collection.id = tree.id
+        """
+    )
+    # parent_id 成环的节点从根出发不可达，与孤儿节点一样按根节点处理
+    op.execute("UPDATE collection SET path = '/' || id || '/' WHERE path IS NULL")
+    op.alter_column("collection", "path", nullable=False, server_default="")
+
+    op.create_index(
+        "ix_collection_path",
+        "collection",
+        ["path"],
+        unique=False,
+        postgresql_ops={"path": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_collection_path", table_name="collection")
+    op.drop_column("collection", "path")
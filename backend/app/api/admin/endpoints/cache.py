@@ -19,6 +19,7 @@
 import logging
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 
 from app.core.common.i18n import _
 from app.core.infra.cache import get_cache
@@ -41,6 +42,20 @@ async def get_cache_stats(
     return ApiResponse.ok(data=stats, msg=_("cache.stats_success"))
 
 
+@router.get(
+    ":metrics",
+    response_class=PlainTextResponse,
+    operation_id="getAdminCacheMetrics",
+)
+async def get_cache_metrics(
+    current_user: User = Depends(get_current_user_with_tenant),
+) -> PlainTextResponse:
+    """获取分命名空间缓存指标（Prometheus 文本格式）"""
+    return PlainTextResponse(
+        get_cache().prometheus_metrics(), media_type="text/plain; version=0.0.4"
+    )
+
+
 @router.post(":clear", response_model=ApiResponse[dict], operation_id="clearAdminCache")
 async def clear_cache(
     current_user: User = Depends(get_current_user_with_tenant),
@@ -16,6 +16,8 @@ import logging
 
 from fastapi import APIRouter, Depends
 
+from app.core.web.deps import get_current_user_with_tenant
+from app.models.user import User
 from app.schemas.response import ApiResponse, HealthResponse
 from app.services.health_service import HealthService, get_health_service
 
@@ -43,3 +45,18 @@ async def health_check(
     """
     health_status = await service.get_health_status()
     return ApiResponse.ok(data=health_status)
+
+
+@router.get(
+    ":pools",
+    response_model=ApiResponse[dict],
+    summary="数据库连接池统计",
+    operation_id="getAdminDatabasePools",
+)
+async def get_database_pools(
+    current_user: User = Depends(get_current_user_with_tenant),
+) -> ApiResponse[dict]:
+    """各数据库连接池的容量、占用、溢出、排队与取连接等待时间（用于容量规划）"""
+    from app.db.pools import pool_stats
+
+    return ApiResponse.ok(data=pool_stats())
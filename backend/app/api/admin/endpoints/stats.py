@@ -44,3 +44,30 @@ async def get_site_stats(
     stats = await service.get_site_stats(site_id=site_id)
 
     return ApiResponse.ok(data=SiteStats(**stats), msg=_("api.success.get"))
+
+
+@router.get(
+    ":chatRuntime", response_model=ApiResponse[dict], operation_id="getAdminChatRuntimeStats"
+)
+async def get_chat_runtime_stats(
+    current_user: User = Depends(get_current_user_with_tenant),
+) -> ApiResponse[dict]:
+    """获取聊天运行时统计（进程级）
+
+    返回:
+        - single_flight: 合并生成统计（进行中数量、领跑生成次数、节省的 LLM 调用次数）
+        - admission: 准入控制统计（并发数、队列深度、等待耗时、拒绝次数）
+        - persistence: 对话异步落库统计（队列深度、已写入、转投 Redis、失败次数）
+    """
+    from app.services.chat.admission import chat_admission
+    from app.services.chat.single_flight import chat_single_flight
+    from app.services.chat.turn_writer import chat_turn_writer
+
+    return ApiResponse.ok(
+        data={
+            "single_flight": chat_single_flight.stats(),
+            "admission": chat_admission.stats(),
+            "persistence": chat_turn_writer.stats(),
+        },
+        msg=_("api.success.get"),
+    )
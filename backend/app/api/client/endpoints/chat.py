@@ -14,7 +14,7 @@
 
 import logging
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 
 from app.schemas.chat import ResponsesAPIRequest, ResponsesAPIResponse
@@ -27,10 +27,9 @@ logger = logging.getLogger(__name__)
 @router.post("/responses", response_model=ResponsesAPIResponse, operation_id="createResponse")
 async def create_response(
     request: ResponsesAPIRequest,
-    background_tasks: BackgroundTasks,
     service: ChatService = Depends(get_chat_service),
 ) -> ResponsesAPIResponse | StreamingResponse:
     """
     创建 AI 响应（标准 OpenAI Responses API，含 CatWiki 扩展字段 filter）
     """
-    return await service.process_responses_request(request, background_tasks)
+    return await service.process_responses_request(request)
@@ -111,7 +111,7 @@ async def _build_response(site, db: AsyncSession) -> ApiResponse[ClientSite]:
         "description": site.description,
         "icon": site.icon,
         "article_count": site.article_count,
-        "view_count": getattr(site, "view_count", 0),
+        "view_count": site.view_count or 0,
         "tenant_id": site.tenant_id,
         "tenant_slug": _safe_tenant_slug(site),
         "theme_color": site.theme_color,
@@ -26,6 +26,7 @@ from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from psycopg_pool import AsyncConnectionPool
 
 from app.core.infra.config import settings
+from app.db.pools import plan_pools, register_psycopg_pool, unregister_pool
 
 logger = logging.getLogger(__name__)
 
@@ -52,13 +53,15 @@ async def init_checkpointer_pool() -> AsyncConnectionPool:
 
     logger.info("🔗 [Checkpointer] Initializing PostgreSQL connection pool...")
 
+    size = plan_pools()["checkpointer"]
     _pool = AsyncConnectionPool(
         conninfo=db_url,
-        min_size=2,
-        max_size=10,
+        min_size=size.pool_size,
+        max_size=size.capacity,
         open=False,  # 延迟打开
     )
     await _pool.open()
+    register_psycopg_pool("checkpointer", _pool)
 
     logger.info("✅ [Checkpointer] Connection pool initialized")
     return _pool
@@ -71,6 +74,7 @@ async def close_checkpointer_pool() -> None:
     if _pool is not None:
         await _pool.close()
         _pool = None
+        unregister_pool("checkpointer")
         logger.info("🔌 [Checkpointer] Connection pool closed")
 
 
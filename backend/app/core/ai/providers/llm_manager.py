@@ -52,8 +52,10 @@ class LLMManager:
     ) -> ChatOpenAI:
         """根据租户获取模型实例 (带缓存)"""
 
-        # 1. 获取配置 (使用 Core 层的 Resolver 避免层级绕过)
-        config = await ConfigResolver.resolve_section("chat", tenant_id=tenant_id)
+        # 1. 获取配置 (走配置缓存，AI 配置更新后由 configuration_service.clear_cache 失效)
+        from app.services.config.configuration_service import configuration_service
+
+        config = await configuration_service.get_chat_config(tenant_id=tenant_id, force=force)
 
         # 严格校验：如果处于 custom 模式，必须提供有效的配置，不回退到系统环境变量
         ConfigResolver.validate_config("chat", config)
@@ -31,31 +31,9 @@ async def build_collection_map(
         collection_ids: 合集ID列表
 
     Returns:
-        collection_id -> collection_info 的映射字典
+        collection_id -> collection_info 的映射字典（一次查询，与合集数量无关）
     """
-    if not collection_ids:
-        return {}
-
-    from sqlalchemy import select
-
-    # 批量查询所有collection
-    result = await db.execute(
-        select(crud_collection.model).where(crud_collection.model.id.in_(collection_ids))
-    )
-    collections = list(result.scalars())
-
-    # 构建collection映射，包含祖先和路径信息
-    collections_map = {}
-    for coll in collections:
-        collections_map[coll.id] = {
-            "id": coll.id,
-            "title": coll.title,
-            "parent_id": coll.parent_id,
-            "ancestors": await crud_collection.get_ancestors(db, collection_id=coll.id),
-            "path": await crud_collection.get_path(db, collection_id=coll.id),
-        }
-
-    return collections_map
+    return await crud_collection.get_hierarchy_map(db, collection_ids=collection_ids)
 
 
 async def enrich_document_dict(
@@ -134,19 +112,8 @@ async def enrich_document_dict(
             doc_dict["collection"] = collection_map[collection_id]
         else:
             # 回退到单独查询
-            collection = await crud_collection.get(db, id=collection_id)
-            if collection:
-                doc_dict["collection"] = {
-                    "id": collection.id,
-                    "title": collection.title,
-                    "parent_id": collection.parent_id,
-                    "ancestors": await crud_collection.get_ancestors(
-                        db, collection_id=collection_id
-                    ),
-                    "path": await crud_collection.get_path(db, collection_id=collection_id),
-                }
-            else:
-                doc_dict["collection"] = None
+            hierarchy = await build_collection_map(db, crud_collection, [collection_id])
+            doc_dict["collection"] = hierarchy.get(collection_id)
     else:
         doc_dict["collection"] = None
 
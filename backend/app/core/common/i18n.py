@@ -34,6 +34,7 @@ MESSAGES: dict[str, dict[str, str]] = {
         "error.conflict": "资源冲突",
         "error.database": "数据库错误",
         "error.service_unavailable": "服务不可用",
+        "error.too_many_requests": "请求过于频繁，请稍后重试",
         "error.validation": "参数校验失败",
         "error.internal": "服务器内部错误",
         # ========== 通用 API 响应 ==========
@@ -152,6 +153,7 @@ MESSAGES: dict[str, dict[str, str]] = {
         "bot.qa_not_enabled": "该站点的问答机器人功能尚未在后台启用",
         # ========== 会话相关 ==========
         "session.not_found": "会话不存在",
+        "chat.overloaded": "当前对话请求较多，请 {retry_after} 秒后重试",
     },
     "en": {
         # ========== Exception defaults ==========
@@ -163,6 +165,7 @@ MESSAGES: dict[str, dict[str, str]] = {
         "error.conflict": "Resource conflict",
         "error.database": "Database error",
         "error.service_unavailable": "Service unavailable",
+        "error.too_many_requests": "Too many requests, please retry later",
         "error.validation": "Validation failed",
         "error.internal": "Internal server error",
         # ========== Common API responses ==========
@@ -281,6 +284,7 @@ MESSAGES: dict[str, dict[str, str]] = {
         "bot.qa_not_enabled": "The Q&A bot feature for this site has not been enabled in the admin panel",
         # ========== Sessions ==========
         "session.not_found": "Session not found",
+        "chat.overloaded": "The assistant is busy, please retry in {retry_after} seconds",
     },
 }
 
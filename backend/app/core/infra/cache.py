@@ -19,23 +19,29 @@
 1. 内存缓存 (InMemoryCache): 适用于单实例、小规模数据，零配置。
 2. Redis 缓存 (RedisCache): 适用于分布式环境、大规模数据及持久化需求。
 
+3. 两级缓存 (TieredCache): 进程内 LRU (L1) + Redis (L2)，通过 Redis pub/sub 广播失效消息保持多实例一致。
+
 提供了统一的抽象接口 BaseCache，支持 CRUD 数据缓存、API 响应缓存以及业务逻辑缓存。
 """
 
 import asyncio
+import copy
 import functools
 import hashlib
+import inspect
 import json
 import logging
-import pickle
 import time
+import uuid
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from typing import Any, TypeVar
 
 import redis.asyncio as redis
 
+from app.core.infra import cache_serializer
+from app.core.infra.cache_metrics import CacheMetrics, estimate_size, to_prometheus
 from app.core.infra.config import settings
 
 logger = logging.getLogger(__name__)
@@ -45,37 +51,225 @@ T = TypeVar("T")
 # 内部哨兵对象，用于准确区分“缓存缺失”与“缓存值为 None”
 _UNDEFINED = object()
 
+# stale-while-revalidate 条目标记：缓存值为 (_SWR_MARK, 软过期时间戳, 值)
+_SWR_MARK = "__swr_v1__"
+# cached 装饰器标记业务函数抛出的异常，用于与缓存后端异常区分
+_FUNC_ERROR_MARK = "_cached_func_error"
+
 
 class BaseCache(ABC):
     """缓存后端抽象基类"""
 
+    backend_name = "base"
+
+    def __init__(self):
+        # 进程内正在加载的 key -> Future，用于 get_or_set 合并并发回源
+        self._inflight: dict[str, asyncio.Future] = {}
+        # 分命名空间指标（命中/未命中/回源耗时/值大小/淘汰）
+        self.metrics = CacheMetrics()
+        # stale-while-revalidate 后台刷新任务，每个 key 同时最多一个
+        self._refreshing: dict[str, asyncio.Task] = {}
+
     @abstractmethod
     async def get(self, key: str, default: Any = None) -> Any | None:
         """获取缓存值"""
         pass
 
     @abstractmethod
-    async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
-        """设置缓存值"""
+    async def set(
+        self, key: str, value: Any, ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        """设置缓存值，tags 用于按标签批量失效（如 site:42、tenant:7）"""
         pass
 
-    async def get_or_set(self, key: str, func: Callable[..., Any], ttl: int | None = None) -> Any:
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """批量获取缓存值，仅返回命中的键"""
+        found = {}
+        for key in keys:
+            val = await self.get(key, default=_UNDEFINED)
+            if val is not _UNDEFINED:
+                found[key] = val
+        return found
+
+    async def set_many(
+        self, mapping: dict[str, Any], ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        """批量设置缓存值（共用 ttl 与 tags）"""
+        for key, value in mapping.items():
+            await self.set(key, value, ttl=ttl, tags=tags)
+
+    async def warm_many(
+        self,
+        mapping: dict[str, Any],
+        ttl: int | None = None,
+        tags: Iterable[str] | None = None,
+        shared: bool = True,
+    ) -> None:
+        """预热写入：值取自数据库当前状态，不是数据变更，不广播失效
+
+        shared=False 时只写本进程内的缓存层，共享层 (Redis) 由其他实例负责预热。
+        """
+        await self.set_many(mapping, ttl=ttl, tags=tags)
+
+    async def get_or_set(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        ttl: int | None = None,
+        cache_none: bool = True,
+        tags: Iterable[str] | Callable[[Any], Iterable[str]] | None = None,
+    ) -> Any:
         """
         [封装逻辑] 先获取缓存，若缺失则执行函数并写入缓存。
+
+        同一 key 并发缺失时只有一个协程执行 func（single-flight），其余协程等待其结果，
+        避免热点 key 过期瞬间大量请求同时回源（缓存击穿）。func 抛出的异常会传递给所有等待者。
+        标签取决于加载结果时（如文档所属站点），tags 可传入以结果为参数的函数。
         """
         val = await self.get(key, default=_UNDEFINED)
         if val is not _UNDEFINED:
             return val
 
-        # 执行业务逻辑
-        if asyncio.iscoroutinefunction(func):
-            result = await func()
+        # 1. 已有协程在加载该 key：等待其结果
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 加载方被取消时重新竞争加载权；自身被取消则照常抛出
+                if not inflight.cancelled():
+                    raise
+                await asyncio.sleep(0)
+
+        # 2. 成为加载方
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._fill(key, func, ttl, cache_none, tags)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # 标记异常已被读取，避免无等待者时输出 "exception was never retrieved"
+            future.exception()
+            raise
         else:
-            result = func()
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _fill(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        ttl: int | None,
+        cache_none: bool,
+        tags: Iterable[str] | None = None,
+    ) -> Any:
+        """缺失时回源，子类可覆盖以加入跨进程协调"""
+        return await self._load(key, func, ttl, cache_none, tags)
+
+    async def _load(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        ttl: int | None,
+        cache_none: bool,
+        tags: Iterable[str] | Callable[[Any], Iterable[str]] | None = None,
+    ) -> Any:
+        """执行加载函数并回写缓存
+
+        回源强制读主库：写入提交后立即失效缓存，若下一次回源读到延迟的副本，
+        写入前的旧数据会被重新缓存整个 TTL。
+        """
+        from app.db.routing import primary_reads
 
-        await self.set(key, result, ttl=ttl)
+        start = time.perf_counter()
+        try:
+            with primary_reads():
+                result = func()
+                if inspect.isawaitable(result):
+                    result = await result
+        except BaseException:
+            self.metrics.record_load(key, time.perf_counter() - start, failed=True)
+            raise
+        self.metrics.record_load(key, time.perf_counter() - start)
+
+        if result is not None or cache_none:
+            if callable(tags):
+                tags = tags(result)
+            await self.set(key, result, ttl=ttl, tags=tags)
         return result
 
+    async def get_or_revalidate(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        ttl: int,
+        stale_ttl: int,
+        cache_none: bool = True,
+        tags: Iterable[str] | None = None,
+        refresh: Callable[..., Any] | None = None,
+    ) -> Any:
+        """
+        stale-while-revalidate 版 get_or_set。
+
+        条目在 ttl (软过期) 内视为新鲜；软过期后、ttl + stale_ttl (硬过期) 前直接返回旧值，
+        并在后台触发一次刷新（同一 key 同时只有一个刷新任务）；硬过期后与 get_or_set 相同，
+        由一个调用方同步回源。refresh 为后台刷新使用的加载函数，默认与 func 相同。
+        """
+        entry = await self.get(key, default=_UNDEFINED)
+        if type(entry) is tuple and len(entry) == 3 and entry[0] == _SWR_MARK:
+            _, fresh_until, value = entry
+            if time.time() >= fresh_until:
+                self.metrics.record_stale(key)
+                self._schedule_refresh(key, refresh or func, ttl, stale_ttl, cache_none, tags)
+            return value
+
+        load = self._swr_loader(func, ttl, cache_none)
+        entry = await self.get_or_set(key, load, ttl=ttl + stale_ttl, cache_none=False, tags=tags)
+        return entry[2] if entry is not None else None
+
+    @staticmethod
+    def _swr_loader(func: Callable[..., Any], ttl: int, cache_none: bool) -> Callable[..., Any]:
+        """包装加载函数，返回带软过期时间的条目；不缓存的 None 结果原样返回 None"""
+
+        async def load():
+            value = func()
+            if inspect.isawaitable(value):
+                value = await value
+            if value is None and not cache_none:
+                return None
+            return (_SWR_MARK, time.time() + ttl, value)
+
+        return load
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        ttl: int,
+        stale_ttl: int,
+        cache_none: bool,
+        tags: Iterable[str] | None,
+    ) -> None:
+        if key in self._refreshing or key in self._inflight:
+            return
+
+        async def refresh():
+            load = self._swr_loader(func, ttl, cache_none)
+            try:
+                await self._load(key, load, ttl + stale_ttl, cache_none=False, tags=tags)
+            except Exception as e:
+                # 刷新失败保留旧值，直到硬过期
+                logger.warning(f"Cache background refresh failed [{key}]: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
     @abstractmethod
     async def delete(self, key: str) -> None:
         """删除缓存值"""
@@ -86,6 +280,11 @@ class BaseCache(ABC):
         """根据前缀批量删除缓存"""
         pass
 
+    @abstractmethod
+    async def invalidate_tags(self, *tags: str) -> int:
+        """删除带有任一标签的全部缓存，返回删除的键数量"""
+        pass
+
     @abstractmethod
     async def clear(self) -> None:
         """清空缓存库"""
@@ -96,6 +295,18 @@ class BaseCache(ABC):
         """获取统计信息"""
         pass
 
+    def metric_sources(self) -> dict[str, CacheMetrics]:
+        """参与导出的指标集合：backend 标签 -> 指标"""
+        return {self.backend_name: self.metrics}
+
+    def prometheus_metrics(self) -> str:
+        """以 Prometheus 文本格式导出分命名空间指标"""
+        return to_prometheus(self.metric_sources())
+
+    async def start(self) -> None:
+        """启动后台任务（如失效订阅），由应用生命周期在启动时调用；默认无需启动"""
+        return None
+
     @abstractmethod
     async def close(self) -> None:
         """关闭缓存连接，释放资源"""
@@ -111,65 +322,168 @@ class InMemoryCache(BaseCache):
     """
     基于 OrderedDict 实现的进程内 LRU 内存缓存。
     特点：极速、无外部依赖，但不支持多进程/多容器共享。
+
+    容量同时受条目数 (max_size) 与可选的字节预算 (max_bytes) 约束：每个值写入时估算占用，
+    超出预算时按 LRU 顺序淘汰，单个超过预算的值不缓存。
+    未设置字节预算时不逐个估算（递归估算开销不小），仅每 SIZE_SAMPLE_EVERY 次写入采样一次用于指标。
     """
 
-    def __init__(self, max_size: int = 1000, default_ttl: int = 300):
+    backend_name = "memory"
+    SIZE_SAMPLE_EVERY = 16
+
+    def __init__(self, max_size: int = 1000, default_ttl: int = 300, max_bytes: int | None = None):
+        super().__init__()
         self._data: OrderedDict[str, tuple[Any, float]] = OrderedDict()
         self.max_size = max_size
+        self.max_bytes = max_bytes or None
         self.default_ttl = default_ttl
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        self._evictions = 0
         self._hits = 0
         self._misses = 0
         self._locks: dict[str, asyncio.Lock] = {}
         self._cleanup_counter = 0  # 写操作计数器，用于触发主动清理
-
-    def _maybe_cleanup_expired(self) -> None:
-        """每 100 次写操作主动清理过期条目，避免内存泄漏"""
-        self._cleanup_counter += 1
-        if self._cleanup_counter < 100:
-            return
+        self._set_counter = 0  # 写入计数器，用于大小采样
+        # 标签索引：tag -> keys，以及反向索引 key -> tags（条目移除时同步清理）
+        self._tag_keys: dict[str, set[str]] = {}
+        self._key_tags: dict[str, tuple[str, ...]] = {}
+
+    def _remove(self, key: str) -> bool:
+        """移除条目并解除其标签关联"""
+        if self._data.pop(key, None) is None:
+            return False
+        self._bytes -= self._sizes.pop(key, 0)
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+        return True
+
+    def _purge_expired(self) -> None:
+        """移除全部过期条目（连同其字节占用与标签索引）"""
         self._cleanup_counter = 0
         now = time.time()
         expired = [k for k, (_, exp) in self._data.items() if now >= exp]
         for k in expired:
-            del self._data[k]
+            self._remove(k)
+            self.metrics.record_eviction(k, expired=True)
+
+    def _maybe_cleanup_expired(self) -> None:
+        """每 100 次写操作主动清理过期条目，避免内存泄漏"""
+        self._cleanup_counter += 1
+        if self._cleanup_counter >= 100:
+            self._purge_expired()
+
+    def _over_capacity(self, size: int) -> bool:
+        return len(self._data) >= self.max_size or (
+            self.max_bytes is not None and self._bytes + size > self.max_bytes
+        )
 
     async def get(self, key: str, default: Any = None) -> Any | None:
+        return self._get(key, default)
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        # 同步完成全部读取，期间不让出事件循环，相当于单个临界区
+        found = {}
+        for key in keys:
+            val = self._get(key, _UNDEFINED)
+            if val is not _UNDEFINED:
+                found[key] = val
+        return found
+
+    def _get(self, key: str, default: Any) -> Any:
         if key in self._data:
             value, expire_time = self._data[key]
             if time.time() < expire_time:
                 self._data.move_to_end(key)
                 self._hits += 1
+                self.metrics.record_get(key, hit=True)
                 return value
             else:
-                del self._data[key]
+                self._remove(key)
+                self.metrics.record_eviction(key, expired=True)
                 logger.debug(f"Memory cache expired: {key}")
 
         self._misses += 1
+        self.metrics.record_get(key, hit=False)
         return default
 
-    async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+    async def set(
+        self, key: str, value: Any, ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        self._set(key, value, ttl, tags)
+        self._maybe_cleanup_expired()
+
+    async def set_many(
+        self, mapping: dict[str, Any], ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        tags = tuple(tags) if tags else None
+        for key, value in mapping.items():
+            self._set(key, value, ttl, tags)
+        self._maybe_cleanup_expired()
+
+    def _set(self, key: str, value: Any, ttl: int | None, tags: Iterable[str] | None) -> None:
         ttl = ttl if ttl is not None else self.default_ttl
         expire_time = time.time() + ttl
 
-        if key in self._data:
-            del self._data[key]
-        elif len(self._data) >= self.max_size:
-            self._data.popitem(last=False)
+        size = 0
+        if self.max_bytes is not None:
+            size = estimate_size(value)
+            self.metrics.record_set(key, size)
+        else:
+            sampled = self._set_counter % self.SIZE_SAMPLE_EVERY == 0
+            self._set_counter += 1
+            self.metrics.record_set(key, estimate_size(value) if sampled else None)
+        self._remove(key)
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Memory cache value too large, not cached: {key} ({size} bytes)")
+            return
+
+        # 先清掉已过期条目，仍不够再按 LRU 顺序淘汰，直到条目数与字节预算都能容纳新值
+        if self._over_capacity(size):
+            self._purge_expired()
+        while self._data and self._over_capacity(size):
+            evicted = next(iter(self._data))
+            self._remove(evicted)
+            self._evictions += 1
+            self.metrics.record_eviction(evicted)
 
         self._data[key] = (value, expire_time)
-        self._maybe_cleanup_expired()
+        self._sizes[key] = size
+        self._bytes += size
+        if tags:
+            tags = tuple(dict.fromkeys(tags))
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
 
     async def delete(self, key: str) -> None:
-        self._data.pop(key, None)
+        self._remove(key)
 
     async def delete_by_prefix(self, prefix: str) -> None:
         to_delete = [k for k in self._data.keys() if k.startswith(prefix)]
         for k in to_delete:
-            self._data.pop(k, None)
+            self._remove(k)
         logger.debug(f"Memory cache keys with prefix '{prefix}' deleted.")
 
+    async def invalidate_tags(self, *tags: str) -> int:
+        count = 0
+        for tag in tags:
+            for key in list(self._tag_keys.get(tag, ())):
+                count += self._remove(key)
+        logger.debug(f"Memory cache tags {tags} invalidated: {count} keys.")
+        return count
+
     async def clear(self) -> None:
         self._data.clear()
+        self._sizes.clear()
+        self._bytes = 0
+        self._tag_keys.clear()
+        self._key_tags.clear()
         self._locks.clear()
         logger.info("Memory cache totally cleared.")
 
@@ -179,9 +493,13 @@ class InMemoryCache(BaseCache):
             "backend": "memory",
             "size": len(self._data),
             "max_size": self.max_size,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions,
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate": f"{(self._hits / total * 100):.2f}%" if total > 0 else "0%",
+            "namespaces": self.metrics.snapshot(),
         }
 
     async def close(self) -> None:
@@ -196,33 +514,166 @@ class InMemoryCache(BaseCache):
 class RedisCache(BaseCache):
     """
     基于 Redis 实现的分布式缓存。
-    特点：多实例共享、持久化。默认使用 pickle 进行全序列化存储。
+    特点：多实例共享、持久化。值默认以 msgpack 紧凑编码，不支持的类型回退 pickle（见 cache_serializer）。
     """
 
-    def __init__(self, redis_url: str, prefix: str = "catwiki:", default_ttl: int = 300):
+    # 跨进程回源锁：持锁上限、等待者最长等待时间与轮询间隔（秒）
+    fill_lock_timeout = 10
+    fill_wait_timeout = 5.0
+    fill_poll_interval = 0.05
+
+    backend_name = "redis"
+
+    def __init__(
+        self,
+        redis_url: str,
+        prefix: str = "catwiki:",
+        default_ttl: int = 300,
+        serializer: str = "msgpack",
+    ):
+        super().__init__()
         self.client = redis.from_url(redis_url, decode_responses=False)
         self.prefix = prefix
         self.default_ttl = default_ttl
+        self.serializer = serializer
 
     def _get_full_key(self, key: str) -> str:
         return f"{self.prefix}{key}"
 
+    def _get_tag_key(self, tag: str) -> str:
+        # 标签索引为 ZSET（旧版 Set 索引使用 tag: 前缀，随 TTL 自然过期，不与新结构冲突）
+        return f"{self.prefix}tagz:{tag}"
+
     async def get(self, key: str, default: Any = None) -> Any | None:
         full_key = self._get_full_key(key)
         try:
             data = await self.client.get(full_key)
-            return pickle.loads(data) if data is not None else default
+            value = cache_serializer.loads(data) if data is not None else default
         except Exception as e:
             logger.error(f"Redis get failed [{key}]: {e}")
+            self.metrics.record_get(key, hit=False)
             return default
+        self.metrics.record_get(key, hit=data is not None)
+        return value
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """MGET 一次往返读取多个键"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = await self.client.mget([self._get_full_key(k) for k in keys])
+        except Exception as e:
+            logger.error(f"Redis get_many failed [{len(keys)} keys]: {e}")
+            values = [None] * len(keys)
 
-    async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
-        full_key = self._get_full_key(key)
+        found = {}
+        for key, data in zip(keys, values, strict=True):
+            if data is not None:
+                try:
+                    found[key] = cache_serializer.loads(data)
+                except Exception as e:
+                    logger.error(f"Redis get_many decode failed [{key}]: {e}")
+            self.metrics.record_get(key, hit=key in found)
+        return found
+
+    async def set(
+        self, key: str, value: Any, ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        await self.set_many({key: value}, ttl=ttl, tags=tags)
+
+    async def set_many(
+        self, mapping: dict[str, Any], ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        """单个 pipeline 写入多个键（及其标签）"""
+        if not mapping:
+            return
         ttl = ttl if ttl is not None else self.default_ttl
+        tags = tuple(tags) if tags else ()
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                full_keys = []
+                for key, value in mapping.items():
+                    payload = cache_serializer.dumps(value, self.serializer)
+                    self.metrics.record_set(key, len(payload))
+                    full_keys.append(self._get_full_key(key))
+                    pipe.set(full_keys[-1], payload, ex=ttl)
+
+                # 标签以 ZSET 记录所属键，分值为键的过期时间；写入时顺带清理已过期成员，
+                # 热点标签的集合大小因此只与当前存活的键数相关
+                now = time.time()
+                expires_at = now + ttl
+                for tag in tags:
+                    tag_key = self._get_tag_key(tag)
+                    pipe.zremrangebyscore(tag_key, "-inf", now)
+                    pipe.zadd(tag_key, dict.fromkeys(full_keys, expires_at))
+                    pipe.expire(tag_key, ttl, nx=True)
+                    pipe.expire(tag_key, ttl, gt=True)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis set failed [{', '.join(mapping)}]: {e}")
+
+    async def warm_many(
+        self,
+        mapping: dict[str, Any],
+        ttl: int | None = None,
+        tags: Iterable[str] | None = None,
+        shared: bool = True,
+    ) -> None:
+        if shared:
+            await self.set_many(mapping, ttl=ttl, tags=tags)
+
+    async def _fill(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        ttl: int | None,
+        cache_none: bool,
+        tags: Iterable[str] | None = None,
+    ) -> Any:
+        """
+        跨进程 single-flight：通过短时 Redis 锁保证只有一个实例回源，
+        未抢到锁的实例轮询等待结果写入；持锁者释放锁后仍未写入（结果为 None 且不缓存 None，
+        或回源失败）、等待超时或 Redis 异常时退化为自行加载。
+        """
+        lock_name = self._get_full_key(f"lock:fill:{key}")
+        lock = self.client.lock(lock_name, timeout=self.fill_lock_timeout)
         try:
-            await self.client.set(full_key, pickle.dumps(value), ex=ttl)
+            acquired = await lock.acquire(blocking=False)
         except Exception as e:
-            logger.error(f"Redis set failed [{key}]: {e}")
+            logger.warning(f"Redis fill lock failed [{key}], loading without it: {e}")
+            return await self._load(key, func, ttl, cache_none, tags)
+
+        if not acquired:
+            deadline = time.monotonic() + self.fill_wait_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.fill_poll_interval)
+                val = await self.get(key, default=_UNDEFINED)
+                if val is not _UNDEFINED:
+                    return val
+                try:
+                    released = not await self.client.exists(lock_name)
+                except Exception:
+                    released = True
+                if released:
+                    # 持锁者已结束但没有写入结果，不必等到超时
+                    break
+            else:
+                logger.warning(f"Redis fill wait timed out [{key}], loading locally")
+            return await self._load(key, func, ttl, cache_none, tags)
+
+        try:
+            # 双重检查：等锁期间其他实例可能已完成回写
+            val = await self.get(key, default=_UNDEFINED)
+            if val is not _UNDEFINED:
+                return val
+            return await self._load(key, func, ttl, cache_none, tags)
+        finally:
+            try:
+                await lock.release()
+            except Exception:
+                # 锁已过期或 Redis 不可用，交由 TTL 自然释放
+                pass
 
     async def delete(self, key: str) -> None:
         try:
@@ -248,6 +699,35 @@ class RedisCache(BaseCache):
         except Exception as e:
             logger.error(f"Redis delete_by_prefix failed [{prefix}]: {e}")
 
+    async def tagged_keys(self, *tags: str) -> list[str]:
+        """获取带有任一标签的键（不含前缀，已去重排序）"""
+        keys = []
+        try:
+            now = time.time()
+            for tag in tags:
+                members = await self.client.zrangebyscore(self._get_tag_key(tag), now, "+inf")
+                keys.extend(m.decode()[len(self.prefix) :] for m in members)
+        except Exception as e:
+            logger.error(f"Redis tagged_keys failed {tags}: {e}")
+        return sorted(dict.fromkeys(keys))
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """按标签 ZSET 直接定位存活的键，耗时与其数量成正比，无需 SCAN 整个键空间"""
+        count = 0
+        try:
+            now = time.time()
+            for tag in tags:
+                tag_key = self._get_tag_key(tag)
+                # 已过期的成员对应的键已不存在，无需逐个 DELETE
+                keys = list(await self.client.zrangebyscore(tag_key, now, "+inf"))
+                for i in range(0, len(keys), 500):
+                    count += await self.client.delete(*keys[i : i + 500])
+                await self.client.delete(tag_key)
+            logger.debug(f"Redis cache tags {tags} invalidated: {count} keys.")
+        except Exception as e:
+            logger.error(f"Redis invalidate_tags failed {tags}: {e}")
+        return count
+
     async def clear(self) -> None:
         try:
             cursor = 0
@@ -267,7 +747,9 @@ class RedisCache(BaseCache):
         return {
             "backend": "redis",
             "prefix": self.prefix,
+            "serializer": self.serializer,
             "status": "connected" if self.client else "disconnected",
+            "namespaces": self.metrics.snapshot(),
         }
 
     async def async_stats(self) -> dict[str, Any]:
@@ -280,10 +762,12 @@ class RedisCache(BaseCache):
             return {
                 "backend": "redis",
                 "prefix": self.prefix,
+                "serializer": self.serializer,
                 "status": "connected",
                 "hits": hits,
                 "misses": misses,
                 "hit_rate": f"{(hits / total * 100):.2f}%" if total > 0 else "0%",
+                "namespaces": self.metrics.snapshot(),
             }
         except Exception as e:
             logger.error(f"Redis async_stats failed: {e}")
@@ -297,6 +781,261 @@ class RedisCache(BaseCache):
         return self.client.lock(f"{self.prefix}lock:{name}", timeout=timeout)
 
 
+class TieredCache(BaseCache):
+    """
+    两级缓存：进程内 LRU (L1) 在前，Redis (L2) 在后。
+    读取优先命中 L1，未命中再读 L2 并回填 L1；写入/删除先作用于 L2，再通过 pub/sub
+    通知所有实例驱逐各自的 L1。L1 的 TTL 较短，作为消息丢失时的一致性兜底。
+    """
+
+    backend_name = "tiered"
+    # 启动时等待失效订阅建立的最长时间（秒）
+    listener_start_timeout = 5.0
+
+    def __init__(
+        self,
+        l2: RedisCache,
+        l1_max_size: int = 1000,
+        l1_ttl: int = 30,
+        l1_max_bytes: int | None = None,
+    ):
+        super().__init__()
+        self.l1 = InMemoryCache(max_size=l1_max_size, default_ttl=l1_ttl, max_bytes=l1_max_bytes)
+        self.l2 = l2
+        # 与 L2 共用指标：L1 命中也计入整体命中，L1 自身的命中/淘汰另见 l1.metrics
+        self.metrics = l2.metrics
+        self.l1_ttl = l1_ttl
+        self.channel = f"{l2.prefix}cache:invalidate"
+        self._origin = uuid.uuid4().hex
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._listener: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+        self._published = 0
+        self._received = 0
+
+    # ---------- 失效广播 ----------
+
+    def _ensure_listener(self) -> None:
+        """在当前事件循环中启动订阅任务（读写 L1 前调用，未经 start 时兜底）"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def start(self) -> None:
+        """启动失效订阅并等待首次订阅完成，避免订阅时清空 L1 丢弃随后预热的数据"""
+        self._ensure_listener()
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), self.listener_start_timeout)
+        except TimeoutError:
+            logger.warning("Cache invalidation listener not subscribed yet, continuing startup")
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = self.l2.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # (重新) 订阅成功前可能错过消息，清空 L1 以免读到过期数据
+                await self.l1.clear()
+                self._subscribed.set()
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error, retry in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _apply(self, raw: bytes) -> None:
+        try:
+            event = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if event.get("origin") == self._origin:
+            return
+        self._received += 1
+        await self._evict_local(event.get("op"), event.get("args") or [])
+
+    async def _evict_local(self, op: str | None, args: list[str]) -> None:
+        if op == "delete":
+            for key in args:
+                await self.l1.delete(key)
+        elif op == "prefix":
+            for prefix in args:
+                await self.l1.delete_by_prefix(prefix)
+        elif op == "clear":
+            await self.l1.clear()
+
+    async def _broadcast(self, op: str, args: list[str]) -> None:
+        """先驱逐本地 L1，再通知其他实例"""
+        await self._evict_local(op, args)
+        try:
+            payload = json.dumps({"origin": self._origin, "op": op, "args": args})
+            await self.l2.client.publish(self.channel, payload)
+            self._published += 1
+        except Exception as e:
+            logger.error(f"Cache invalidation publish failed [{op}]: {e}")
+
+    # ---------- BaseCache 接口 ----------
+
+    def _l1_ttl(self, ttl: int | None) -> int:
+        return min(ttl, self.l1_ttl) if ttl is not None else self.l1_ttl
+
+    async def get(self, key: str, default: Any = None) -> Any | None:
+        self._ensure_listener()
+        val = await self.l1.get(key, default=_UNDEFINED)
+        if val is not _UNDEFINED:
+            self.metrics.record_get(key, hit=True)
+            return val
+
+        val = await self.l2.get(key, default=_UNDEFINED)
+        if val is _UNDEFINED:
+            self._l2_misses += 1
+            return default
+
+        self._l2_hits += 1
+        await self.l1.set(key, val, ttl=self.l1_ttl)
+        return val
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        self._ensure_listener()
+        keys = list(keys)
+        found = await self.l1.get_many(keys)
+        for key in found:
+            self.metrics.record_get(key, hit=True)
+
+        missing = [k for k in keys if k not in found]
+        if missing:
+            from_l2 = await self.l2.get_many(missing)
+            self._l2_hits += len(from_l2)
+            self._l2_misses += len(missing) - len(from_l2)
+            if from_l2:
+                await self.l1.set_many(from_l2, ttl=self.l1_ttl)
+            found.update(from_l2)
+        return found
+
+    async def set(
+        self, key: str, value: Any, ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        self._ensure_listener()
+        await self.l2.set(key, value, ttl=ttl, tags=tags)
+        await self._broadcast("delete", [key])
+        await self.l1.set(key, value, ttl=self._l1_ttl(ttl))
+
+    async def set_many(
+        self, mapping: dict[str, Any], ttl: int | None = None, tags: Iterable[str] | None = None
+    ) -> None:
+        if not mapping:
+            return
+        self._ensure_listener()
+        await self.l2.set_many(mapping, ttl=ttl, tags=tags)
+        await self._broadcast("delete", list(mapping))
+        await self.l1.set_many(mapping, ttl=self._l1_ttl(ttl))
+
+    async def warm_many(
+        self,
+        mapping: dict[str, Any],
+        ttl: int | None = None,
+        tags: Iterable[str] | None = None,
+        shared: bool = True,
+    ) -> None:
+        self._ensure_listener()
+        # 各实例读到的是同一份数据，无需驱逐其他实例的 L1
+        if shared:
+            await self.l2.set_many(mapping, ttl=ttl, tags=tags)
+        await self.l1.set_many(mapping, ttl=self._l1_ttl(ttl))
+
+    async def _fill(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        ttl: int | None,
+        cache_none: bool,
+        tags: Iterable[str] | None = None,
+    ) -> Any:
+        # 回源由 L2 负责跨进程协调；新值此前不存在，无需广播
+        result = await self.l2._fill(key, func, ttl, cache_none, tags)
+        if result is not None or cache_none:
+            await self.l1.set(key, result, ttl=self._l1_ttl(ttl))
+        return result
+
+    async def delete(self, key: str) -> None:
+        await self.l2.delete(key)
+        await self._broadcast("delete", [key])
+
+    async def delete_by_prefix(self, prefix: str) -> None:
+        await self.l2.delete_by_prefix(prefix)
+        await self._broadcast("prefix", [prefix])
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        # L1 条目可能由 L2 读回填（不带标签），因此按 L2 记录的键逐个广播驱逐
+        keys = await self.l2.tagged_keys(*tags)
+        count = await self.l2.invalidate_tags(*tags)
+        if keys:
+            await self._broadcast("delete", keys)
+        return count
+
+    async def clear(self) -> None:
+        await self.l2.clear()
+        await self._broadcast("clear", [])
+
+    def stats(self) -> dict[str, Any]:
+        total = self._l2_hits + self._l2_misses
+        l2_stats = self.l2.stats()
+        l2_stats.pop("namespaces", None)
+        return {
+            "backend": "tiered",
+            "namespaces": self.metrics.snapshot(),
+            "l1": self.l1.stats(),
+            "l2": {
+                **l2_stats,
+                "hits": self._l2_hits,
+                "misses": self._l2_misses,
+                "hit_rate": f"{(self._l2_hits / total * 100):.2f}%" if total > 0 else "0%",
+            },
+            "invalidation": {
+                "channel": self.channel,
+                "listening": self._listener is not None and not self._listener.done(),
+                "published": self._published,
+                "received": self._received,
+            },
+        }
+
+    async def async_stats(self) -> dict[str, Any]:
+        """附带 Redis 服务端统计（server 字段）"""
+        stats = self.stats()
+        server = await self.l2.async_stats()
+        server.pop("namespaces", None)
+        stats["l2"]["server"] = server
+        return stats
+
+    def metric_sources(self) -> dict[str, CacheMetrics]:
+        return {self.backend_name: self.metrics, f"{self.backend_name}_l1": self.l1.metrics}
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        self._subscribed.clear()
+        await self.l1.close()
+        await self.l2.close()
+
+    def lock(self, name: str, timeout: int = 10):
+        return self.l2.lock(name, timeout=timeout)
+
+
 # ==================== 管理函数与单例 ====================
 
 _cache_instance: BaseCache | None = None
@@ -307,14 +1046,29 @@ def get_cache() -> BaseCache:
     global _cache_instance
     if _cache_instance is None:
         if settings.REDIS_ENABLED and settings.REDIS_URL:
-            _cache_instance = RedisCache(
+            redis_cache = RedisCache(
                 redis_url=settings.REDIS_URL,
                 prefix=settings.REDIS_PREFIX,
                 default_ttl=settings.CACHE_DEFAULT_TTL,
+                serializer=settings.CACHE_SERIALIZER,
             )
-            logger.info("🚀 Global cache initialized: REDIS")
+            if settings.CACHE_L1_ENABLED:
+                _cache_instance = TieredCache(
+                    redis_cache,
+                    l1_max_size=settings.CACHE_L1_MAX_SIZE,
+                    l1_ttl=settings.CACHE_L1_TTL,
+                    l1_max_bytes=settings.CACHE_L1_MAX_BYTES,
+                )
+                logger.info("🚀 Global cache initialized: TIERED (MEMORY + REDIS)")
+            else:
+                _cache_instance = redis_cache
+                logger.info("🚀 Global cache initialized: REDIS")
         else:
-            _cache_instance = InMemoryCache(max_size=1000, default_ttl=settings.CACHE_DEFAULT_TTL)
+            _cache_instance = InMemoryCache(
+                max_size=1000,
+                default_ttl=settings.CACHE_DEFAULT_TTL,
+                max_bytes=settings.CACHE_MEMORY_MAX_BYTES,
+            )
             logger.info("🏠 Global cache initialized: IN-MEMORY")
     return _cache_instance
 
@@ -352,14 +1106,58 @@ def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     return f"{prefix}:t{tenant_id or 'all'}:{hashlib.md5(raw_str.encode()).hexdigest()[:16]}"
 
 
-def cached(ttl: int | None = None, key_prefix: str | None = None, cache_none: bool = False):
+def _rebind_session(args: tuple, kwargs: dict, db: Any) -> tuple[tuple, dict]:
+    """
+    将调用参数中的数据库会话替换为新会话（查找规则与 @transactional 一致：
+    self.db、位置参数中的 AsyncSession、关键字参数 db）。Service 实例做浅拷贝，
+    其属性中共用同一会话的子 Service 一并替换，原请求对象不受影响。
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    def swap(obj: Any, old: AsyncSession) -> Any:
+        clone = copy.copy(obj)
+        clone.db = db
+        for name, value in vars(clone).items():
+            if name != "db" and getattr(value, "db", None) is old:
+                setattr(clone, name, swap(value, old))
+        return clone
+
+    args = list(args)
+    if args and isinstance(getattr(args[0], "db", None), AsyncSession):
+        args[0] = swap(args[0], args[0].db)
+    args = [db if isinstance(a, AsyncSession) else a for a in args]
+    if isinstance(kwargs.get("db"), AsyncSession):
+        kwargs = {**kwargs, "db": db}
+    return tuple(args), kwargs
+
+
+async def _call_with_own_session(func: Callable, args: tuple, kwargs: dict) -> Any:
+    """使用独立会话执行函数：后台刷新不能与请求共用（可能已关闭或正在使用的）会话"""
+    from app.db.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        args, kwargs = _rebind_session(args, kwargs, db)
+        return await func(*args, **kwargs)
+
+
+def cached(
+    ttl: int | None = None,
+    key_prefix: str | None = None,
+    cache_none: bool = False,
+    tags: Iterable[str] | Callable[..., Iterable[str]] | None = None,
+    stale_ttl: int | None = None,
+):
     """
     通用异步缓存装饰器。
 
     支持功能：
-    - 并发降级保护（业务执行不因缓存报错而挂掉）。
+    - 缓存降级保护：缓存后端报错时记录日志并直接执行业务函数，业务函数自身的异常照常抛出。
+    - 并发回源合并（同一 key 缺失时只执行一次业务函数）。
     - 稳定哈希键生成。
     - cache_none: 是否缓存 None 结果，默认 False 避免缓存穿透反转。
+    - tags: 缓存标签，可为固定列表或接收同样参数的函数，配合 invalidate_tags 批量失效。
+    - stale_ttl: 启用 stale-while-revalidate。ttl 到期后的 stale_ttl 秒内直接返回旧值，
+      并在后台以独立数据库会话刷新一次。
     """
     cache_ttl = ttl if ttl is not None else settings.CACHE_DEFAULT_TTL
 
@@ -369,28 +1167,37 @@ def cached(ttl: int | None = None, key_prefix: str | None = None, cache_none: bo
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             cache_key = generate_cache_key(prefix, *args, **kwargs)
-            cache = get_cache()
-
-            # 1. 尝试读取
-            try:
-                cached_val = await cache.get(cache_key, default=_UNDEFINED)
-                if cached_val is not _UNDEFINED:
-                    logger.debug(f"Cache Hit: {cache_key}")
-                    return cached_val
-            except Exception as e:
-                logger.warning(f"Cache access error (fell back to business logic): {e}")
+            key_tags = tags(*args, **kwargs) if callable(tags) else tags
 
-            # 2. 执行业务逻辑
-            result = await func(*args, **kwargs)
-
-            # 3. 回写（默认不缓存 None，避免缓存穿透反转）
-            if result is not None or cache_none:
+            async def load():
                 try:
-                    await cache.set(cache_key, result, ttl=cache_ttl)
+                    return await func(*args, **kwargs)
                 except Exception as e:
-                    logger.warning(f"Cache write error: {e}")
+                    # 标记为业务异常（single-flight 等待方收到的也是同一对象），不触发降级
+                    setattr(e, _FUNC_ERROR_MARK, True)
+                    raise
 
-            return result
+            try:
+                if stale_ttl:
+                    return await get_cache().get_or_revalidate(
+                        cache_key,
+                        load,
+                        ttl=cache_ttl,
+                        stale_ttl=stale_ttl,
+                        cache_none=cache_none,
+                        tags=key_tags,
+                        refresh=functools.partial(_call_with_own_session, func, args, kwargs),
+                    )
+
+                # 缺失时由 get_or_set 合并并发回源；默认不缓存 None，避免缓存穿透反转
+                return await get_cache().get_or_set(
+                    cache_key, load, ttl=cache_ttl, cache_none=cache_none, tags=key_tags
+                )
+            except Exception as e:
+                if getattr(e, _FUNC_ERROR_MARK, False):
+                    raise
+                logger.error(f"Cache unavailable [{cache_key}], calling {prefix} directly: {e}")
+                return await func(*args, **kwargs)
 
         return wrapper
 
@@ -0,0 +1,184 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存分命名空间指标
+
+按键的命名空间（前两段，如 site:id、config:chat、service:stats）统计命中、未命中、
+回源耗时、值大小与淘汰次数，用于根据数据调整各类缓存的 TTL 与容量。
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+# 命名空间数量上限，超出后归入 _other，避免异常键导致指标无限膨胀
+MAX_NAMESPACES = 256
+OTHER_NAMESPACE = "_other"
+
+
+def namespace_of(key: str) -> str:
+    """取键的前两段作为命名空间：site:slug:docs -> site:slug"""
+    return ":".join(key.split(":", 2)[:2])
+
+
+def estimate_size(value: Any, _seen: set[int] | None = None, _depth: int = 0) -> int:
+    """估算对象占用的内存字节数（递归容器与对象属性，跳过 _ 开头的内部属性）"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen or _depth > 8:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, str | bytes | bytearray | int | float | bool) or value is None:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, _seen, _depth + 1) + estimate_size(v, _seen, _depth + 1)
+    elif isinstance(value, list | tuple | set | frozenset):
+        for item in value:
+            size += estimate_size(item, _seen, _depth + 1)
+    elif hasattr(value, "__dict__"):
+        # ORM 实例等对象只计算业务属性，不深入 _sa_instance_state 等内部状态
+        for k, v in vars(value).items():
+            if not k.startswith("_"):
+                size += estimate_size(v, _seen, _depth + 1)
+    return size
+
+
+@dataclass
+class NamespaceStats:
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    loads: int = 0
+    load_errors: int = 0
+    load_seconds: float = 0.0
+    max_load_seconds: float = 0.0
+    sets: int = 0
+    sized_sets: int = 0
+    value_bytes: int = 0
+    max_value_bytes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "avg_load_ms": round(self.load_seconds / self.loads * 1000, 2) if self.loads else 0.0,
+            "max_load_ms": round(self.max_load_seconds * 1000, 2),
+            "sets": self.sets,
+            "avg_value_bytes": self.value_bytes // self.sized_sets if self.sized_sets else 0,
+            "max_value_bytes": self.max_value_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CacheMetrics:
+    """按命名空间聚合的缓存指标（进程内）"""
+
+    def __init__(self):
+        self._namespaces: dict[str, NamespaceStats] = {}
+
+    def _stats(self, key: str) -> NamespaceStats:
+        namespace = namespace_of(key)
+        stats = self._namespaces.get(namespace)
+        if stats is None:
+            if len(self._namespaces) >= MAX_NAMESPACES:
+                namespace = OTHER_NAMESPACE
+            stats = self._namespaces.setdefault(namespace, NamespaceStats())
+        return stats
+
+    def record_get(self, key: str, hit: bool) -> None:
+        stats = self._stats(key)
+        if hit:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+    def record_stale(self, key: str) -> None:
+        """软过期后返回旧值并触发后台刷新"""
+        self._stats(key).stale_hits += 1
+
+    def record_load(self, key: str, seconds: float, failed: bool = False) -> None:
+        stats = self._stats(key)
+        stats.loads += 1
+        stats.load_errors += failed
+        stats.load_seconds += seconds
+        stats.max_load_seconds = max(stats.max_load_seconds, seconds)
+
+    def record_set(self, key: str, size: int | None) -> None:
+        """记录一次写入；size 为 None 表示本次未估算大小（采样跳过）"""
+        stats = self._stats(key)
+        stats.sets += 1
+        if size is None:
+            return
+        stats.sized_sets += 1
+        stats.value_bytes += size
+        stats.max_value_bytes = max(stats.max_value_bytes, size)
+
+    def record_eviction(self, key: str, expired: bool = False) -> None:
+        stats = self._stats(key)
+        if expired:
+            stats.expirations += 1
+        else:
+            stats.evictions += 1
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {ns: stats.snapshot() for ns, stats in sorted(self._namespaces.items())}
+
+    def reset(self) -> None:
+        self._namespaces.clear()
+
+
+_PROMETHEUS_SERIES = (
+    ("hits_total", "counter", "Cache lookups that found a value", "hits"),
+    ("misses_total", "counter", "Cache lookups that found nothing", "misses"),
+    ("stale_hits_total", "counter", "Stale values served while refreshing", "stale_hits"),
+    ("loads_total", "counter", "Loader executions after a miss", "loads"),
+    ("load_errors_total", "counter", "Loader executions that raised", "load_errors"),
+    ("load_seconds_total", "counter", "Total loader time in seconds", "load_seconds"),
+    ("sets_total", "counter", "Cache writes", "sets"),
+    ("sized_sets_total", "counter", "Cache writes whose value size was measured", "sized_sets"),
+    ("value_bytes_total", "counter", "Total size of measured values in bytes", "value_bytes"),
+    ("max_value_bytes", "gauge", "Largest written value in bytes", "max_value_bytes"),
+    ("evictions_total", "counter", "Entries evicted for capacity", "evictions"),
+    ("expirations_total", "counter", "Entries dropped after expiry", "expirations"),
+)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(sources: dict[str, CacheMetrics]) -> str:
+    """将一个或多个缓存层的指标导出为 Prometheus 文本格式，sources: backend 标签 -> 指标"""
+    lines = []
+    for name, kind, help_text, attr in _PROMETHEUS_SERIES:
+        metric = f"catwiki_cache_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for backend, metrics in sources.items():
+            for ns, stats in sorted(metrics._namespaces.items()):
+                labels = f'backend="{_escape_label(backend)}",namespace="{_escape_label(ns)}"'
+                lines.append(f"{metric}{{{labels}}} {getattr(stats, attr)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,115 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存值序列化
+
+RedisCache 写入的每个值都以 1 字节格式头开头，读取时按格式头解码，与当前配置无关，
+因此滚动发布期间新旧实例、或切换 CACHE_SERIALIZER 前后写入的值都能互相读取：
+
+- 0x01: pickle
+- 0x02: msgpack（紧凑二进制，datetime/date/UUID/Decimal/tuple 以扩展类型保真还原）
+- 0x80: 无格式头的旧版 pickle 数据（pickle 协议 2+ 的首字节）
+
+msgpack 仅处理 JSON 风格的纯数据（dict/list/str/数值/None 等）；遇到 ORM 实例、枚举、
+Pydantic 模型等不支持的类型时自动回退为 pickle。
+"""
+
+import datetime
+import pickle
+import uuid
+from decimal import Decimal
+from typing import Any
+
+import ormsgpack
+
+FORMAT_PICKLE = 0x01
+FORMAT_MSGPACK = 0x02
+_LEGACY_PICKLE = 0x80
+
+SERIALIZERS = ("msgpack", "pickle")
+
+# msgpack 扩展类型编号
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_UUID = 3
+_EXT_DECIMAL = 4
+_EXT_TUPLE = 5
+
+# 将 datetime/UUID/tuple/枚举/子类等交给 _default 处理，避免被静默转成字符串或列表
+_PACK_OPTIONS = (
+    ormsgpack.OPT_PASSTHROUGH_DATETIME
+    | ormsgpack.OPT_PASSTHROUGH_UUID
+    | ormsgpack.OPT_PASSTHROUGH_TUPLE
+    | ormsgpack.OPT_PASSTHROUGH_ENUM
+    | ormsgpack.OPT_PASSTHROUGH_SUBCLASS
+    | ormsgpack.OPT_PASSTHROUGH_DATACLASS
+    | ormsgpack.OPT_PASSTHROUGH_BIG_INT
+)
+
+
+def _default(obj: Any) -> Any:
+    # 注意 datetime 是 date 的子类，需先判断
+    if type(obj) is datetime.datetime:
+        return ormsgpack.Ext(_EXT_DATETIME, obj.isoformat().encode())
+    if type(obj) is datetime.date:
+        return ormsgpack.Ext(_EXT_DATE, obj.isoformat().encode())
+    if type(obj) is uuid.UUID:
+        return ormsgpack.Ext(_EXT_UUID, obj.bytes)
+    if type(obj) is Decimal:
+        return ormsgpack.Ext(_EXT_DECIMAL, str(obj).encode())
+    if type(obj) is tuple:
+        return ormsgpack.Ext(_EXT_TUPLE, _packb(list(obj)))
+    raise TypeError(f"Type is not msgpack serializable: {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return datetime.date.fromisoformat(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_TUPLE:
+        return tuple(ormsgpack.unpackb(data, ext_hook=_ext_hook))
+    raise ValueError(f"Unknown msgpack ext type: {code}")
+
+
+def _packb(value: Any) -> bytes:
+    return ormsgpack.packb(value, default=_default, option=_PACK_OPTIONS)
+
+
+def dumps(value: Any, serializer: str = "msgpack") -> bytes:
+    """序列化缓存值（带格式头）"""
+    if serializer == "msgpack":
+        try:
+            return bytes((FORMAT_MSGPACK,)) + _packb(value)
+        except TypeError:
+            # 含 msgpack 不支持的类型，回退 pickle
+            pass
+    return bytes((FORMAT_PICKLE,)) + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data: bytes) -> Any:
+    """按格式头反序列化缓存值；无法识别的格式抛出 ValueError"""
+    fmt = data[0]
+    if fmt == FORMAT_MSGPACK:
+        return ormsgpack.unpackb(data[1:], ext_hook=_ext_hook)
+    if fmt == FORMAT_PICKLE:
+        return pickle.loads(data[1:])
+    if fmt == _LEGACY_PICKLE:
+        return pickle.loads(data)
+    raise ValueError(f"Unknown cache value format: {fmt:#04x}")
@@ -66,24 +66,60 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = Field(default=20, ge=0, le=200)
     DB_POOL_TIMEOUT: int = Field(default=30, ge=1)
     DB_POOL_RECYCLE: int = Field(default=3600, ge=300)
+    # 单进程主库连接总预算（应用引擎 + 独立向量池 + Checkpointer 按比例分配），0 表示沿用上述池配置
+    DB_CONNECTION_BUDGET: int = Field(default=0, ge=0)
+    # 向量存储复用应用引擎的连接池，不再单独建池
+    VECTOR_STORE_SHARE_ENGINE: bool = Field(default=True)
+
+    # 只读副本（可选）：配置后 GET 请求与只读服务的查询路由到副本，复用主库的用户/密码/库名
+    POSTGRES_REPLICA_SERVER: str | None = Field(default=None)
+    POSTGRES_REPLICA_PORT: int = Field(default=5432, ge=1, le=65535)
+    # 副本复制延迟上限（秒），超出后读查询回退主库；0 表示不检查延迟
+    DB_REPLICA_MAX_LAG: float = Field(default=5.0, ge=0)
+    DB_REPLICA_CHECK_INTERVAL: float = Field(default=5.0, gt=0)
 
     # Redis 配置（缓存/分布式锁）
     REDIS_ENABLED: bool = Field(default=False)
     REDIS_URL: str | None = Field(default=None)
     REDIS_PREFIX: str = Field(default="catwiki:")
     CACHE_DEFAULT_TTL: int = Field(default=300, ge=1)
-
-    @computed_field
-    @property
-    def DATABASE_URL(self) -> str:
-        """生成异步数据库连接 URL（使用 asyncpg 驱动）"""
+    # Redis 缓存值序列化格式：msgpack（紧凑，不支持的类型自动回退 pickle）或 pickle
+    CACHE_SERIALIZER: str = Field(default="msgpack", pattern="^(msgpack|pickle)$")
+    # 两级缓存：Redis 启用时在其前面加一层进程内 LRU，经 pub/sub 广播失效
+    CACHE_L1_ENABLED: bool = Field(default=True)
+    CACHE_L1_MAX_SIZE: int = Field(default=1000, ge=1)
+    CACHE_L1_TTL: int = Field(default=30, ge=1)
+    # 进程内缓存字节预算（估算值，0 表示仅按条目数限制）
+    CACHE_MEMORY_MAX_BYTES: int = Field(default=0, ge=0)
+    CACHE_L1_MAX_BYTES: int = Field(default=0, ge=0)
+    # 启动预热：在就绪前预加载热点缓存，超出时间预算（秒）后跳过剩余步骤
+    CACHE_WARMUP_ENABLED: bool = Field(default=True)
+    CACHE_WARMUP_BUDGET: float = Field(default=10.0, ge=0)
+    CACHE_WARMUP_TOP_SITES: int = Field(default=20, ge=0)
+    CACHE_WARMUP_MAX_SITES: int = Field(default=1000, ge=0)
+
+    def _build_database_url(self, server: str, port: int) -> str:
         encoded_user = quote_plus(self.POSTGRES_USER)
         encoded_password = quote_plus(self.POSTGRES_PASSWORD)
         return (
             f"postgresql+asyncpg://{encoded_user}:{encoded_password}"
-            f"@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            f"@{server}:{port}/{self.POSTGRES_DB}"
         )
 
+    @computed_field
+    @property
+    def DATABASE_URL(self) -> str:
+        """生成异步数据库连接 URL（使用 asyncpg 驱动）"""
+        return self._build_database_url(self.POSTGRES_SERVER, self.POSTGRES_PORT)
+
+    @computed_field
+    @property
+    def DATABASE_REPLICA_URL(self) -> str | None:
+        """只读副本连接 URL，未配置副本时为 None"""
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return self._build_database_url(self.POSTGRES_REPLICA_SERVER, self.POSTGRES_REPLICA_PORT)
+
     # CORS 配置
     BACKEND_CORS_ORIGINS: str | list[str] = Field(
         default="http://localhost:8001,http://localhost:8002"
@@ -110,6 +146,8 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     # Token 过期时间（分钟），默认 7 天（10080 分钟），最大 30 天（43200 分钟）
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=10080, ge=1, le=43200)
+    # 认证主体（用户 + 所属租户状态）缓存时间（秒），0 表示每次请求都回源
+    AUTH_PRINCIPAL_CACHE_TTL: int = Field(default=60, ge=0)
 
     @field_validator("SECRET_KEY")
     @classmethod
@@ -140,6 +178,8 @@ class Settings(BaseSettings):
     # 机器人插件配置
     ROBOT_PLUGIN_ALLOWLIST: list[str] = Field(default_factory=list)
     DB_ECHO: bool = Field(default=False, description="是否输出 SQL 日志")
+    # 同一请求内同一条 SQL 执行次数达到该值时输出 N+1 告警（0 表示关闭）
+    DB_QUERY_REPEAT_WARN: int = Field(default=10, ge=0)
 
     # RustFS 对象存储配置
     RUSTFS_ENDPOINT: str = Field(default="rustfs:9000", description="RustFS 服务地址")
@@ -203,6 +243,61 @@ class Settings(BaseSettings):
         description="触发对话摘要的消息数量阈值",
     )
 
+    # 聊天运行时配置
+    CHAT_SINGLE_FLIGHT_ENABLED: bool = Field(
+        default=False,
+        description="是否合并并发的相同首轮问题，共享同一次检索与生成",
+    )
+    CHAT_ADMISSION_ENABLED: bool = Field(
+        default=False,
+        description=(
+            "是否启用聊天准入控制（并发上限 + 有界等待队列，超限返回 429）；"
+            "上限应按压测得到的实际推理容量设置后再开启"
+        ),
+    )
+    CHAT_MAX_CONCURRENT: int = Field(
+        default=10,
+        ge=1,
+        le=500,
+        description="单个进程同时执行的 Agent 推理上限（建议不超过 Checkpointer 连接池大小）",
+    )
+    CHAT_MAX_CONCURRENT_PER_TENANT: int = Field(
+        default=4,
+        ge=1,
+        le=500,
+        description="单个进程内单个租户同时执行的 Agent 推理上限",
+    )
+    CHAT_ADMISSION_QUEUE_SIZE: int = Field(
+        default=20,
+        ge=0,
+        le=1000,
+        description="超出并发上限时的等待队列长度，队列满则直接返回 429",
+    )
+    CHAT_ADMISSION_WAIT_TIMEOUT: float = Field(
+        default=5.0,
+        gt=0,
+        le=60,
+        description="请求在等待队列中的最长等待时间（秒），超时返回 429",
+    )
+    CHAT_PERSIST_QUEUE_SIZE: int = Field(
+        default=1000,
+        ge=1,
+        le=100000,
+        description="对话轮次异步落库队列长度，满则转投 Redis 队列",
+    )
+    CHAT_PERSIST_WORKERS: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        description="消费落库队列的并发写入任务数",
+    )
+    CHAT_PERSIST_DRAIN_TIMEOUT: float = Field(
+        default=10.0,
+        gt=0,
+        le=120,
+        description="应用关闭时等待落库队列排空的最长时间（秒）",
+    )
+
     # RAG 检索配置
     RAG_RECALL_K: int = Field(
         default=50,
@@ -200,49 +200,37 @@ class ConfigResolver:
             }.get(section, section)
             raise BadRequestException(f"已开启自定义{type_display}模式，但未配置 API Key。")
 
-    @classmethod
-    async def log_ai_stack(cls, tenant_id: int | None = None):
-        """[✨ 亮点] 打印全量 AI 栈配置快照 (用于 Request 启动时)"""
-        try:
-            from app.core.common.masking import mask_sensitive_data
-
-            stack = {}
-            for section in ["chat", "embedding", "rerank", "vl"]:
-                try:
-                    conf = await cls.resolve_section(section, tenant_id)
-                    stack[section] = mask_sensitive_data(conf)
-                except Exception:
-                    stack[section] = {"error": "Not configured"}
-
-            target_display = f"Tenant {tenant_id}" if tenant_id else "Platform GLOBAL"
-
-            # 构造精简的摘要表格/列表
-            summary_lines = []
-            for section, conf in stack.items():
-                if "error" in conf:
-                    summary_lines.append(f"   [{section:9}] -> ❌ 未配置")
-                    continue
-
-                provider = conf.get("provider", "N/A")
-                model = conf.get("model", "N/A")
-                eb = conf.get("extra_body")
-                mode = conf.get("mode", "platform")
-                h = conf.get("_hash", "N/A")[:8]
-
-                eb_str = f" | Extra: {json.dumps(eb)}" if eb else ""
-                summary_lines.append(
-                    f"   [{section:9}] -> {provider:8} | {model:15} | Mode: {mode:8} | Hash: {h}{eb_str}"
-                )
+    @staticmethod
+    def format_ai_stack(
+        stack: dict[str, dict[str, Any]], tenant_id: int | None = None, version: str = ""
+    ) -> str:
+        """[✨ 亮点] 格式化 AI 栈配置快照 (各模块配置需已脱敏)"""
+        target_display = f"Tenant {tenant_id}" if tenant_id else "Platform GLOBAL"
+
+        # 构造精简的摘要表格/列表
+        summary_lines = []
+        for section, conf in stack.items():
+            if "error" in conf:
+                summary_lines.append(f"   [{section:9}] -> ❌ 未配置")
+                continue
+
+            provider = conf.get("provider", "N/A")
+            model = conf.get("model", "N/A")
+            eb = conf.get("extra_body")
+            mode = conf.get("mode", "platform")
+            h = conf.get("_hash", "N/A")[:8]
+
+            eb_str = f" | Extra: {json.dumps(eb)}" if eb else ""
+            summary_lines.append(
+                f"   [{section:9}] -> {provider:8} | {model:15} | Mode: {mode:8} | Hash: {h}{eb_str}"
+            )
 
-            pretty_stack = "\n".join(summary_lines)
+        pretty_stack = "\n".join(summary_lines)
 
-            log_msg = (
-                f"\n{'=' * 80}\n"
-                f"🧠 [AI Context] -> 🚀 正在初始化推理引擎 (Request Session)\n"
-                f"   - 目标范围: {target_display}\n"
-                f"{pretty_stack}\n"
-                f"{'=' * 80}"
-            )
-            logger.debug(log_msg)
-        except Exception as e:
-            logger.warning(f"⚠️ [ConfigResolver] 打印 AI 栈日志失败: {e}")
+        return (
+            f"\n{'=' * 80}\n"
+            f"🧠 [AI Context] -> 🚀 AI 栈配置快照 (版本: {version or 'N/A'})\n"
+            f"   - 目标范围: {target_display}\n"
+            f"{pretty_stack}\n"
+            f"{'=' * 80}"
+        )
@@ -17,6 +17,7 @@ import logging
 from typing import Any
 
 from app.core.ai.providers.llm_manager import llm_manager
+from app.core.infra.config import settings
 from app.core.infra.rustfs import init_rustfs
 from app.core.integration.robot.plugins import load_plugins
 from app.core.integration.robot.services.dingtalk_app import DingTalkRobotService
@@ -57,7 +58,12 @@ class LifecycleManager:
 
         # 4. 初始化核心管理器
         # VectorStore 现在采用懒加载策略，首次检索时自动初始化
-        pass
+        try:
+            from app.services.chat.turn_writer import chat_turn_writer
+
+            await chat_turn_writer.start()
+        except Exception as e:
+            logger.warning(f"⚠️ [Lifecycle] Chat turn writer startup failed: {e}")
 
         # 5. 加载机器人插件
         load_plugins()
@@ -78,6 +84,36 @@ class LifecycleManager:
         except Exception as e:
             logger.warning(f"⚠️ [Lifecycle] WeCom Smart LongConn startup failed: {e}")
 
+        # 7. 启动只读副本巡检 (需在预热前完成首次检查)
+        try:
+            from app.db.database import replica_engine
+            from app.db.routing import replica_monitor
+
+            if replica_engine is not None:
+                await replica_monitor.start(replica_engine)
+                logger.info(
+                    f"✅ [Lifecycle] Read replica monitor started: {replica_monitor.stats()}"
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ [Lifecycle] Read replica monitor startup failed: {e}")
+
+        # 8. 启动缓存失效订阅 (需在预热前完成，订阅建立时会清空进程内 L1)
+        try:
+            from app.core.infra.cache import get_cache
+
+            await get_cache().start()
+        except Exception as e:
+            logger.warning(f"⚠️ [Lifecycle] Cache listener startup failed: {e}")
+
+        # 9. 预热缓存 (在就绪前完成，受时间预算约束)
+        if settings.CACHE_WARMUP_ENABLED:
+            try:
+                from app.core.lifecycle.warmup import warm_up_caches
+
+                await warm_up_caches()
+            except Exception as e:
+                logger.warning(f"⚠️ [Lifecycle] Cache warm-up failed: {e}")
+
         logger.info("✨ [Lifecycle] All core components started.")
 
     @classmethod
@@ -85,6 +121,14 @@ class LifecycleManager:
         """应用关闭时的核心组件卸载"""
         logger.info("🛑 [Lifecycle] Stopping core components...")
 
+        # 0. 排空对话异步落库队列 (需在数据库/Redis 关闭前完成)
+        try:
+            from app.services.chat.turn_writer import chat_turn_writer
+
+            await chat_turn_writer.stop()
+        except Exception as e:
+            logger.warning(f"⚠️ [Lifecycle] Chat turn writer drain failed: {e}")
+
         # 1. 关闭 LLM 管理器
         await llm_manager.close()
 
@@ -129,6 +173,17 @@ class LifecycleManager:
         # 6. 关闭任务服务池
         await TaskService.close()
 
+        # 7. 停止只读副本巡检并释放副本连接池
+        try:
+            from app.db.database import replica_engine
+            from app.db.routing import replica_monitor
+
+            await replica_monitor.stop()
+            if replica_engine is not None:
+                await replica_engine.dispose()
+        except Exception as e:
+            logger.warning(f"⚠️ [Lifecycle] Read replica shutdown failed: {e}")
+
         logger.info("🏁 [Lifecycle] All core components stopped.")
 
     @classmethod
@@ -155,6 +210,18 @@ class LifecycleManager:
         except Exception as e:
             results["database"] = f"unhealthy: {str(e)}"
 
+        from app.db.database import replica_engine
+
+        if replica_engine is not None:
+            from app.db.routing import replica_monitor
+
+            await replica_monitor.check(replica_engine)
+            results["database_replica"] = replica_monitor.stats()
+
+        from app.db.pools import pool_stats
+
+        results["database_pools"] = pool_stats()
+
         # 2. Vector Store 检查
         try:
             vs_manager = await VectorStoreManager.get_instance(purpose="健康检查：向量检索服务")
@@ -0,0 +1,215 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+启动缓存预热
+
+发布或重启后缓存为空，第一波流量会同时打到 Postgres 与配置解析。就绪前按顺序预加载：
+
+1. 激活站点（site:id / site:slug / site:active / site:tenant），按浏览量取前 CACHE_WARMUP_MAX_SITES 个
+2. 租户 slug 映射（tenant:id / tenant:slug / tenant:resolve:slug）
+3. 平台与各租户解析后的 AI 配置（config:*）
+4. 热门站点（按已发布文档浏览量）的客户端合集树
+
+整体受 CACHE_WARMUP_BUDGET 时间预算约束，各步骤在循环中检查截止时间，超时后跳过剩余步骤；
+预热失败不影响启动。多实例同时启动时只有抢到锁的实例写共享缓存 (Redis)，其余实例只预热本进程 L1。
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+
+from app.core.infra.cache import InMemoryCache, get_cache
+from app.core.infra.config import settings
+from app.core.infra.tenant import temporary_tenant_context
+from app.crud.site import SITE_CLIENT_CACHE_TAG
+from app.db.database import AsyncSessionLocal
+from app.models.document import Document, DocumentStatus
+from app.models.site import Site
+from app.models.tenant import Tenant
+
+logger = logging.getLogger(__name__)
+
+# 每批加载的站点数
+SITE_BATCH_SIZE = 200
+# 共享缓存预热锁的持有时间：不主动释放，滚动发布时随后启动的实例同样跳过共享层
+SHARED_WARMUP_LOCK_TTL = 300
+
+
+@dataclass
+class WarmupRun:
+    """一次预热的状态：截止时间、是否负责共享缓存、各步骤加载的键数量"""
+
+    deadline: float
+    shared: bool = True
+    loaded: Counter = field(default_factory=Counter)
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.deadline
+
+
+async def _claim_shared_warmup() -> bool:
+    """抢占共享缓存的预热权，Redis 不可用时只预热本进程"""
+    cache = get_cache()
+    if isinstance(cache, InMemoryCache):
+        return True
+    try:
+        lock = cache.lock("warmup", timeout=SHARED_WARMUP_LOCK_TTL)
+        return bool(await lock.acquire(blocking=False))
+    except Exception as e:
+        logger.warning(f"⚠️ [Warmup] Shared warm-up lock unavailable, warming local cache only: {e}")
+        return False
+
+
+async def _warm_sites(run: WarmupRun) -> None:
+    """激活站点：与 crud_site.get / get_by_slug / get_active / resolve_tenant_id 共用缓存键"""
+    cache = get_cache()
+    limit = settings.CACHE_WARMUP_MAX_SITES
+    offset = 0
+    while offset < limit and not run.expired():
+        batch = min(SITE_BATCH_SIZE, limit - offset)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Site)
+                .where(Site.status == "active")
+                .order_by(Site.view_count.desc(), Site.id)
+                .offset(offset)
+                .limit(batch)
+            )
+            sites = result.scalars().all()
+        if not sites:
+            return
+
+        plain, active, tenant_ids = {}, {}, {}
+        for site in sites:
+            data = site.to_dict()
+            plain[f"site:id:{site.id}"] = plain[f"site:slug:{site.slug}"] = data
+            active[f"site:active:id:{site.id}"] = active[f"site:active:slug:{site.slug}"] = data
+            tenant_ids[f"site:tenant:{site.id}"] = site.tenant_id
+        await cache.warm_many(plain, ttl=600, shared=run.shared)
+        await cache.warm_many(active, ttl=600, tags=[SITE_CLIENT_CACHE_TAG], shared=run.shared)
+        await cache.warm_many(tenant_ids, ttl=3600, shared=run.shared)
+        run.loaded["sites"] += len(plain) + len(active) + len(tenant_ids)
+
+        if len(sites) < batch:
+            return
+        offset += len(sites)
+
+
+async def _warm_tenants(run: WarmupRun) -> None:
+    """租户 slug 映射：与 crud_tenant.get / get_by_slug / resolve_id_by_slug 共用缓存键"""
+    async with AsyncSessionLocal() as db:
+        tenants = (await db.execute(select(Tenant))).scalars().all()
+
+    if not tenants:
+        return
+    mapping = {}
+    for tenant in tenants:
+        data = tenant.to_dict()
+        mapping[f"tenant:id:{tenant.id}"] = mapping[f"tenant:slug:{tenant.slug}"] = data
+        mapping[f"tenant:resolve:slug:{tenant.slug}"] = tenant.id
+    await get_cache().warm_many(mapping, ttl=3600, shared=run.shared)
+    run.loaded["tenants"] += len(mapping)
+
+
+async def _warm_ai_configs(run: WarmupRun) -> None:
+    """平台及拥有激活站点的租户的 AI 配置（四个模块 + AI 栈快照）
+
+    经 get_or_set 回源：共享层已有值时直接读取，回源由 Redis 锁协调，不会重复加载。
+    """
+    from app.services.config.configuration_service import AI_SECTIONS, configuration_service
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Site.tenant_id).where(Site.status == "active").distinct())
+        tenant_ids = sorted(result.scalars().all())
+
+    for tenant_id in [None, *tenant_ids]:
+        if run.expired():
+            return
+        await configuration_service.get_ai_stack(tenant_id)
+        run.loaded["ai_configs"] += len(AI_SECTIONS) + 1
+
+
+async def _warm_collection_trees(run: WarmupRun) -> None:
+    """按已发布文档浏览量排名前 N 的站点，加载客户端合集树（含/不含文档节点）"""
+    from app.services.collection_service import CollectionService
+
+    limit = settings.CACHE_WARMUP_TOP_SITES
+    if limit <= 0:
+        return
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Document.site_id, Site.tenant_id)
+            .join(Site, Site.id == Document.site_id)
+            .where(Site.status == "active", Document.status == DocumentStatus.PUBLISHED.value)
+            .group_by(Document.site_id, Site.tenant_id)
+            .order_by(func.sum(Document.views).desc())
+            .limit(limit)
+        )
+        sites = result.all()
+
+        service = CollectionService(db)
+        for site_id, tenant_id in sites:
+            if run.expired():
+                return
+            # 与客户端请求相同的租户上下文，缓存键才能命中
+            with temporary_tenant_context(tenant_id):
+                for show_type in ("collection", "all"):
+                    await service.get_collection_tree(
+                        site_id=site_id, show_type=show_type, status="published"
+                    )
+                    run.loaded["collection_trees"] += 1
+
+
+# 按优先级排列：越靠前越能在预算耗尽前完成
+WARMUP_STEPS = (
+    ("sites", _warm_sites),
+    ("tenants", _warm_tenants),
+    ("ai_configs", _warm_ai_configs),
+    ("collection_trees", _warm_collection_trees),
+)
+
+
+async def warm_up_caches(budget: float | None = None) -> Counter:
+    """执行缓存预热，返回各步骤加载的键数量"""
+    budget = settings.CACHE_WARMUP_BUDGET if budget is None else budget
+    start = time.perf_counter()
+    run = WarmupRun(deadline=start + budget, shared=await _claim_shared_warmup())
+
+    # 预热跨租户读取，不附加租户过滤；预热数据会缓存整个 TTL，因此读主库而非副本
+    with temporary_tenant_context(None):
+        for name, step in WARMUP_STEPS:
+            remaining = run.deadline - time.perf_counter()
+            if remaining <= 0:
+                logger.warning(f"⏱️ [Warmup] Budget exhausted, skipped step: {name}")
+                continue
+            try:
+                await asyncio.wait_for(step(run), timeout=remaining)
+            except TimeoutError:
+                logger.warning(f"⏱️ [Warmup] Budget exhausted during step: {name}")
+            except Exception as e:
+                logger.warning(f"⚠️ [Warmup] Step {name} failed: {e}")
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    scope = "shared + local" if run.shared else "local only"
+    logger.info(
+        f"🔥 [Warmup] Cache warm-up ({scope}) finished in {elapsed_ms:.0f} ms, "
+        f"{sum(run.loaded.values())} keys loaded: {dict(run.loaded)}"
+    )
+    return run.loaded
@@ -14,10 +14,12 @@
 
 import logging
 
-from arq import func
+from arq import cron, func
 
 from app.core.queue.redis import redis_settings
+from app.worker.chat_tasks import PERSIST_CHAT_TURN_MAX_TRIES, persist_chat_turn
 from app.worker.document_tasks import process_import_parsing, process_vectorize
+from app.worker.stats_tasks import flush_site_view_counts
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +47,14 @@ class WorkerSettings:
     functions = [
         func(process_import_parsing, name="process_import_parsing"),
         func(process_vectorize, name="process_vectorize"),
+        func(
+            persist_chat_turn,
+            name="persist_chat_turn",
+            max_tries=PERSIST_CHAT_TURN_MAX_TRIES,
+        ),
     ]
+    # 每分钟写回一次站点浏览量；启动时先写回上次遗留的批次
+    cron_jobs = [cron(flush_site_view_counts, second=0, run_at_startup=True)]
     redis_settings = redis_settings
     on_startup = startup
     on_shutdown = shutdown
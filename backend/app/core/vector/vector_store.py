@@ -22,7 +22,6 @@ import logging
 import time
 from contextvars import ContextVar
 from typing import Any, Optional
-from urllib.parse import quote_plus
 
 from langchain_core.documents import Document as LangChainDocument
 from langchain_postgres import PGEngine, PGVectorStore
@@ -32,6 +31,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.core.common.utils import log_ai_usage_signal
 from app.core.infra.config import settings
+from app.db.pools import instrumented_pool_class, plan_pools, register_engine_pool, unregister_pool
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +67,7 @@ class VectorStoreManager:
     def __init__(self, collection_name: str = "catwiki_documents"):
         self.collection_name = collection_name
         self._sa_engine = None  # 底层 SQLAlchemy 异步引擎 (进程内共享)
+        self._owns_engine = False  # 是否为独立建池（复用应用引擎时关闭由应用负责）
         self._engine: PGEngine | None = None  # PGEngine (进程内共享)
 
         # 核心缓存：基于配置哈希，实现多租户/多模型配置的实例隔离
@@ -233,24 +234,31 @@ class VectorStoreManager:
         return (new_store, new_embeddings, model, conf_hash)
 
     def _init_engine(self):
-        """初始化 SQLAlchemy 引擎（仅首次调用时执行）"""
-        encoded_user = quote_plus(settings.POSTGRES_USER)
-        encoded_password = quote_plus(settings.POSTGRES_PASSWORD)
-        async_conn_str = (
-            f"postgresql+asyncpg://{encoded_user}:{encoded_password}"
-            f"@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
-        )
-        self._sa_engine = create_async_engine(
-            async_conn_str,
-            pool_size=settings.DB_POOL_SIZE,
-            max_overflow=settings.DB_MAX_OVERFLOW,
-            pool_timeout=settings.DB_POOL_TIMEOUT,
-            pool_recycle=settings.DB_POOL_RECYCLE,
-            pool_pre_ping=True,
-            pool_reset_on_return="commit",
-            echo=False,
-            future=True,
-        )
+        """初始化 SQLAlchemy 引擎（仅首次调用时执行）
+
+        默认复用应用引擎的连接池；VECTOR_STORE_SHARE_ENGINE 关闭时按连接预算单独建池。
+        """
+        if settings.VECTOR_STORE_SHARE_ENGINE:
+            from app.db.database import engine
+
+            self._sa_engine = engine
+            self._owns_engine = False
+        else:
+            size = plan_pools()["vector"]
+            self._sa_engine = create_async_engine(
+                settings.DATABASE_URL,
+                poolclass=instrumented_pool_class("vector"),
+                pool_size=size.pool_size,
+                max_overflow=size.max_overflow,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                pool_reset_on_return="commit",
+                echo=False,
+                future=True,
+            )
+            self._owns_engine = True
+            register_engine_pool("vector", self._sa_engine, size)
         self._engine = PGEngine.from_engine(engine=self._sa_engine)
 
     async def _ensure_table(self, dimension: int):
@@ -485,6 +493,7 @@ class VectorStoreManager:
 
     async def close(self):
         """关闭数据库连接"""
-        if self._sa_engine:
+        if self._sa_engine and self._owns_engine:
             await self._sa_engine.dispose()
+            unregister_pool("vector")
             logger.info("✅ 向量存储连接已关闭")
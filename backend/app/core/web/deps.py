@@ -88,16 +88,85 @@ class CommonDependencies:
 # ==================== 认证相关依赖 ====================
 
 
+async def _resolve_tenant_state(db: AsyncSession, tenant_id: int) -> dict | None:
+    """查询租户状态：租户不存在时返回 None，否则返回 {"id", "is_demo"}"""
+    from app.crud.tenant import crud_tenant
+
+    tenant = await crud_tenant.get(db, id=tenant_id)
+    if not tenant:
+        return None
+
+    is_demo = False
+    try:
+        from app.ee.loader import get_ee_tenant_is_demo
+
+        is_demo = await get_ee_tenant_is_demo(db, tenant_id)
+    except ImportError:
+        pass
+    return {"id": tenant_id, "is_demo": bool(is_demo)}
+
+
+async def _get_principal(
+    request: Request, db: AsyncSession, user_id: int, issued_at: int
+) -> User | None:
+    """
+    获取认证主体（用户 + 所属租户状态）
+
+    按用户 ID 与 token 签发时间短期缓存，管理后台同一页面的并发请求只回源一次；
+    用户禁用、角色变更、密码重置/修改时由 crud_user 按标签失效。
+    租户状态写入 request.state.principal_tenant，供 get_current_user_with_tenant 复用。
+    """
+    from app.core.infra.cache import get_cache
+    from app.crud.tenant import principal_tenant_tag
+    from app.crud.user import principal_cache_tag
+
+    fetched = None
+
+    async def load() -> dict | None:
+        nonlocal fetched
+        fetched = await crud_user.get(db, id=user_id)
+        if fetched is None:
+            return None
+        tenant = None
+        if fetched.tenant_id is not None:
+            tenant = await _resolve_tenant_state(db, fetched.tenant_id)
+        return {"user": fetched.to_dict(), "tenant": tenant}
+
+    ttl = settings.AUTH_PRINCIPAL_CACHE_TTL
+    if ttl > 0:
+        principal = await get_cache().get_or_set(
+            f"auth:principal:{user_id}:{issued_at}",
+            load,
+            ttl=ttl,
+            cache_none=False,
+            tags=lambda p: [
+                principal_cache_tag(user_id),
+                principal_tenant_tag(p["user"]["tenant_id"]),
+            ],
+        )
+    else:
+        principal = await load()
+
+    if principal is None:
+        return None
+    request.state.principal_tenant = principal["tenant"]
+    if fetched is not None:
+        return fetched
+    return await crud_user._from_cache(db, principal["user"])
+
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     获取当前登录用户
 
-    从请求头中提取并验证 JWT token，然后返回对应的用户对象
+    从请求头中提取并验证 JWT token，然后返回对应的用户对象（认证主体短期缓存）
 
     Args:
+        request: 当前请求
         credentials: HTTP Bearer token 凭证
         db: 数据库会话
 
@@ -124,8 +193,8 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise UnauthorizedException(detail=_("auth.invalid_user_id"))
 
-    # 从数据库获取用户
-    user = await crud_user.get(db, id=user_id)
+    # 获取用户（旧 token 无 iat，共用同一缓存键）
+    user = await _get_principal(request, db, user_id, payload.get("iat", 0))
     if user is None:
         raise UnauthorizedException(detail=_("auth.user_not_found"))
 
@@ -180,14 +249,12 @@ async def set_client_tenant_context(
     from app.core.infra.tenant import set_current_tenant
 
     tenant_id = None
-    request.state.site = None
 
     if x_tenant_slug:
         from app.crud.tenant import crud_tenant
 
-        tenant = await crud_tenant.get_by_slug(db, slug=x_tenant_slug)
-        if tenant:
-            tenant_id = tenant.id
+        tenant_id = await crud_tenant.resolve_id_by_slug(db, slug=x_tenant_slug)
+        if tenant_id is not None:
             logger.debug(
                 f"🔑 [TenantResolve] Resolved tenant_id={tenant_id} from slug='{x_tenant_slug}'"
             )
@@ -198,12 +265,8 @@ async def set_client_tenant_context(
     if tenant_id is None:
         site_id_str = request.query_params.get("site_id")
         if site_id_str and site_id_str.isdigit():
-            from app.crud.site import crud_site
-
-            site = await crud_site.get(db, id=int(site_id_str))
-            if site:
-                tenant_id = site.tenant_id
-                request.state.site = site  # 缓存此站点对象供后续依赖复用
+            tenant_id = await crud_site.resolve_tenant_id(db, site_id=int(site_id_str))
+            if tenant_id is not None:
                 logger.debug(
                     f"🔍 [TenantResolve] Resolved tenant_id={tenant_id} from site_id={site_id_str}"
                 )
@@ -236,7 +299,6 @@ async def get_current_user_with_tenant(
     """
     from app.core.infra.tenant import set_current_tenant
     from app.core.web.exceptions import BadRequestException
-    from app.crud.tenant import crud_tenant
 
     # 1. 设置租户上下文
     set_current_tenant(tenant_id)
@@ -245,16 +307,12 @@ async def get_current_user_with_tenant(
     request.state.is_demo = False
 
     if tenant_id:
-        tenant = await crud_tenant.get(db, id=tenant_id)
+        # 目标租户即用户所属租户时复用认证主体中缓存的租户状态
+        tenant = getattr(request.state, "principal_tenant", None)
+        if tenant is None or tenant["id"] != tenant_id:
+            tenant = await _resolve_tenant_state(db, tenant_id)
         if tenant:
-            is_demo = False
-            try:
-                from app.ee.loader import get_ee_tenant_is_demo
-
-                is_demo = await get_ee_tenant_is_demo(db, tenant_id)
-            except ImportError:
-                pass
-
+            is_demo = tenant["is_demo"]
             request.state.is_demo = is_demo
 
             # 仅针对写方法且有租户目标的情况
@@ -286,17 +344,10 @@ async def is_demo_tenant(
         request.state.is_demo = False
         return False
 
-    from app.crud.tenant import crud_tenant
-
-    tenant = await crud_tenant.get(db, id=tenant_id)
-    is_demo = False
-    if tenant:
-        try:
-            from app.ee.loader import get_ee_tenant_is_demo
-
-            is_demo = await get_ee_tenant_is_demo(db, tenant_id)
-        except ImportError:
-            pass
+    tenant = getattr(request.state, "principal_tenant", None)
+    if tenant is None or tenant["id"] != tenant_id:
+        tenant = await _resolve_tenant_state(db, tenant_id)
+    is_demo = bool(tenant and tenant["is_demo"])
 
     request.state.is_demo = is_demo
     return is_demo
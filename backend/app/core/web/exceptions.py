@@ -33,6 +33,9 @@ from app.core.infra.config import settings
 class CatWikiError(Exception):
     """CatWiki 基础异常类"""
 
+    # 需要随响应返回的额外 HTTP 头 (如 Retry-After)
+    headers: dict[str, str] | None = None
+
     def __init__(self, detail: str | None = None, status_code: int = 500):
         self.detail = detail or _("error.base")
         self.status_code = status_code
@@ -101,6 +104,18 @@ class ServiceUnavailableException(CatWikiError):
         )
 
 
+class TooManyRequestsException(CatWikiError):
+    """请求过多异常 (429)"""
+
+    def __init__(self, detail: str | None = None, retry_after: int | None = None):
+        super().__init__(
+            detail=detail or _("error.too_many_requests"),
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        if retry_after is not None:
+            self.headers = {"Retry-After": str(retry_after)}
+
+
 # ========== 异常处理器 ==========
 
 
@@ -121,6 +136,7 @@ def setup_exception_handlers(app: FastAPI):
                 "msg": exc.detail,
                 "data": None,
             },
+            headers=exc.headers,
         )
 
     @app.exception_handler(StarletteHTTPException)
@@ -28,6 +28,7 @@ from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from app.core.common.i18n import DEFAULT_LOCALE, SUPPORTED_LOCALES, _, set_locale
 from app.core.common.logger import request_id_var
 from app.core.infra.config import settings
+from app.db.query_stats import track_queries
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,12 @@ class RequestLoggingMiddleware:
         method = scope.get("method", "")
         # logger.info(f"🚀 {method} {path} [ID: {request_id}]")
 
+        status_code = None
+        # 响应体发送完毕时的 (耗时, 查询数, 查询耗时)；流式响应在最后一块之后才确定
+        completed = None
+
         async def send_wrapper(message):
+            nonlocal status_code, completed
             if message["type"] == "http.response.start":
                 # 添加响应头
                 headers = list(message.get("headers", []))
@@ -64,21 +70,56 @@ class RequestLoggingMiddleware:
                 headers.append((b"X-Process-Time", str(process_time).encode()))
                 headers.append((b"X-Powered-By", b"CatWiki"))
                 message["headers"] = headers
-
-                # 记录请求结束日志
                 status_code = message.get("status")
-                logger.info(
-                    f"{method} {path} - Completed in {process_time:.3f}s - Status: {status_code}"
-                )
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                completed = (time.time() - start_time, query_stats.count, query_stats.seconds)
 
             await send(message)
 
         try:
-            await self.app(scope, receive, send_wrapper)
+            with track_queries() as query_stats:
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    # 记录请求结束日志：在响应体发送完毕后统计，流式响应的查询也计入
+                    process_time, count, seconds = completed or (
+                        time.time() - start_time,
+                        query_stats.count,
+                        query_stats.seconds,
+                    )
+                    logger.info(
+                        f"{method} {path} - Completed in {process_time:.3f}s"
+                        f" - Status: {status_code} - Queries: {count} ({seconds * 1000:.1f}ms)"
+                    )
+            # 同一条 SQL 被重复执行多次，通常是循环内逐条查询（N+1）
+            for statement, times in query_stats.repeated(settings.DB_QUERY_REPEAT_WARN):
+                logger.warning(
+                    f"🔁 {method} {path} - Query executed {times} times in one request "
+                    f"(possible N+1): {' '.join(statement.split())[:200]}"
+                )
         finally:
             request_id_var.reset(token)
 
 
+class ReadReplicaMiddleware:
+    """读写分离中间件：GET/HEAD 请求内的只读查询路由到只读副本，写入后本请求粘滞主库
+
+    缓存回源（BaseCache._load）不受此影响，始终读主库。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+
+        from app.db.routing import replica_reads
+
+        with replica_reads():
+            await self.app(scope, receive, send)
+
+
 def _parse_accept_language(header: str) -> str:
     """Parse Accept-Language header (e.g. 'en-US,zh;q=0.9,ja;q=0.8') and return best matching locale."""
     candidates = []
@@ -196,6 +237,8 @@ def setup_middleware(app):
 
     # 注册中间件 (注意顺序)
     app.add_middleware(LocaleMiddleware)
+    if settings.DATABASE_REPLICA_URL:
+        app.add_middleware(ReadReplicaMiddleware)
     app.add_middleware(RequestLoggingMiddleware)
     app.add_middleware(ErrorHandlingMiddleware)
 
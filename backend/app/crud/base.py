@@ -53,30 +53,84 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return query
 
     async def _cached_get(
-        self, db: AsyncSession, cache_key: str, fetch_fn, ttl: int = 600
+        self,
+        db: AsyncSession,
+        cache_key: str,
+        fetch_fn,
+        ttl: int = 600,
+        tags: list[str] | None = None,
     ) -> ModelType | None:
         """
         缓存安全的查询辅助方法。
         缓存存储 dict（而非 ORM 实例），取出后重建为 ORM 实例并 merge 到当前 session。
+        tags 用于按标签批量失效（cache.invalidate_tags）。
         """
         from app.core.infra.cache import get_cache
 
-        cache = get_cache()
-        cached = await cache.get(cache_key)
+        # 并发缺失时仅一个协程回源；ORM 实例不能跨 session 共享，等待者用 dict 重建
+        fetched = None
+
+        async def load():
+            nonlocal fetched
+            fetched = await fetch_fn()
+            return fetched.to_dict() if fetched is not None else None
 
-        if cached is not None:
-            from sqlalchemy.orm import make_transient_to_detached
+        cached = await get_cache().get_or_set(cache_key, load, ttl=ttl, cache_none=False, tags=tags)
+        if fetched is not None or cached is None:
+            return fetched
 
-            instance = self.model(**cached)
-            make_transient_to_detached(instance)
-            return await db.merge(instance, load=False)
+        return await self._from_cache(db, cached)
 
-        result = await fetch_fn()
+    async def _from_cache(self, db: AsyncSession, data: dict) -> ModelType:
+        """由缓存的 dict 重建 ORM 实例并 merge 到当前 session（不触发查询）"""
+        from sqlalchemy.orm import make_transient_to_detached
 
-        if result is not None:
-            await cache.set(cache_key, result.to_dict(), ttl=ttl)
+        instance = self.model(**data)
+        make_transient_to_detached(instance)
+        return await db.merge(instance, load=False)
 
-        return result
+    async def _cached_get_many(
+        self,
+        db: AsyncSession,
+        ids: list[Any],
+        key_prefix: str,
+        ttl: int = 600,
+        tags: list[str] | None = None,
+    ) -> list[ModelType]:
+        """
+        按主键批量查询的缓存辅助方法，与 _cached_get 共用 "{key_prefix}{id}" 缓存键。
+        一次 get_many 读取全部缓存，未命中的主键合并为一次 IN 查询，再一次 set_many 回写。
+        返回顺序与 ids 一致，不存在的记录被跳过。
+        """
+        from app.core.infra.cache import get_cache
+
+        if not ids:
+            return []
+
+        cache = get_cache()
+        keys = {id: f"{key_prefix}{id}" for id in dict.fromkeys(ids)}
+        cached = await cache.get_many(keys.values())
+
+        found: dict[Any, ModelType] = {}
+        for id, key in keys.items():
+            if key in cached:
+                found[id] = await self._from_cache(db, cached[key])
+
+        missing = [id for id in keys if id not in found]
+        if missing:
+            from app.db.routing import primary_reads
+
+            # 回写缓存的数据读主库，避免把副本上的旧数据缓存整个 TTL
+            with primary_reads():
+                fetched = await CRUDBase.get_multi(self, db, ids=missing)
+            await cache.set_many(
+                {keys[getattr(obj, self.primary_key)]: obj.to_dict() for obj in fetched},
+                ttl=ttl,
+                tags=tags,
+            )
+            found.update((getattr(obj, self.primary_key), obj) for obj in fetched)
+
+        return [found[id] for id in keys if id in found]
 
     async def get(self, db: AsyncSession, id: Any) -> ModelType | None:
         """
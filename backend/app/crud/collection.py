@@ -14,9 +14,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from typing import Any
 
+from sqlalchemy import Boolean, ColumnElement, Select, false, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.visitors import InternalTraversal
 
 from app.crud.base import CRUDBase
 from app.models.collection import Collection
@@ -25,6 +29,60 @@ from app.schemas.collection import CollectionCreate, CollectionUpdate
 # 使用 Ellipsis 常量来区分 "不筛选" 和 "筛选 None"
 _UNSET: Any = ...
 
+COLLECTION_TREE_CACHE_PREFIX = "collection:tree:"
+
+
+def collection_tree_cache_tag(site_id: int) -> str:
+    """站点合集树缓存的失效标签（合集增删改移、文档增删改时失效）"""
+    return f"collection:site:{site_id}"
+
+
+def _path_ids(path: str) -> list[int]:
+    """物化路径 "/1/5/9/" -> [1, 5, 9]（从根到自身）"""
+    return [int(part) for part in path.split("/") if part]
+
+
+class PathHasPrefix(ColumnElement[bool]):
+    """
+    column 以 prefix 开头，编译为 [prefix, prefix 末字符 + 1) 的区间条件
+
+    LIKE 'prefix%' 在 varchar_pattern_ops 索引上只对常量前缀生效；改写为区间后
+    前缀可作为绑定参数。PostgreSQL 需使用与该操作符类匹配的 ~>=~ / ~<~。
+    """
+
+    inherit_cache = True
+    type = Boolean()
+    # 本身即为布尔条件，避免无原生布尔类型的方言追加 "= 1" 导致无法走索引
+    _is_implicitly_boolean = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("lower", InternalTraversal.dp_clauseelement),
+        ("upper", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, prefix: str):
+        self.column = column
+        self.lower = literal(prefix)
+        self.upper = literal(prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+@compiles(PathHasPrefix)
+def _compile_path_has_prefix(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return (
+        f"({column} >= {compiler.process(element.lower, **kw)}"
+        f" AND {column} < {compiler.process(element.upper, **kw)})"
+    )
+
+
+@compiles(PathHasPrefix, "postgresql")
+def _compile_path_has_prefix_pg(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    return (
+        f"({column} ~>=~ {compiler.process(element.lower, **kw)}"
+        f" AND {column} ~<~ {compiler.process(element.upper, **kw)})"
+    )
+
 
 class CRUDCollection(CRUDBase[Collection, CollectionCreate, CollectionUpdate]):
     """合集 CRUD 操作（异步版本）"""
@@ -71,97 +129,107 @@ class CRUDCollection(CRUDBase[Collection, CollectionCreate, CollectionUpdate]):
             parent_id=parent_id,
         )
 
-    async def get_descendant_ids(self, db: AsyncSession, *, collection_id: int) -> list[int]:
-        """递归获取合集及其所有子合集的ID列表（使用 CTE 优化，并支持租户隔离）"""
-        from sqlalchemy import text
+    async def list_tree_nodes(
+        self, db: AsyncSession, *, site_id: int, tenant_id: int | None = None
+    ) -> list:
+        """站点下所有合集的扁平列表（仅树形展示所需列），按 order、id 排序"""
+        query = self._apply_filters(
+            select(self.model.id, self.model.title, self.model.parent_id),
+            site_id=site_id,
+            tenant_id=tenant_id,
+        ).order_by(self.model.order, self.model.id)
+        result = await db.execute(query)
+        return list(result)
 
-        from app.core.infra.tenant import get_current_tenant
+    def subtree_ids_query(self, *, site_id: int, path: str) -> Select:
+        """
+        合集及其所有后代的 ID 查询（可直接用于 IN 过滤）
 
-        tenant_id = get_current_tenant()
-        tenant_filter = "AND tenant_id = :tid" if tenant_id is not None else ""
+        前缀以绑定参数给出并改写为区间条件，可走 ix_collection_path 索引；
+        调用方需先取得合集自身的 site_id 与 path。
+        """
+        # 空路径是任何字符串的前缀，不能参与前缀匹配
+        if not path:
+            return select(self.model.id).where(false())
+        return select(self.model.id).where(
+            self.model.site_id == site_id, PathHasPrefix(self.model.path, path)
+        )
 
-        # 使用 CTE 递归查询，一次 SQL 获取所有后代
-        query = text(f"""
-            WITH RECURSIVE descendants AS (
-                SELECT id FROM collection WHERE id = :collection_id {tenant_filter}
-                UNION ALL
-                SELECT c.id FROM collection c
-                INNER JOIN descendants d ON c.parent_id = d.id
-                WHERE 1=1 {tenant_filter.replace("tenant_id", "c.tenant_id")}
-            )
-            SELECT id FROM descendants
-        """)
+    async def get_subtree_ids_query(self, db: AsyncSession, *, collection_id: int) -> Select:
+        """按主键取得合集路径后构造子树 ID 查询；合集不存在时匹配为空"""
+        result = await db.execute(
+            select(self.model.site_id, self.model.path).where(self.model.id == collection_id)
+        )
+        row = result.first()
+        if row is None:
+            return select(self.model.id).where(false())
+        return self.subtree_ids_query(site_id=row.site_id, path=row.path)
+
+    async def get_descendant_ids(self, db: AsyncSession, *, collection_id: int) -> list[int]:
+        """获取合集及其所有子合集的ID列表（主键查路径 + 路径前缀区间查询）"""
+        query = await self.get_subtree_ids_query(db, collection_id=collection_id)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    def hierarchy_targets_query(self, collection_ids: Iterable[int]) -> Select:
+        """批量祖先链第一步：按主键取目标合集及其物化路径"""
+        return select(self.model.id, self.model.title, self.model.parent_id, self.model.path).where(
+            self.model.id.in_(list(collection_ids))
+        )
 
-        params = {"collection_id": collection_id}
-        if tenant_id is not None:
-            params["tid"] = tenant_id
+    def ancestor_titles_query(self, targets) -> Select | None:
+        """批量祖先链第二步：由目标路径拆出祖先 ID，按主键取标题；无祖先时返回 None"""
+        ancestor_ids = {aid for row in targets for aid in _path_ids(row.path)[:-1]}
+        if not ancestor_ids:
+            return None
+        return select(self.model.id, self.model.title).where(self.model.id.in_(ancestor_ids))
+
+    @staticmethod
+    def _assemble_hierarchy(targets, ancestor_titles) -> dict[int, dict]:
+        titles = dict(ancestor_titles)
+        hierarchy: dict[int, dict] = {}
+        for row in targets:
+            ancestors = [
+                {"id": aid, "title": titles[aid]}
+                for aid in _path_ids(row.path)[:-1]
+                if aid in titles
+            ]
+            hierarchy[row.id] = {
+                "id": row.id,
+                "title": row.title,
+                "parent_id": row.parent_id,
+                "ancestors": ancestors,
+                "path": " > ".join([a["title"] for a in ancestors] + [row.title]),
+            }
+        return hierarchy
+
+    async def get_hierarchy_map(
+        self, db: AsyncSession, *, collection_ids: Iterable[int]
+    ) -> dict[int, dict]:
+        """
+        批量解析合集的祖先链与显示路径（至多两次主键查询，与合集数量无关）
 
-        result = await db.execute(query, params)
-        return [row[0] for row in result.fetchall()]
+        Returns:
+            collection_id -> {id, title, parent_id, ancestors: [{id, title}], path: "A > B > C"}，
+            不存在的合集不在结果中
+        """
+        collection_ids = set(collection_ids)
+        if not collection_ids:
+            return {}
+        targets = (await db.execute(self.hierarchy_targets_query(collection_ids))).all()
+        query = self.ancestor_titles_query(targets)
+        ancestor_titles = (await db.execute(query)).all() if query is not None else []
+        return self._assemble_hierarchy(targets, ancestor_titles)
 
     async def get_path(self, db: AsyncSession, *, collection_id: int) -> str:
-        """获取合集的完整路径（使用 CTE 优化，并支持租户隔离）"""
-        from sqlalchemy import text
-
-        from app.core.infra.tenant import get_current_tenant
-
-        tenant_id = get_current_tenant()
-        tenant_filter = "AND tenant_id = :tid" if tenant_id is not None else ""
-
-        # 使用 CTE 递归查询，一次 SQL 获取整个祖先链
-        query = text(f"""
-            WITH RECURSIVE ancestors AS (
-                SELECT id, title, parent_id, 0 as depth FROM collection
-                WHERE id = :collection_id {tenant_filter}
-                UNION ALL
-                SELECT c.id, c.title, c.parent_id, a.depth + 1 FROM collection c
-                INNER JOIN ancestors a ON c.id = a.parent_id
-                WHERE 1=1 {tenant_filter.replace("tenant_id", "c.tenant_id")}
-            )
-            SELECT title FROM ancestors ORDER BY depth DESC
-        """)
-
-        params = {"collection_id": collection_id}
-        if tenant_id is not None:
-            params["tid"] = tenant_id
-
-        result = await db.execute(query, params)
-        path_parts = [row[0] for row in result.fetchall()]
-        return " > ".join(path_parts)
+        """获取合集的完整路径（基于物化路径）"""
+        hierarchy = await self.get_hierarchy_map(db, collection_ids=[collection_id])
+        return hierarchy[collection_id]["path"] if collection_id in hierarchy else ""
 
     async def get_ancestors(self, db: AsyncSession, *, collection_id: int) -> list[dict]:
-        """获取合集的祖先链（使用 CTE 优化，并支持租户隔离）"""
-        from sqlalchemy import text
-
-        from app.core.infra.tenant import get_current_tenant
-
-        # 先获取当前合集的 parent_id
-        current = await self.get(db, id=collection_id)
-        if not current or not current.parent_id:
-            return []
-
-        tenant_id = get_current_tenant()
-        tenant_filter = "AND tenant_id = :tid" if tenant_id is not None else ""
-
-        # 使用 CTE 递归查询，一次 SQL 获取所有祖先
-        query = text(f"""
-            WITH RECURSIVE ancestors AS (
-                SELECT id, title, parent_id, 0 as depth FROM collection
-                WHERE id = :parent_id {tenant_filter}
-                UNION ALL
-                SELECT c.id, c.title, c.parent_id, a.depth + 1 FROM collection c
-                INNER JOIN ancestors a ON c.id = a.parent_id
-                WHERE 1=1 {tenant_filter.replace("tenant_id", "c.tenant_id")}
-            )
-            SELECT id, title FROM ancestors ORDER BY depth DESC
-        """)
-
-        params = {"parent_id": current.parent_id}
-        if tenant_id is not None:
-            params["tid"] = tenant_id
-
-        result = await db.execute(query, params)
-        return [{"id": row[0], "title": row[1]} for row in result.fetchall()]
+        """获取合集的祖先链，不含自身（基于物化路径）"""
+        hierarchy = await self.get_hierarchy_map(db, collection_ids=[collection_id])
+        return hierarchy[collection_id]["ancestors"] if collection_id in hierarchy else []
 
 
 crud_collection = CRUDCollection(Collection)
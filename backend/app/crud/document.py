@@ -17,7 +17,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import Any
 
-from sqlalchemy import func, or_, select, update
+from sqlalchemy import Select, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, load_only
 
@@ -25,6 +25,14 @@ from app.crud.base import CRUDBase
 from app.models.document import Document, VectorStatus
 from app.schemas.document import DocumentCreate, DocumentUpdate
 
+# 客户端已发布文档详情的缓存键前缀："doc:client:{document_id}"
+DOCUMENT_CLIENT_CACHE_PREFIX = "doc:client:"
+
+
+def document_site_cache_tag(site_id: int) -> str:
+    """站点下客户端文档缓存的失效标签（合集改名/移动会影响其下所有文档的合集路径）"""
+    return f"doc:site:{site_id}"
+
 
 class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
     """文档 CRUD 操作（异步版本）"""
@@ -99,7 +107,7 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         self,
         query,
         site_id: int | None = None,
-        collection_ids: list[int] | None = None,
+        collection_ids: list[int] | Select | None = None,
         status: str | None = None,
         vector_status: str | None = None,
         keyword: str | None = None,
@@ -163,7 +171,7 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         *,
         site_id: int | None = None,
         tenant_id: int | None = None,
-        collection_ids: list[int] | None = None,
+        collection_ids: list[int] | Select | None = None,
         status: str | None = None,
         vector_status: str | None = None,
         keyword: str | None = None,
@@ -218,6 +226,31 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         result = await db.execute(query)
         return list(result.scalars())
 
+    async def list_tree_nodes(
+        self,
+        db: AsyncSession,
+        *,
+        site_id: int,
+        tenant_id: int | None = None,
+        status: str | None = None,
+    ) -> list:
+        """站点下已归入合集的文档（仅树形节点所需列），按创建时间倒序"""
+        query = self._apply_filters(
+            select(
+                self.model.id,
+                self.model.title,
+                self.model.status,
+                self.model.views,
+                self.model.tags,
+                self.model.collection_id,
+            ).where(self.model.collection_id.is_not(None)),
+            site_id=site_id,
+            tenant_id=tenant_id,
+            status=status,
+        ).order_by(self.model.created_at.desc())
+        result = await db.execute(query)
+        return list(result)
+
     async def increment_views(
         self,
         db: AsyncSession,
@@ -234,6 +267,33 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
 
         同时记录浏览事件到 document_view_events 表，用于统计今日浏览和独立访客。
         """
+        await self.record_view(
+            db,
+            document_id=document_id,
+            site_id=site_id,
+            tenant_id=tenant_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            referer=referer,
+            auto_commit=auto_commit,
+        )
+
+        # 返回更新后的文档
+        return await self.get_with_related_site(db, id=document_id)
+
+    async def record_view(
+        self,
+        db: AsyncSession,
+        *,
+        document_id: int,
+        site_id: int | None = None,
+        tenant_id: int | None = None,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        referer: str | None = None,
+        auto_commit: bool = False,
+    ) -> int | None:
+        """累加浏览量并记录浏览事件，返回最新浏览量（文档不存在或不可见时返回 None）"""
         from app.core.infra.tenant import get_current_tenant
         from app.crud.document_view_event import crud_document_view_event
 
@@ -242,8 +302,6 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
 
         # 1. ORM 逻辑：累加 views 字段（ORM 拦截器会自动追加 tenant_id 过滤）
         # 显式设置 updated_at=Document.updated_at 以绕过 onupdate=utc_now 自动更新
-        from sqlalchemy import update
-
         stmt = (
             update(self.model)
             .where(self.model.id == document_id)
@@ -251,11 +309,12 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
                 views=self.model.views + 1,
                 updated_at=self.model.updated_at,
             )
+            .returning(self.model.views)
         )
-        await db.execute(stmt)
+        views = (await db.execute(stmt)).scalar_one_or_none()
 
-        # 2. 新增：记录浏览事件（如果提供了 site_id）
-        if site_id is not None:
+        # 2. 记录浏览事件（如果提供了 site_id 且文档存在）
+        if views is not None and site_id is not None:
             await crud_document_view_event.create(
                 db,
                 document_id=document_id,
@@ -269,8 +328,7 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         elif auto_commit:
             await db.commit()
 
-        # 返回更新后的文档
-        return await self.get_with_related_site(db, id=document_id)
+        return views
 
     async def get_with_related_site(self, db: AsyncSession, id: int) -> Document | None:
         """获取文档及其关联的站点与租户信息（使用预加载优化）"""
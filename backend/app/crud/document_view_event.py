@@ -19,6 +19,7 @@ from datetime import UTC, datetime
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.transaction import on_commit
 from app.models.document_view_event import DocumentViewEvent
 
 
@@ -38,7 +39,9 @@ class CRUDDocumentViewEvent:
         referer: str | None = None,
         auto_commit: bool = False,
     ) -> DocumentViewEvent:
-        """记录一次文档浏览事件（支持租户 ID 自动填充）"""
+        """记录一次文档浏览事件（支持租户 ID 自动填充），事务提交后累加站点浏览量"""
+        from app.services.stats.site_view_counter import record_site_view
+
         event = DocumentViewEvent(
             document_id=document_id,
             site_id=site_id,
@@ -49,11 +52,14 @@ class CRUDDocumentViewEvent:
             referer=referer,
         )
         db.add(event)
+        # 站点列表直接读取 view_count 计数；计数经 Redis 合并后批量写回，避免热点行锁
         if auto_commit:
             await db.commit()
             await db.refresh(event)
+            await record_site_view(site_id)
         else:
             await db.flush()
+            on_commit(db, record_site_view, site_id)
         return event
 
     async def get_views_today(self, db: AsyncSession, *, site_id: int) -> int:
@@ -26,6 +26,9 @@ from app.schemas.site import SiteCreate, SiteUpdate
 
 logger = logging.getLogger(__name__)
 
+# 客户端站点读缓存（激活站点详情/列表）的失效标签，站点增删改后统一失效
+SITE_CLIENT_CACHE_TAG = "site:client"
+
 
 class CRUDSite(CRUDBase[Site, SiteCreate, SiteUpdate]):
     """站点 CRUD 操作（异步版本）"""
@@ -68,6 +71,10 @@ class CRUDSite(CRUDBase[Site, SiteCreate, SiteUpdate]):
 
         return await self._cached_get(db, f"site:id:{id}", _fetch, ttl=600)
 
+    async def get_multi(self, db: AsyncSession, *, ids: list[Any]) -> list[Site]:
+        """根据 ID 列表批量获取 (带缓存，与 get 共用缓存键)"""
+        return await self._cached_get_many(db, ids, "site:id:", ttl=600)
+
     async def get_by_name(self, db: AsyncSession, *, name: str) -> Site | None:
         """根据名称获取站点"""
         result = await db.execute(select(self.model).where(self.model.name == name))
@@ -82,6 +89,28 @@ class CRUDSite(CRUDBase[Site, SiteCreate, SiteUpdate]):
 
         return await self._cached_get(db, f"site:slug:{slug}", _fetch, ttl=600)
 
+    async def resolve_tenant_id(self, db: AsyncSession, *, site_id: int) -> int | None:
+        """根据站点 ID 解析所属租户 ID (仅缓存映射，用于客户端请求设置租户上下文)"""
+        from app.core.infra.cache import get_cache
+
+        async def _fetch():
+            result = await db.execute(select(self.model.tenant_id).where(self.model.id == site_id))
+            return result.scalar_one_or_none()
+
+        return await get_cache().get_or_set(
+            f"site:tenant:{site_id}", _fetch, ttl=3600, cache_none=False
+        )
+
+    async def _clear_cache(self, site_id: int, *slugs: str) -> None:
+        """清理站点缓存及站点 -> 租户映射"""
+        from app.core.infra.cache import get_cache
+
+        cache = get_cache()
+        await cache.delete(f"site:id:{site_id}")
+        await cache.delete(f"site:tenant:{site_id}")
+        for slug in dict.fromkeys(slugs):
+            await cache.delete(f"site:slug:{slug}")
+
     async def update(
         self,
         db: AsyncSession,
@@ -91,17 +120,14 @@ class CRUDSite(CRUDBase[Site, SiteCreate, SiteUpdate]):
         auto_commit: bool = False,
     ) -> Site:
         """更新站点 (重写以处理缓存失效)"""
+        old_slug = db_obj.slug
         # 执行更新
         updated_site = await super().update(
             db, db_obj=db_obj, obj_in=obj_in, auto_commit=auto_commit
         )
 
-        # 清理缓存
-        from app.core.infra.cache import get_cache
-
-        cache = get_cache()
-        await cache.delete(f"site:id:{updated_site.id}")
-        await cache.delete(f"site:slug:{updated_site.slug}")
+        # 清理缓存（slug 变更时同时清理旧 slug）
+        await self._clear_cache(updated_site.id, old_slug, updated_site.slug)
 
         return updated_site
 
@@ -247,11 +273,7 @@ class CRUDSite(CRUDBase[Site, SiteCreate, SiteUpdate]):
             await db.flush()
 
         # 9. 清理缓存
-        from app.core.infra.cache import get_cache
-
-        cache = get_cache()
-        await cache.delete(f"site:id:{id}")
-        await cache.delete(f"site:slug:{site.slug}")
+        await self._clear_cache(id, site.slug)
 
         return True
 
@@ -312,33 +334,12 @@ class CRUDSite(CRUDBase[Site, SiteCreate, SiteUpdate]):
 
         paginator = Paginator(page=page, size=size, total=total, is_pager=is_pager)
 
-        # 查询列表
-        from app.models.document_view_event import DocumentViewEvent
-
-        # 统计浏览量的子查询
-        view_count_subquery = (
-            select(func.count(DocumentViewEvent.id))
-            .where(DocumentViewEvent.site_id == self.model.id)
-            .scalar_subquery()
-            .label("view_count")
-        )
-
-        stmt = (
-            select(self.model, view_count_subquery)
-            .where(*base_filters)
-            .options(joinedload(self.model.tenant))
-        )
+        # 查询列表（浏览量读取 view_count 计数列，浏览事件经 Redis 合并后定时批量累加）
+        stmt = select(self.model).where(*base_filters).options(joinedload(self.model.tenant))
         stmt = stmt.offset(paginator.skip)
         if paginator.size is not None:
             stmt = stmt.limit(paginator.size)
-        result = await db.execute(stmt)
-
-        sites = []
-        for row in result:
-            site_obj = row[0]
-            # 手动将统计结果注入对象，以便 Pydantic 导出
-            setattr(site_obj, "view_count", row[1] or 0)
-            sites.append(site_obj)
+        sites = list((await db.execute(stmt)).scalars().all())
 
         return sites, total
 
@@ -362,7 +363,7 @@ class CRUDSite(CRUDBase[Site, SiteCreate, SiteUpdate]):
             result = await db.execute(stmt)
             return result.scalar_one_or_none()
 
-        return await self._cached_get(db, cache_key, _fetch, ttl=600)
+        return await self._cached_get(db, cache_key, _fetch, ttl=600, tags=[SITE_CLIENT_CACHE_TAG])
 
 
 crud_site = CRUDSite(Site)
@@ -26,6 +26,11 @@ from app.schemas.tenant import TenantCreate, TenantUpdate
 logger = logging.getLogger(__name__)
 
 
+def principal_tenant_tag(tenant_id: Any) -> str:
+    """认证主体缓存中租户状态（是否存在、是否演示租户）的失效标签"""
+    return f"auth:tenant:{tenant_id}"
+
+
 class CRUDTenant(CRUDBase[Tenant, TenantCreate, TenantUpdate]):
     """租户 CRUD 操作"""
 
@@ -50,6 +55,10 @@ class CRUDTenant(CRUDBase[Tenant, TenantCreate, TenantUpdate]):
 
         return await self._cached_get(db, f"tenant:id:{id}", _fetch, ttl=3600)
 
+    async def get_multi(self, db: AsyncSession, *, ids: list[Any]) -> list[Tenant]:
+        """根据 ID 列表批量获取 (带缓存，与 get 共用缓存键)"""
+        return await self._cached_get_many(db, ids, "tenant:id:", ttl=3600)
+
     async def get_by_slug(self, db: AsyncSession, *, slug: str) -> Tenant | None:
         """根据 slug 获取租户 (带缓存)"""
 
@@ -59,6 +68,29 @@ class CRUDTenant(CRUDBase[Tenant, TenantCreate, TenantUpdate]):
 
         return await self._cached_get(db, f"tenant:slug:{slug}", _fetch, ttl=3600)
 
+    async def resolve_id_by_slug(self, db: AsyncSession, *, slug: str) -> int | None:
+        """根据 slug 解析租户 ID (仅缓存映射，用于客户端请求设置租户上下文)"""
+        from app.core.infra.cache import get_cache
+
+        async def _fetch():
+            result = await db.execute(select(Tenant.id).where(Tenant.slug == slug))
+            return result.scalar_one_or_none()
+
+        return await get_cache().get_or_set(
+            f"tenant:resolve:slug:{slug}", _fetch, ttl=3600, cache_none=False
+        )
+
+    async def _clear_cache(self, tenant_id: int, *slugs: str) -> None:
+        """清理租户缓存、slug 映射及认证主体中的租户状态"""
+        from app.core.infra.cache import get_cache
+
+        cache = get_cache()
+        await cache.delete(f"tenant:id:{tenant_id}")
+        for slug in dict.fromkeys(slugs):
+            await cache.delete(f"tenant:slug:{slug}")
+            await cache.delete(f"tenant:resolve:slug:{slug}")
+        await cache.invalidate_tags(principal_tenant_tag(tenant_id))
+
     async def update(
         self,
         db: AsyncSession,
@@ -67,14 +99,11 @@ class CRUDTenant(CRUDBase[Tenant, TenantCreate, TenantUpdate]):
         obj_in: TenantUpdate | dict[str, Any],
         auto_commit: bool = False,
     ) -> Tenant:
-        """更新租户 (带缓存失效)"""
+        """更新租户 (带缓存失效，slug 变更时同时清理旧 slug 的映射)"""
+        old_slug = db_obj.slug
         tenant = await super().update(db, db_obj=db_obj, obj_in=obj_in, auto_commit=auto_commit)
 
-        from app.core.infra.cache import get_cache
-
-        cache = get_cache()
-        await cache.delete(f"tenant:id:{tenant.id}")
-        await cache.delete(f"tenant:slug:{tenant.slug}")
+        await self._clear_cache(tenant.id, old_slug, tenant.slug)
         return tenant
 
     async def remove(self, db: AsyncSession, *, id: int) -> Tenant:
@@ -96,13 +125,11 @@ class CRUDTenant(CRUDBase[Tenant, TenantCreate, TenantUpdate]):
 
         # 3. 清理缓存
         if tenant:
-            from app.core.infra.cache import get_cache
+            await self._clear_cache(tenant.id, tenant.slug)
+            # 同时清理该租户相关的配置缓存（键格式为 config:{section}:tenant:{id}）
+            from app.services.config.configuration_service import configuration_service
 
-            cache = get_cache()
-            await cache.delete(f"tenant:id:{tenant.id}")
-            await cache.delete(f"tenant:slug:{tenant.slug}")
-            # 同时清理该租户相关的配置缓存
-            await cache.delete_by_prefix(f"config:tenant:{tenant.id}")
+            await configuration_service.clear_cache(tenant.id)
 
         return tenant
 
@@ -34,6 +34,11 @@ from app.schemas.user import UserCreate, UserInvite, UserUpdate
 _password_hasher = PasswordHasher()
 
 
+def principal_cache_tag(user_id: Any) -> str:
+    """认证主体缓存（get_current_user）的失效标签，用户信息/状态/角色/密码变更时清理"""
+    return f"auth:user:{user_id}"
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     验证密码
@@ -119,6 +124,15 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
         return query
 
+    async def _clear_cache(self, user_id: Any, email: str) -> None:
+        """清理用户缓存及其认证主体缓存"""
+        from app.core.infra.cache import get_cache
+
+        cache = get_cache()
+        await cache.delete(f"user:id:{user_id}")
+        await cache.delete(f"user:email:{email}")
+        await cache.invalidate_tags(principal_cache_tag(user_id))
+
     async def get(self, db: AsyncSession, id: Any) -> User | None:
         """获取用户 (带缓存)"""
 
@@ -127,6 +141,10 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
         return await self._cached_get(db, f"user:id:{id}", _fetch, ttl=600)
 
+    async def get_multi(self, db: AsyncSession, *, ids: list[Any]) -> list[User]:
+        """根据 ID 列表批量获取 (带缓存，与 get 共用缓存键)"""
+        return await self._cached_get_many(db, ids, "user:id:", ttl=600)
+
     async def get_by_email(self, db: AsyncSession, *, email: str) -> User | None:
         """根据邮箱获取用户 (带缓存)"""
 
@@ -276,14 +294,13 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             if managed_site_ids is not None:
                 db_obj.set_managed_sites(managed_site_ids)
 
-        # 更新并清理缓存
+        # 更新并清理缓存（邮箱变更时同时清理旧邮箱的缓存键）
+        old_email = db_obj.email
         user = await super().update(db, db_obj=db_obj, obj_in=update_data, auto_commit=auto_commit)
 
-        from app.core.infra.cache import get_cache
-
-        cache = get_cache()
-        await cache.delete(f"user:id:{user.id}")
-        await cache.delete(f"user:email:{user.email}")
+        await self._clear_cache(user.id, old_email)
+        if user.email != old_email:
+            await self._clear_cache(user.id, user.email)
         return user
 
     async def update_password(
@@ -299,11 +316,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             await db.flush()
 
         # 清理缓存
-        from app.core.infra.cache import get_cache
-
-        cache = get_cache()
-        await cache.delete(f"user:id:{db_obj.id}")
-        await cache.delete(f"user:email:{db_obj.email}")
+        await self._clear_cache(db_obj.id, db_obj.email)
 
         return db_obj
 
@@ -322,11 +335,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             await db.flush()
 
         # 清理缓存
-        from app.core.infra.cache import get_cache
-
-        cache = get_cache()
-        await cache.delete(f"user:id:{db_obj.id}")
-        await cache.delete(f"user:email:{db_obj.email}")
+        await self._clear_cache(db_obj.id, db_obj.email)
 
         return db_obj, generated_password
 
@@ -350,11 +359,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             # 自动重哈希，由装饰器或调用方决定是否提交
 
             # 清理缓存以保证一致性
-            from app.core.infra.cache import get_cache
-
-            cache = get_cache()
-            await cache.delete(f"user:id:{user.id}")
-            await cache.delete(f"user:email:{user.email}")
+            await self._clear_cache(user.id, user.email)
 
         return user
 
@@ -365,11 +370,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             email = user.email
             res = await super().delete(db, id=id, auto_commit=auto_commit)
             if res:
-                from app.core.infra.cache import get_cache
-
-                cache = get_cache()
-                await cache.delete(f"user:id:{id}")
-                await cache.delete(f"user:email:{email}")
+                await self._clear_cache(id, email)
             return res
         return None
 
@@ -23,25 +23,46 @@ from starlette.exceptions import HTTPException
 from app.core.infra.config import settings
 from app.core.web.exceptions import CatWikiError
 from app.db.events import register_core_db_events
+from app.db.pools import instrumented_pool_class, plan_pools, register_engine_pool
+from app.db.routing import RoutingSession
 
 logger = logging.getLogger(__name__)
 
-# 创建异步数据库引擎
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # 连接前检查连接是否有效
-    pool_size=settings.DB_POOL_SIZE,  # 连接池大小
-    max_overflow=settings.DB_MAX_OVERFLOW,  # 最大溢出连接数
-    pool_timeout=settings.DB_POOL_TIMEOUT,  # 连接超时时间（秒）
-    pool_recycle=settings.DB_POOL_RECYCLE,  # 连接回收时间（秒）
-    echo=settings.DB_ECHO,  # 是否输出 SQL 日志
-    connect_args={"ssl": False},  # 禁用 SSL 连接（解决 Docker 网络中的 conn lost 问题）
+
+def _create_engine(url: str, name: str):
+    """创建异步引擎，连接池规格来自连接预算规划，并登记到连接池统计"""
+    size = plan_pools()["app"]
+    new_engine = create_async_engine(
+        url,
+        poolclass=instrumented_pool_class(name),
+        pool_pre_ping=True,  # 连接前检查连接是否有效
+        pool_size=size.pool_size,  # 连接池大小
+        max_overflow=size.max_overflow,  # 最大溢出连接数
+        pool_timeout=settings.DB_POOL_TIMEOUT,  # 连接超时时间（秒）
+        pool_recycle=settings.DB_POOL_RECYCLE,  # 连接回收时间（秒）
+        echo=settings.DB_ECHO,  # 是否输出 SQL 日志
+        connect_args={"ssl": False},  # 禁用 SSL 连接（解决 Docker 网络中的 conn lost 问题）
+    )
+    register_engine_pool(name, new_engine, size)
+    return new_engine
+
+
+# 创建异步数据库引擎（主库）
+engine = _create_engine(settings.DATABASE_URL, "app")
+
+# 只读副本引擎（可选），路由规则见 app.db.routing
+replica_engine = (
+    _create_engine(settings.DATABASE_REPLICA_URL, "replica")
+    if settings.DATABASE_REPLICA_URL
+    else None
 )
 
 # 创建异步会话工厂
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replica_bind=replica_engine.sync_engine if replica_engine else None,
     autocommit=False,
     autoflush=False,
     expire_on_commit=False,  # 提交后不过期对象
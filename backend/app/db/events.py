@@ -12,57 +12,56 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from sqlalchemy import event, true
+from sqlalchemy import event
 from sqlalchemy.orm import Session, with_loader_criteria
 
 from app.db.base import Base
 
+# 带 tenant_id 列的映射类缓存：(已注册映射数, 类元组)，有新模型注册（如 EE 扩展）时重建
+_tenant_scoped: tuple[int, tuple[type, ...]] = (0, ())
 
-def _tenant_filter_criteria(cls):
-    """
-    租户过滤准则函数（全局具名以支持序列化）
-    """
-    from sqlalchemy import bindparam
 
-    from app.core.infra.tenant import get_current_tenant
+def _tenant_scoped_classes() -> tuple[type, ...]:
+    """返回所有带 tenant_id 列、需要按租户过滤的映射类"""
+    global _tenant_scoped
 
-    tenant_id = get_current_tenant()
-    if tenant_id is not None:
-        if hasattr(cls, "tenant_id"):
-            # 使用 bindparam 确保 tenant_id 作为一个绑定的变量在 SQL 中，
-            # 并通过 execution_options 中的 tenant_id 确保不同租户的 SQL 缓存隔离。
-            return cls.tenant_id == bindparam("current_tenant_id", value=tenant_id)
-    return true()
+    mappers = Base.registry.mappers
+    if _tenant_scoped[0] != len(mappers):
+        classes = tuple(
+            sorted(
+                (m.class_ for m in mappers if "tenant_id" in m.columns),
+                key=lambda cls: cls.__name__,
+            )
+        )
+        _tenant_scoped = (len(mappers), classes)
+    return _tenant_scoped[1]
 
 
 def apply_tenant_filter(execute_state):
     """
     在 ORM 执行前拦截并注入 tenant_id 过滤条件
+
+    过滤准则以 lambda 闭包引用 tenant_id：SQLAlchemy 将闭包变量提取为绑定参数，
+    缓存键只包含 lambda 代码与实体，因此所有租户共用同一份编译后的 SQL，
+    每次执行时再从闭包取当前租户的值，隔离效果与逐租户编译相同。
     """
     from app.core.infra.tenant import get_current_tenant
 
     tenant_id = get_current_tenant()
-    if tenant_id is not None:
-        # 仅对支持 options 的语句注入过滤准则（主要是 ORM 语句）
-        if hasattr(execute_state.statement, "options"):
-            execute_state.statement = execute_state.statement.options(
-                with_loader_criteria(
-                    Base,
-                    _tenant_filter_criteria,
-                    include_aliases=True,
-                )
-            )
-
-        # 核心修复：SQLAlchemy 会缓存带有 with_loader_criteria 的语句。
-        # 由于我们的过滤准则依赖于外部状态 (tenant_id)，必须确保不同租户的语句具有不同的缓存键。
-        # 仅对支持 where 的 Generative 语句（Select, Update, Delete）注入指纹。
-        # 这确保了不同租户生成的 SQL 在缓存中是相互独立的。
-        if hasattr(execute_state.statement, "where"):
-            from sqlalchemy import literal_column
-
-            execute_state.statement = execute_state.statement.where(
-                literal_column(str(tenant_id)) == literal_column(str(tenant_id))
+    # 仅对支持 options 的语句注入过滤准则（主要是 ORM 语句）
+    if tenant_id is None or not hasattr(execute_state.statement, "options"):
+        return
+
+    execute_state.statement = execute_state.statement.options(
+        *(
+            with_loader_criteria(
+                cls,
+                lambda cls: cls.tenant_id == tenant_id,
+                include_aliases=True,
             )
+            for cls in _tenant_scoped_classes()
+        )
+    )
 
 
 @event.listens_for(Base, "before_insert", propagate=True)
@@ -83,4 +82,7 @@ def register_core_db_events():
     Register core database events.
     In Community Edition, this handles basic tenant_id population and filtration (defaulting to 1).
     """
+    from app.db.query_stats import register_query_stats_events
+
     event.listen(Session, "do_orm_execute", apply_tenant_filter)
+    register_query_stats_events()
@@ -0,0 +1,191 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+数据库连接池预算与统计
+
+单个进程对主库的连接来自三类连接池：应用引擎（AsyncSessionLocal）、向量存储、
+LangGraph Checkpointer（psycopg）。
+
+- VECTOR_STORE_SHARE_ENGINE 开启时向量存储直接复用应用引擎，不再单独建池
+- DB_CONNECTION_BUDGET > 0 时各连接池按比例瓜分同一预算（常驻/溢出约 1:2），
+  否则沿用 DB_POOL_SIZE / DB_MAX_OVERFLOW（Checkpointer 固定 2~10）
+
+各连接池的容量、占用、溢出、排队与取连接等待时间通过 pool_stats() 导出，用于容量规划。
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.infra.config import settings
+
+
+@dataclass(frozen=True)
+class PoolSize:
+    """连接池规格：常驻连接数 + 最大溢出连接数（psycopg 池对应 min_size / max_size - min_size）"""
+
+    pool_size: int
+    max_overflow: int
+
+    @property
+    def capacity(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+def _split(share: int) -> PoolSize:
+    pool_size = max(1, share // 3)
+    return PoolSize(pool_size, max(0, share - pool_size))
+
+
+def plan_pools(
+    budget: int | None = None, share_vector_engine: bool | None = None
+) -> dict[str, PoolSize]:
+    """按连接预算规划各连接池规格，返回 {"app", "checkpointer", 以及独立时的 "vector"}"""
+    budget = settings.DB_CONNECTION_BUDGET if budget is None else budget
+    if share_vector_engine is None:
+        share_vector_engine = settings.VECTOR_STORE_SHARE_ENGINE
+
+    if budget <= 0:
+        legacy = PoolSize(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+        plan = {"app": legacy, "checkpointer": PoolSize(2, 8)}
+        if not share_vector_engine:
+            plan["vector"] = legacy
+        return plan
+
+    # Checkpointer 与独立向量池各占约 1/5，其余归应用引擎；每个池至少 2 个连接
+    checkpointer = max(2, budget // 5)
+    vector = 0 if share_vector_engine else max(2, budget // 5)
+    plan = {
+        "app": _split(max(2, budget - checkpointer - vector)),
+        "checkpointer": PoolSize(min(2, checkpointer), checkpointer - min(2, checkpointer)),
+    }
+    if vector:
+        plan["vector"] = _split(vector)
+    return plan
+
+
+@dataclass
+class PoolWaitStats:
+    """取连接等待统计（进程内累计）"""
+
+    waiting: int = 0
+    requests: int = 0
+    timeouts: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        self.requests += 1
+        self.timeouts += timed_out
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+_wait_stats: dict[str, PoolWaitStats] = {}
+_stats_sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def instrumented_pool_class(name: str) -> type[AsyncAdaptedQueuePool]:
+    """返回记录取连接等待时间的连接池类（dispose/recreate 后沿用同一份统计）"""
+    stats = _wait_stats.setdefault(name, PoolWaitStats())
+
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            stats.waiting += 1
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                timed_out = True
+                raise
+            finally:
+                stats.waiting -= 1
+                stats.record(time.perf_counter() - start, timed_out)
+
+    InstrumentedPool.__name__ = f"InstrumentedPool[{name}]"
+    return InstrumentedPool
+
+
+def register_engine_pool(name: str, engine, size: PoolSize) -> None:
+    """登记 SQLAlchemy 引擎的连接池（需使用 instrumented_pool_class(name) 创建）"""
+
+    def _stats() -> dict[str, Any]:
+        pool = engine.pool
+        wait = _wait_stats.get(name, PoolWaitStats())
+        checked_out = pool.checkedout()
+        return {
+            "capacity": size.capacity,
+            "pool_size": size.pool_size,
+            "max_overflow": size.max_overflow,
+            "open": checked_out + pool.checkedin(),
+            "in_use": checked_out,
+            "overflow": max(0, pool.overflow()),
+            "waiting": wait.waiting,
+            "requests": wait.requests,
+            "timeouts": wait.timeouts,
+            "avg_wait_ms": _avg_ms(wait.wait_seconds * 1000, wait.requests),
+            "max_wait_ms": round(wait.max_wait_seconds * 1000, 2),
+        }
+
+    _stats_sources[name] = _stats
+
+
+def register_psycopg_pool(name: str, pool) -> None:
+    """登记 psycopg AsyncConnectionPool（Checkpointer）"""
+
+    def _stats() -> dict[str, Any]:
+        raw = pool.get_stats()
+        open_conns = raw.get("pool_size", 0)
+        requests = raw.get("requests_num", 0)
+        return {
+            "capacity": pool.max_size,
+            "pool_size": pool.min_size,
+            "max_overflow": pool.max_size - pool.min_size,
+            "open": open_conns,
+            "in_use": open_conns - raw.get("pool_available", 0),
+            "overflow": max(0, open_conns - pool.min_size),
+            "waiting": raw.get("requests_waiting", 0),
+            "requests": requests,
+            "timeouts": raw.get("requests_errors", 0),
+            "avg_wait_ms": _avg_ms(raw.get("requests_wait_ms", 0), requests),
+            "max_wait_ms": None,
+        }
+
+    _stats_sources[name] = _stats
+
+
+def unregister_pool(name: str) -> None:
+    _stats_sources.pop(name, None)
+
+
+def _avg_ms(total_ms: float, count: int) -> float:
+    return round(total_ms / count, 2) if count else 0.0
+
+
+def pool_stats() -> dict[str, Any]:
+    """各连接池的实时占用与累计等待统计，以及主库连接总容量"""
+    pools = {name: source() for name, source in _stats_sources.items()}
+    return {
+        "budget": settings.DB_CONNECTION_BUDGET,
+        "vector_store_shares_engine": settings.VECTOR_STORE_SHARE_ENGINE,
+        # 副本位于另一台服务器，不计入主库容量
+        "primary_capacity": sum(p["capacity"] for n, p in pools.items() if n != "replica"),
+        "pools": pools,
+    }
@@ -0,0 +1,92 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+查询统计
+
+在 track_queries() 上下文内统计所有引擎（主库、副本）执行的 SQL 次数与数据库耗时，
+并按 SQL 文本计数：循环中逐条查询（N+1）表现为同一条 SQL 被重复执行多次。
+
+RequestLoggingMiddleware 为每个请求开启统计并写入请求日志；测试中可通过
+assert_max_queries fixture 断言查询次数上限。上下文可以嵌套，内层的查询同时计入外层。
+"""
+
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """一次请求（或测试代码块）内的查询统计"""
+
+    __slots__ = ("count", "seconds", "statements", "parent")
+
+    def __init__(self, parent: "QueryStats | None" = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+        self.parent = parent
+
+    def record(self, statement: str, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """执行次数达到阈值的 SQL（疑似 N+1），按次数降序"""
+        if threshold <= 0:
+            return []
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("db_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """在代码块内统计 SQL 执行次数与耗时"""
+    stats = QueryStats(parent=_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_stats.get() is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    if stats is None:
+        return
+    start = getattr(context, "_query_start", None)
+    stats.record(statement, time.perf_counter() - start if start else 0.0)
+
+
+def register_query_stats_events() -> None:
+    """对所有引擎注册游标执行钩子（未开启统计时仅一次 ContextVar 读取）"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,177 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+读写分离路由
+
+配置只读副本后，AsyncSessionLocal 创建的会话按以下规则选择连接：
+
+1. 只有处于 replica_reads() 上下文（GET/HEAD 请求或只读服务）内的只读查询才会走副本
+2. 写语句（INSERT/UPDATE/DELETE、SELECT ... FOR UPDATE、flush、无法判断读写的原生 SQL）
+   始终走主库，并将当前上下文标记为粘滞：同一请求后续的所有查询（包括其他会话）都回到主库，
+   保证读到自己刚写入的数据
+3. 副本不可达或复制延迟超过 DB_REPLICA_MAX_LAG 时回退主库
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import Engine, Select, TextClause, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.infra.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 副本复制延迟（秒）：非备库（如本地测试用的独立实例）或已回放到最新 WAL 时视为 0
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class RouteState:
+    """单个请求（或只读服务调用）内的路由状态，在该上下文派生的所有会话间共享"""
+
+    __slots__ = ("sticky",)
+
+    def __init__(self):
+        self.sticky = False
+
+
+_route_state: ContextVar[RouteState | None] = ContextVar("db_route_state", default=None)
+
+
+@contextmanager
+def replica_reads() -> Iterator[RouteState]:
+    """在代码块内允许只读查询路由到副本（用于 GET 请求与只读服务）"""
+    state = RouteState()
+    token = _route_state.set(state)
+    try:
+        yield state
+    finally:
+        _route_state.reset(token)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """在代码块内强制所有查询走主库（用于需要强一致读取的 GET 逻辑）"""
+    token = _route_state.set(None)
+    try:
+        yield
+    finally:
+        _route_state.reset(token)
+
+
+def _is_write(clause: Any) -> bool:
+    if clause is None or isinstance(clause, UpdateBase | TextClause):
+        # session.connection() 等未携带语句的取连接、原生 SQL 无法判断读写，保守走主库
+        return True
+    return isinstance(clause, Select) and clause._for_update_arg is not None
+
+
+class ReplicaMonitor:
+    """定期检查副本可达性与复制延迟，决定只读查询是否可以路由到副本"""
+
+    def __init__(self):
+        self.healthy = True
+        self.lag: float | None = None
+        self.error: str | None = None
+        self._task: asyncio.Task | None = None
+
+    def _set_healthy(self, healthy: bool, reason: str = "") -> None:
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("✅ [DB] Read replica recovered, routing reads to replica")
+            else:
+                logger.warning(f"⚠️ [DB] Read replica unavailable ({reason}), reads use primary")
+        self.healthy = healthy
+
+    async def check(self, engine: AsyncEngine) -> None:
+        try:
+            async with engine.connect() as conn:
+                lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0)
+        except Exception as e:
+            self.error = str(e)
+            self._set_healthy(False, f"unreachable: {e}")
+            return
+
+        self.lag, self.error = lag, None
+        max_lag = settings.DB_REPLICA_MAX_LAG
+        if max_lag > 0 and lag > max_lag:
+            self._set_healthy(False, f"lag {lag:.1f}s > {max_lag}s")
+        else:
+            self._set_healthy(True)
+
+    async def _run(self, engine: AsyncEngine) -> None:
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_INTERVAL)
+            await self.check(engine)
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """立即检查一次，再启动后台巡检"""
+        await self.check(engine)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(engine))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "status": "healthy" if self.healthy else "unhealthy",
+            "lag_seconds": self.lag,
+            "max_lag_seconds": settings.DB_REPLICA_MAX_LAG,
+            "error": self.error,
+        }
+
+
+replica_monitor = ReplicaMonitor()
+
+
+class RoutingSession(Session):
+    """按语句类型与路由上下文在主库与只读副本之间选择连接"""
+
+    def __init__(self, *args: Any, replica_bind: Engine | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        state = _route_state.get()
+        if self.replica_bind is None or state is None or state.sticky:
+            return primary
+        if self._flushing or _is_write(clause):
+            state.sticky = True
+            return primary
+        if not replica_monitor.healthy:
+            return primary
+        return self.replica_bind
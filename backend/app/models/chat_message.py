@@ -14,7 +14,7 @@
 
 """Chat Message Model - 聊天记录全量存储表"""
 
-from sqlalchemy import JSON, Column, ForeignKey, String, Text
+from sqlalchemy import JSON, Column, ForeignKey, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel
@@ -52,6 +52,12 @@ class ChatMessage(BaseModel):
     # 扩展信息 (如引用来源、Token 统计、节点信息等)
     additional_kwargs = Column(JSON, nullable=True)
 
+    # 异步落库的轮次 ID 与轮内序号：重复投递同一轮次时按唯一约束跳过已写入的消息
+    turn_id = Column(String(64), nullable=True)
+    turn_seq = Column(Integer, nullable=True)
+
+    __table_args__ = (UniqueConstraint("turn_id", "turn_seq", name="uq_chat_messages_turn"),)
+
     # 关联关系
     session = relationship(
         "ChatSession",
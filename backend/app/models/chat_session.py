@@ -54,6 +54,9 @@ class ChatSession(BaseModel):
     # 消息统计
     message_count = Column(Integer, default=0)
 
+    # 最近一次写入的助手轮次 ID（异步落库重试时避免重复计数）
+    last_turn_id = Column(String(64), nullable=True)
+
     # 关联消息 (用于级联删除)
     messages = relationship(
         "ChatMessage",
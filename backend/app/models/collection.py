@@ -12,14 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Index, Integer, String, event, func, literal, select, update
+from sqlalchemy.orm import object_session, relationship
+from sqlalchemy.orm.attributes import get_history, set_committed_value
 
 from app.models.base import BaseModel
 
 
 class Collection(BaseModel):
-    """文档合集模型"""
+    """文档合集模型
+
+    path 为物化路径：根到自身的合集 ID 链，如 "/1/5/12/"。祖先即路径前缀，
+    后代即以自身路径为前缀的合集，均可通过 ix_collection_path 一次索引查询得到。
+    路径在插入、修改 parent_id 时由下方的映射器事件自动维护（含整棵子树）。
+    """
+
+    __table_args__ = (
+        Index("ix_collection_path", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
+    )
 
     # 多租户
     tenant_id = Column(Integer, nullable=False, index=True, comment="所属租户ID")
@@ -28,6 +38,7 @@ class Collection(BaseModel):
     site_id = Column(Integer, nullable=False, index=True, comment="所属站点ID")
     parent_id = Column(Integer, nullable=True, index=True, comment="父合集ID")
     order = Column(Integer, default=0, nullable=False, comment="排序")
+    path = Column(String(1000), default="", server_default="", nullable=False, comment="物化路径")
 
     # 关联（不使用外键约束，手动指定 foreign_keys 和 primaryjoin）
     site = relationship(
@@ -47,3 +58,47 @@ class Collection(BaseModel):
 
     def __repr__(self) -> str:
         return f"<Collection(id={self.id}, title='{self.title}')>"
+
+
+def _parent_path(connection, parent_id: int | None) -> str:
+    if parent_id is None:
+        return "/"
+    table = Collection.__table__
+    return connection.scalar(select(table.c.path).where(table.c.id == parent_id)) or "/"
+
+
+@event.listens_for(Collection, "after_insert")
+def _set_path_on_insert(mapper, connection, target):
+    """插入后按父合集路径生成自身路径"""
+    path = f"{_parent_path(connection, target.parent_id)}{target.id}/"
+    table = Collection.__table__
+    connection.execute(update(table).where(table.c.id == target.id).values(path=path))
+    set_committed_value(target, "path", path)
+
+
+@event.listens_for(Collection, "after_update")
+def _move_subtree_path(mapper, connection, target):
+    """parent_id 变化时整体替换自身及所有后代的路径前缀"""
+    if not get_history(target, "parent_id").has_changes():
+        return
+
+    table = Collection.__table__
+    # 以数据库中的当前路径为准：同一次刷新前祖先或自身已移动过时，内存中的 path 可能已过期
+    old_path = connection.scalar(select(table.c.path).where(table.c.id == target.id))
+    new_path = f"{_parent_path(connection, target.parent_id)}{target.id}/"
+    if not old_path or old_path == new_path:
+        return
+
+    connection.execute(
+        update(table)
+        .where(table.c.path.startswith(old_path))
+        .values(path=literal(new_path) + func.substr(table.c.path, len(old_path) + 1))
+    )
+
+    # 同步会话中已加载的子树成员，后续的环路校验与再次移动读到的都是新路径
+    session = object_session(target)
+    for obj in list(session.identity_map.values()) if session else ():
+        path = obj.__dict__.get("path") if isinstance(obj, Collection) else None
+        if path and path.startswith(old_path):
+            set_committed_value(obj, "path", new_path + path[len(old_path) :])
+    set_committed_value(target, "path", new_path)
@@ -34,6 +34,13 @@ class Site(BaseModel):
         String(20), default="active", nullable=False, comment="状态: active(激活), disabled(禁用)"
     )
     article_count = Column(Integer, default=0, nullable=False, comment="文章数量")
+    view_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="累计浏览量（随浏览事件累加）",
+    )
     theme_color = Column(String(50), nullable=True, default="blue", comment="主题色")
     layout_mode = Column(
         String(20), nullable=True, default="sidebar", comment="布局模式: sidebar, top"
@@ -0,0 +1,262 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+聊天准入控制 (Admission Control)
+
+限制单个进程同时执行的 Agent 推理数量（全局 + 单租户），超出上限的请求进入短暂的有界等待队列；
+队列已满或等待超时则立即返回 429 + Retry-After，避免单个租户的流量尖峰耗尽
+数据库连接池、Checkpointer 连接池和模型供应商配额。
+
+默认关闭（CHAT_ADMISSION_ENABLED=false）：关闭时仍统计并发数，但不排队也不拒绝。
+上限应按压测得到的实际推理容量设置后再开启。
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable
+
+from fastapi.responses import StreamingResponse
+
+from app.core.common.i18n import _
+from app.core.infra.config import settings
+from app.core.web.exceptions import TooManyRequestsException
+
+logger = logging.getLogger(__name__)
+
+
+class _LeasedStreamingResponse(StreamingResponse):
+    """持有准入名额的流式响应：ASGI 调用结束（正常结束、客户端断开、异常）时释放名额"""
+
+    _lease: "AdmissionLease"
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._lease.release()
+
+
+class AdmissionLease:
+    """准入名额：推理结束（含流式响应结束/客户端断开）后必须释放，重复释放无副作用
+
+    可作为异步上下文管理器使用（退出时释放），或由 hold() 绑定到响应的生命周期。
+    """
+
+    def __init__(self, controller: "ChatAdmissionController", tenant_id: int | None):
+        self._controller = controller
+        self._tenant_id = tenant_id
+        self._acquired_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self._tenant_id, time.monotonic() - self._acquired_at)
+
+    async def __aenter__(self) -> "AdmissionLease":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    async def _guard(self, stream: AsyncIterable) -> AsyncGenerator:
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            self.release()
+
+    async def hold(self, pending: Awaitable):
+        """在整个推理期间持有名额：普通响应返回即释放，流式响应在发送结束时释放
+
+        流式响应即使从未开始迭代（如客户端在首包前断开），ASGI 调用结束时同样会释放；
+        直接消费 body_iterator 的调用方在迭代结束时释放。
+        """
+        try:
+            response = await pending
+        except BaseException:
+            self.release()
+            raise
+
+        if not isinstance(response, StreamingResponse):
+            self.release()
+            return response
+
+        leased = _LeasedStreamingResponse.__new__(_LeasedStreamingResponse)
+        leased.__dict__.update(response.__dict__)
+        leased._lease = self
+        leased.body_iterator = self._guard(response.body_iterator)
+        return leased
+
+
+class ChatAdmissionController:
+    """全局 + 单租户并发上限，配合 FIFO 有界等待队列"""
+
+    def __init__(
+        self,
+        max_concurrent: int | None = None,
+        max_per_tenant: int | None = None,
+        max_queue: int | None = None,
+        wait_timeout: float | None = None,
+        enabled: bool | None = None,
+    ):
+        self.enabled = settings.CHAT_ADMISSION_ENABLED if enabled is None else enabled
+        self.max_concurrent = max_concurrent or settings.CHAT_MAX_CONCURRENT
+        self.max_per_tenant = max_per_tenant or settings.CHAT_MAX_CONCURRENT_PER_TENANT
+        self.max_queue = settings.CHAT_ADMISSION_QUEUE_SIZE if max_queue is None else max_queue
+        self.wait_timeout = wait_timeout or settings.CHAT_ADMISSION_WAIT_TIMEOUT
+
+        self._active = 0
+        self._active_by_tenant: dict[int | None, int] = {}
+        self._queue: deque[tuple[int | None, asyncio.Future]] = deque()
+
+        # 指标
+        self._admitted = 0
+        self._queued = 0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+        self._peak_queue_depth = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._avg_run_seconds: float | None = None
+
+    def _has_capacity(self, tenant_id: int | None) -> bool:
+        return (
+            self._active < self.max_concurrent
+            and self._active_by_tenant.get(tenant_id, 0) < self.max_per_tenant
+        )
+
+    def _grant(self, tenant_id: int | None) -> None:
+        self._active += 1
+        self._active_by_tenant[tenant_id] = self._active_by_tenant.get(tenant_id, 0) + 1
+        self._admitted += 1
+
+    def _release(self, tenant_id: int | None, run_seconds: float) -> None:
+        self._active -= 1
+        remaining = self._active_by_tenant.get(tenant_id, 1) - 1
+        if remaining > 0:
+            self._active_by_tenant[tenant_id] = remaining
+        else:
+            self._active_by_tenant.pop(tenant_id, None)
+
+        # 指数滑动平均，用于估算 Retry-After
+        if self._avg_run_seconds is None:
+            self._avg_run_seconds = run_seconds
+        else:
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * run_seconds
+
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """按 FIFO 唤醒可运行的等待者；已达租户上限的等待者不阻塞其他租户"""
+        for waiter in list(self._queue):
+            if self._active >= self.max_concurrent:
+                break
+            tenant_id, future = waiter
+            if future.done():
+                self._queue.remove(waiter)
+                continue
+            if self._active_by_tenant.get(tenant_id, 0) < self.max_per_tenant:
+                self._queue.remove(waiter)
+                self._grant(tenant_id)
+                future.set_result(None)
+
+    def retry_after(self) -> int:
+        """估算建议的重试间隔（秒）"""
+        avg_run = self._avg_run_seconds or self.wait_timeout
+        estimate = avg_run * (len(self._queue) + 1) / self.max_concurrent
+        return max(1, min(30, math.ceil(estimate)))
+
+    def _reject(self, tenant_id: int | None, reason: str) -> TooManyRequestsException:
+        retry_after = self.retry_after()
+        logger.warning(
+            f"🚦 [Admission] Rejected chat for tenant={tenant_id} ({reason}), "
+            f"active={self._active}, queued={len(self._queue)}, retry_after={retry_after}s"
+        )
+        return TooManyRequestsException(
+            detail=_("chat.overloaded", retry_after=retry_after), retry_after=retry_after
+        )
+
+    def _record_wait(self, waited: float) -> None:
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    async def acquire(self, tenant_id: int | None) -> AdmissionLease:
+        """申请准入名额；队列已满或等待超时抛出 TooManyRequestsException (429)"""
+        if not self.enabled or self._has_capacity(tenant_id):
+            self._grant(tenant_id)
+            return AdmissionLease(self, tenant_id)
+
+        if len(self._queue) >= self.max_queue:
+            self._rejected_queue_full += 1
+            raise self._reject(tenant_id, "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (tenant_id, future)
+        self._queue.append(waiter)
+        self._queued += 1
+        self._peak_queue_depth = max(self._peak_queue_depth, len(self._queue))
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait({future}, timeout=self.wait_timeout)
+        except BaseException:
+            # 等待期间请求被取消（如客户端断开）：已获名额则归还，否则退出队列
+            if future.done() and not future.cancelled():
+                self._release(tenant_id, 0.0)
+            elif waiter in self._queue:
+                self._queue.remove(waiter)
+            raise
+        finally:
+            self._record_wait(time.monotonic() - start)
+
+        if future.done():
+            return AdmissionLease(self, tenant_id)
+
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+        future.cancel()
+        self._rejected_timeout += 1
+        raise self._reject(tenant_id, "wait timeout")
+
+    def stats(self) -> dict:
+        waits = self._queued
+        return {
+            "active": self._active,
+            "active_by_tenant": {str(k): v for k, v in self._active_by_tenant.items()},
+            "queue_depth": len(self._queue),
+            "peak_queue_depth": self._peak_queue_depth,
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_timeout": self._rejected_timeout,
+            "avg_wait_ms": round(self._total_wait / waits * 1000, 2) if waits else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+            "limits": {
+                "enabled": self.enabled,
+                "max_concurrent": self.max_concurrent,
+                "max_per_tenant": self.max_per_tenant,
+                "max_queue": self.max_queue,
+                "wait_timeout": self.wait_timeout,
+            },
+        }
+
+
+# 全局单例
+chat_admission = ChatAdmissionController()
@@ -20,9 +20,9 @@ import uuid
 from collections.abc import AsyncGenerator
 from typing import Literal
 
-from fastapi import BackgroundTasks, Depends
+from fastapi import Depends
 from fastapi.responses import StreamingResponse
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -36,7 +36,7 @@ from app.core.vector.rag_utils import (
     extract_sources_from_messages,
 )
 from app.crud.site import crud_site
-from app.db.database import AsyncSessionLocal, get_db
+from app.db.database import get_db
 from app.db.transaction import transactional
 from app.schemas.chat import (
     ChatCompletionChoice,
@@ -47,8 +47,11 @@ from app.schemas.chat import (
     ChatCompletionResponse,
     ChatMessage,
 )
+from app.services.chat.admission import AdmissionLease, chat_admission
 from app.services.chat.history_service import ChatHistoryService, get_chat_history_service
 from app.services.chat.session_service import ChatSessionService, get_chat_session_service
+from app.services.chat.single_flight import SharedGeneration, chat_single_flight
+from app.services.chat.turn_writer import chat_turn_writer
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +66,10 @@ class ChatService:
         self.db = db
         self.session_service = session_service
         self.history_service = history_service
+        # 上下文初始化开始时间，用于统计端到端首字延迟 (TTFT)
+        self._context_started_at: float | None = None
+        # 最近一次 generate_chat_chunks 结束时的 Graph 最终状态
+        self._final_state_values: dict | None = None
 
     def _guard_channel_policy(
         self,
@@ -176,6 +183,10 @@ class ChatService:
             )
         return tool_calls
 
+    async def _save_turn(self, thread_id: str, messages: list[BaseMessage], content: str) -> None:
+        """提交一轮对话到异步落库队列 (Write-Behind)，不阻塞响应结束"""
+        await chat_turn_writer.submit(thread_id, messages, content)
+
     async def generate_chat_chunks(
         self,
         graph,
@@ -183,7 +194,6 @@ class ChatService:
         config: dict,
         model_name: str,
         thread_id: str,
-        background_tasks: BackgroundTasks,
         include_internal_events: bool = True,
         emit_openai_tool_chunks: bool | None = None,
         suppress_intermediate_tool_text: bool | None = None,
@@ -194,6 +204,9 @@ class ChatService:
         rag_stats_var.set({})
 
         turn_start_time = time.time()
+        stream_started_at = time.perf_counter()
+        first_token_logged = False
+        final_values: dict | None = None
         full_response = ""
         sources = []
         chunk_id_prefix = f"chatcmpl-{uuid.uuid4()}"
@@ -231,6 +244,10 @@ class ChatService:
                         hasattr(chunk_data, "tool_call_chunks") and chunk_data.tool_call_chunks
                     )
 
+                    if not first_token_logged and (chunk_data.content or has_tool_call_chunks):
+                        first_token_logged = True
+                        self._log_ttft(stream_started_at, model_name, thread_id)
+
                     # (1) 发送工具调用增量 (Tool Call Deltas)
                     if (
                         has_tool_call_chunks
@@ -314,13 +331,23 @@ class ChatService:
                     if include_internal_events:
                         yield {"status": "tool_completed", "tool": name}
 
-            # 3. 异步更新数据库记录 (改为传参模式，避免背景任务中连接已关闭)
+                # 3. 根图结束事件携带最终状态，省去流结束后再查一次 Checkpointer
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    output = event.get("data", {}).get("output")
+                    if isinstance(output, dict):
+                        final_values = output
+
+            # 4. 提取最终回复与引用 (未捕获到最终状态时回退查询 Checkpointer)
             final_messages = []
             persistent_content = full_response
 
-            state_snapshot = await graph.aget_state(config)
-            if state_snapshot.values:
-                final_messages = state_snapshot.values.get("messages", [])
+            if final_values is None:
+                state_snapshot = await graph.aget_state(config)
+                final_values = state_snapshot.values or None
+            self._final_state_values = final_values
+
+            if final_values:
+                final_messages = final_values.get("messages", [])
                 sources = extract_sources_from_messages(final_messages, from_last_turn=True)
 
                 # 提取助手最后的文本回复
@@ -366,25 +393,8 @@ class ChatService:
                 finish_reason="stop",
             )
 
-            async def save_history_task(msgs, content):
-                async with AsyncSessionLocal() as db:
-                    # 在背景任务中创建新的 Service 实例，因为主请求的 session 可能会关闭
-                    from app.services.chat.history_service import ChatHistoryService
-                    from app.services.chat.session_service import ChatSessionService
-
-                    bg_session_service = ChatSessionService(db)
-                    bg_history_service = ChatHistoryService(db)
-
-                    if content:
-                        await bg_session_service.update_assistant_response(
-                            thread_id=thread_id, assistant_message=content
-                        )
-                    if msgs:
-                        await bg_history_service.save_history_from_messages(
-                            thread_id=thread_id, messages=msgs
-                        )
-
-            background_tasks.add_task(save_history_task, final_messages, persistent_content)
+            # 5. 异步落库 (Write-Behind)：立即返回，最终帧与 [DONE] 不等待写库
+            await self._save_turn(thread_id, final_messages, persistent_content)
 
             # 💡 [亮点] 在一次对话回合的所有事件结束后，打印最终的 Pipeline 汇总卡片
             # 这符合用户“在最后面”的预期，且能提供更完整的数据视角
@@ -440,6 +450,24 @@ class ChatService:
                 ],
             )
 
+    def _log_ttft(self, stream_started_at: float, model_name: str, thread_id: str) -> None:
+        """记录首个模型 token 的延迟：端到端 (含上下文初始化) 与纯推理两部分"""
+        now = time.perf_counter()
+        stream_ms = (now - stream_started_at) * 1000
+        if self._context_started_at is not None:
+            total_ms = (now - self._context_started_at) * 1000
+            context_ms = total_ms - stream_ms
+            logger.info(
+                f"⚡ [ChatService] TTFT {total_ms:.0f}ms "
+                f"(context {context_ms:.0f}ms + model {stream_ms:.0f}ms) "
+                f"model={model_name} thread={thread_id}"
+            )
+        else:
+            logger.info(
+                f"⚡ [ChatService] TTFT {stream_ms:.0f}ms (model only) "
+                f"model={model_name} thread={thread_id}"
+            )
+
     async def stream_graph_events(
         self,
         graph,
@@ -447,7 +475,6 @@ class ChatService:
         config: dict,
         model_name: str,
         thread_id: str,
-        background_tasks: BackgroundTasks,
         include_internal_events: bool = True,
         emit_openai_tool_chunks: bool | None = None,
         suppress_intermediate_tool_text: bool | None = None,
@@ -460,7 +487,6 @@ class ChatService:
             config,
             model_name,
             thread_id,
-            background_tasks,
             include_internal_events=include_internal_events,
             emit_openai_tool_chunks=emit_openai_tool_chunks,
             suppress_intermediate_tool_text=suppress_intermediate_tool_text,
@@ -487,7 +513,11 @@ class ChatService:
     ) -> tuple[ChatOpenAI, dict, dict, int | None]:
         """
         初始化聊天上下文：解析租户、构建 LLM、持久化首条消息并准备 Graph 状态。
+
+        站点解析完成后，AI 栈日志、LLM 解析（配置带缓存）与会话持久化互不依赖，并发执行。
         """
+        self._context_started_at = time.perf_counter()
+
         # 1. 确定 thread_id (会话识别)
         # 如果没有显式传 thread_id，尝试将 user 字段映射为线索，否则生成 UUID
         if not thread_id:
@@ -495,11 +525,6 @@ class ChatService:
                 user_id if (user_id and len(user_id) > 5) else f"auto-{uuid.uuid4().hex[:12]}"
             )
 
-        from langchain_core.messages import (
-            AIMessage,
-            SystemMessage,
-        )
-
         # 2. 识别用户输入
         input_message = ""
         context_messages = []
@@ -523,7 +548,7 @@ class ChatService:
             input_message = message or ""
             context_messages = [HumanMessage(content=input_message)]
 
-        # 3. 解析 site_id 和 tenant_id
+        # 3. 解析 site_id 和 tenant_id (站点读取带缓存)
         resolved_tenant_id = tenant_id  # 默认为传入参数
         if site_id:
             site = await crud_site.get(self.db, id=site_id)
@@ -537,52 +562,201 @@ class ChatService:
 
         set_current_tenant(tenant_id)
 
-        # 4. [✨ 亮点] 打印全量 AI 栈配置快照 (Session 级别一次性打印，放在模型初始化前)
-        from app.core.infra.config_resolver import ConfigResolver
+        # 4-6. 并发执行互不依赖的步骤：
+        #   - AI 栈快照日志 (带缓存，仅在配置版本变化时打印)、LLM 解析：各自使用独立 Session
+        #   - 会话/历史持久化：使用当前请求 Session (仅此一处使用，避免并发共享 Session)
+        from app.services.config.configuration_service import configuration_service
+
+        results = await asyncio.gather(
+            configuration_service.log_ai_stack(tenant_id=tenant_id),
+            llm_manager.get_model(
+                tenant_id=tenant_id,
+                model_name=model_name,
+                temperature=temperature,
+                purpose="初始化推理引擎",
+            ),
+            self._persist_user_message(
+                thread_id=thread_id,
+                site_id=site_id,
+                input_message=input_message,
+                user_id=user_id,
+                tenant_id=tenant_id,
+            ),
+            return_exceptions=True,
+        )
+        # 等全部步骤结束后再抛出异常，避免事务回滚时仍有步骤在使用 Session
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        _, llm, first_turn = results
 
-        await ConfigResolver.log_ai_stack(tenant_id=tenant_id)
+        # 7. 准备 Graph 初始状态
+        initial_state = {
+            "messages": context_messages,
+            "site_id": site_id,
+            "iteration_count": 0,
+            "consecutive_empty_count": 0,
+        }
+        config = {
+            "configurable": {"thread_id": thread_id, "site_id": site_id, "tenant_id": tenant_id},
+            "metadata": {"first_turn": first_turn},
+        }
 
-        # 5. 初始化 LLM (可能会触发详细的 Config Card 日志)
-        llm = await llm_manager.get_model(
-            tenant_id=tenant_id,
-            model_name=model_name,
-            temperature=temperature,
-            purpose="初始化推理引擎",
+        logger.debug(
+            f"⏱️ [ChatService] Context ready in "
+            f"{(time.perf_counter() - self._context_started_at) * 1000:.0f}ms (thread={thread_id})"
         )
+        return llm, initial_state, config, tenant_id
 
-        # 6. 持久化 (如果这是该 thread 的新消息)
+    async def _persist_user_message(
+        self,
+        thread_id: str,
+        site_id: int,
+        input_message: str,
+        user_id: str | None,
+        tenant_id: int | None,
+    ) -> bool:
+        """持久化用户消息（失败仅记录日志），返回是否为该会话的首轮消息"""
+        first_turn = False
         try:
-            await self.session_service.create_or_update(
+            session = await self.session_service.create_or_update(
                 thread_id=thread_id,
                 site_id=site_id,
                 user_message=input_message,
                 member_id=user_id,
                 tenant_id=tenant_id,
             )
+            first_turn = session.message_count == 1
             # 仅保存最后一条用户输入到我们的历史表
             await self.history_service.save_message(
                 thread_id=thread_id, role="user", content=input_message
             )
         except Exception as e:
             logger.error(f"❌ [ChatService] Failed to persist chat session: {e}")
+        return first_turn
 
-        # 6. 准备 Graph 初始状态
-        initial_state = {
-            "messages": context_messages,
-            "site_id": site_id,
-            "iteration_count": 0,
-            "consecutive_empty_count": 0,
-        }
-        config = {
-            "configurable": {"thread_id": thread_id, "site_id": site_id, "tenant_id": tenant_id}
-        }
+    async def acquire_admission(self, site_id: int, tenant_id: int | None = None) -> AdmissionLease:
+        """申请推理准入名额，按站点所属租户计数（站点读取走缓存）；过载时抛出 429"""
+        if site_id:
+            site = await crud_site.get(self.db, id=site_id)
+            if site:
+                tenant_id = site.tenant_id
+        return await chat_admission.acquire(tenant_id)
 
-        return llm, initial_state, config, tenant_id
+    def _single_flight_key(
+        self,
+        *,
+        llm: ChatOpenAI,
+        initial_state: dict,
+        config: dict,
+        stream_flags: tuple,
+    ) -> str | None:
+        """计算 Single-Flight 合并键；仅无状态/首轮问题可合并，否则返回 None"""
+        if not settings.CHAT_SINGLE_FLIGHT_ENABLED:
+            return None
+        if not config.get("metadata", {}).get("first_turn"):
+            return None
+
+        messages = initial_state.get("messages", [])
+        # 客户端自带历史（assistant 轮次）时上下文各不相同，不参与合并
+        if any(not isinstance(m, HumanMessage | SystemMessage) for m in messages):
+            return None
+        questions = [m.content for m in messages if isinstance(m, HumanMessage)]
+        if len(questions) != 1 or not questions[0]:
+            return None
+
+        system_prompt = "\n".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+        # 模型配置取自公开字段：供应商地址 + 模型 + 温度 + 额外请求参数
+        extra_body = json.dumps(llm.extra_body or {}, sort_keys=True, default=str)
+        model_config = (
+            f"{llm.openai_api_base or ''}:{llm.model_name}:{llm.temperature}:"
+            f"{extra_body}:{stream_flags}"
+        )
+        configurable = config["configurable"]
+        return chat_single_flight.build_key(
+            site_id=configurable["site_id"],
+            tenant_id=configurable["tenant_id"],
+            question=str(questions[0]),
+            system_prompt=system_prompt,
+            model_config=model_config,
+        )
+
+    async def _adopt_shared_turn(self, thread_id: str, flight: SharedGeneration) -> None:
+        """跟随者：与领跑者相同，经落库队列写入本轮历史，并以共享生成的最终状态初始化会话线程"""
+        values = flight.final_values
+        if not values:
+            return
+        messages = values.get("messages", [])
+        content = next(
+            (m.content for m in reversed(messages) if isinstance(m, AIMessage) and m.content),
+            "",
+        )
+        await chat_turn_writer.submit(
+            thread_id,
+            messages,
+            content,
+            seed_state={k: v for k, v in values.items() if k != "messages"},
+        )
+
+    async def _shared_chat_chunks(
+        self,
+        flight_key: str,
+        llm: ChatOpenAI,
+        initial_state: dict,
+        config: dict,
+        thread_id: str,
+        **stream_kwargs,
+    ) -> AsyncGenerator[ChatCompletionChunk | dict, None]:
+        """Single-Flight 生成：领跑者驱动一次生成，跟随者订阅并回放同一输出"""
+
+        async def producer(flight: SharedGeneration):
+            async with get_checkpointer() as cp:
+                graph = create_agent_graph(checkpointer=cp, model=llm)
+                async for chunk in self.generate_chat_chunks(
+                    graph,
+                    initial_state,
+                    config,
+                    llm.model_name,
+                    thread_id,
+                    **stream_kwargs,
+                ):
+                    yield chunk
+                flight.final_values = self._final_state_values
+
+        flight, is_leader = chat_single_flight.join(flight_key, producer)
+        try:
+            async for chunk in flight.follow():
+                yield chunk
+        except Exception as e:
+            yield ChatCompletionChunk(
+                id=f"error-{uuid.uuid4()}",
+                model=llm.model_name,
+                choices=[
+                    ChatCompletionChunkChoice(
+                        index=0,
+                        delta=ChatCompletionChunkDelta(content=f"\n\n[System Error: {str(e)}]"),
+                        finish_reason="stop",
+                    )
+                ],
+            )
+            return
+
+        if not is_leader:
+            await self._adopt_shared_turn(thread_id, flight)
+
+    async def _stream_shared_generation(self, *args, **kwargs) -> AsyncGenerator[str, None]:
+        """Single-Flight 流式输出 - 包装 _shared_chat_chunks 并序列化为 SSE 格式"""
+        async for chunk in self._shared_chat_chunks(*args, **kwargs):
+            if isinstance(chunk, ChatCompletionChunk):
+                yield f"data: {chunk.model_dump_json()}\n\n"
+            else:
+                yield f"data: {json.dumps(chunk)}\n\n"
+
+        yield "data: [DONE]\n\n"
 
     async def process_chat_request(
         self,
         request: ChatCompletionRequest,
-        background_tasks: BackgroundTasks,
         channel: Literal["internal", "bot"] = "internal",
         include_internal_events: bool = True,
         emit_openai_tool_chunks: bool | None = None,
@@ -590,8 +764,6 @@ class ChatService:
         emit_tool_status_text: bool = False,
     ) -> ChatCompletionResponse | StreamingResponse:
         """核心聊天处理逻辑 (ReAct Agent)"""
-        from app.core.web.exceptions import CatWikiError
-
         self._guard_channel_policy(
             channel=channel,
             emit_tool_status_text=emit_tool_status_text,
@@ -601,6 +773,32 @@ class ChatService:
         site_id = request.filter.site_id if (request.filter and request.filter.site_id) else 0
         tenant_id_val = request.filter.tenant_id if request.filter else None
 
+        lease = await self.acquire_admission(site_id, tenant_id_val)
+        return await lease.hold(
+            self._run_chat_request(
+                request,
+                site_id,
+                tenant_id_val,
+                include_internal_events=include_internal_events,
+                emit_openai_tool_chunks=emit_openai_tool_chunks,
+                suppress_intermediate_tool_text=suppress_intermediate_tool_text,
+                emit_tool_status_text=emit_tool_status_text,
+            )
+        )
+
+    async def _run_chat_request(
+        self,
+        request: ChatCompletionRequest,
+        site_id: int,
+        tenant_id_val: int | None,
+        include_internal_events: bool,
+        emit_openai_tool_chunks: bool | None,
+        suppress_intermediate_tool_text: bool | None,
+        emit_tool_status_text: bool,
+    ) -> ChatCompletionResponse | StreamingResponse:
+        """在准入名额内执行推理 (由 process_chat_request 调用)"""
+        from app.core.web.exceptions import CatWikiError
+
         try:
             llm, initial_state, config, tenant_id = await self.initialize_chat_context(
                 thread_id=request.thread_id,
@@ -642,6 +840,33 @@ class ChatService:
         try:
             # 7. 执行推理
             if request.stream:
+                flight_key = self._single_flight_key(
+                    llm=llm,
+                    initial_state=initial_state,
+                    config=config,
+                    stream_flags=(
+                        include_internal_events,
+                        emit_openai_tool_chunks,
+                        suppress_intermediate_tool_text,
+                        emit_tool_status_text,
+                    ),
+                )
+                if flight_key:
+                    return StreamingResponse(
+                        self._stream_shared_generation(
+                            flight_key,
+                            llm,
+                            initial_state,
+                            config,
+                            current_thread_id,
+                            include_internal_events=include_internal_events,
+                            emit_openai_tool_chunks=emit_openai_tool_chunks,
+                            suppress_intermediate_tool_text=suppress_intermediate_tool_text,
+                            emit_tool_status_text=emit_tool_status_text,
+                        ),
+                        media_type="text/event-stream",
+                        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+                    )
 
                 async def protected_generator():
                     async with get_checkpointer() as cp:
@@ -653,7 +878,6 @@ class ChatService:
                             config,
                             llm.model_name,
                             current_thread_id,
-                            background_tasks,
                             include_internal_events=include_internal_events,
                             emit_openai_tool_chunks=emit_openai_tool_chunks,
                             suppress_intermediate_tool_text=suppress_intermediate_tool_text,
@@ -676,23 +900,8 @@ class ChatService:
                     last_message = messages[-1] if messages else AIMessage(content="")
                     content = last_message.content if isinstance(last_message, BaseMessage) else ""
 
-                    # 后台异步保存历史 (已在 site-completions 等场景通过 background_tasks 加速)
-                    async def save_history_bg():
-                        async with AsyncSessionLocal() as db:
-                            from app.services.chat.history_service import ChatHistoryService
-                            from app.services.chat.session_service import ChatSessionService
-
-                            bg_session_service = ChatSessionService(db)
-                            bg_history_service = ChatHistoryService(db)
-
-                            await bg_session_service.update_assistant_response(
-                                thread_id=current_thread_id, assistant_message=content
-                            )
-                            await bg_history_service.save_history_from_messages(
-                                thread_id=current_thread_id, messages=messages
-                            )
-
-                    background_tasks.add_task(save_history_bg)
+                    # 提交到异步落库队列，不阻塞响应
+                    await self._save_turn(current_thread_id, messages, content)
 
                     return ChatCompletionResponse(
                         id=f"chatcmpl-{uuid.uuid4()}",
@@ -716,16 +925,9 @@ class ChatService:
     async def process_responses_request(
         self,
         request,  # ResponsesAPIRequest
-        background_tasks: BackgroundTasks,
     ):
         """处理标准 Responses API 请求，复用 generate_chat_chunks 核心逻辑"""
-        from app.core.web.exceptions import CatWikiError
-        from app.schemas.chat import (
-            ChatMessage,
-            ResponseOutputContent,
-            ResponseOutputItem,
-            ResponsesAPIResponse,
-        )
+        from app.schemas.chat import ChatMessage
 
         if isinstance(request.input, str):
             message = request.input
@@ -747,6 +949,27 @@ class ChatService:
         site_id = request.filter.site_id if (request.filter and request.filter.site_id) else 0
         tenant_id_val = request.filter.tenant_id if request.filter else None
 
+        lease = await self.acquire_admission(site_id, tenant_id_val)
+        return await lease.hold(
+            self._run_responses_request(request, message, messages, site_id, tenant_id_val)
+        )
+
+    async def _run_responses_request(
+        self,
+        request,  # ResponsesAPIRequest
+        message: str,
+        messages: list[ChatMessage] | None,
+        site_id: int,
+        tenant_id_val: int | None,
+    ):
+        """在准入名额内执行 Responses API 推理 (由 process_responses_request 调用)"""
+        from app.core.web.exceptions import CatWikiError
+        from app.schemas.chat import (
+            ResponseOutputContent,
+            ResponseOutputItem,
+            ResponsesAPIResponse,
+        )
+
         try:
             llm, initial_state, config, _ = await self.initialize_chat_context(
                 thread_id=request.previous_response_id,
@@ -774,9 +997,25 @@ class ChatService:
         model_name = llm.model_name
 
         if request.stream:
+            flight_key = self._single_flight_key(
+                llm=llm,
+                initial_state=initial_state,
+                config=config,
+                stream_flags=("responses",),
+            )
 
-            async def responses_stream():
-                yield f'data: {{"type":"response.created","response":{{"id":{json.dumps(response_id)},"object":"response","status":"in_progress"}}}}\n\n'
+            async def response_chunks():
+                if flight_key:
+                    async for chunk in self._shared_chat_chunks(
+                        flight_key,
+                        llm,
+                        initial_state,
+                        config,
+                        response_id,
+                        include_internal_events=True,
+                    ):
+                        yield chunk
+                    return
 
                 async with get_checkpointer() as cp:
                     graph = create_agent_graph(checkpointer=cp, model=llm)
@@ -786,25 +1025,30 @@ class ChatService:
                         config,
                         model_name,
                         response_id,
-                        background_tasks,
                         include_internal_events=True,
                     ):
-                        if isinstance(chunk, ChatCompletionChunk):
-                            content = chunk.choices[0].delta.content
-                            tool_calls_delta = chunk.choices[0].delta.tool_calls
-                            if content:
-                                yield f'data: {{"type":"response.output_text.delta","delta":{json.dumps(content)}}}\n\n'
-                            elif tool_calls_delta:
-                                # 将 OpenAI tool_calls delta 转为 Responses API 事件
-                                for tc in tool_calls_delta:
-                                    yield f'data: {{"type":"response.tool_call.delta","tool_call":{json.dumps(tc.model_dump(exclude_none=True))}}}\n\n'
-                        elif isinstance(chunk, dict):
-                            if "sources" in chunk:
-                                yield f'data: {{"type":"response.knowledge_sources","sources":{json.dumps(chunk["sources"])}}}\n\n'
-                            elif chunk.get("status") == "tool_calling":
-                                yield f'data: {{"type":"response.tool_call.started","tool":{json.dumps(chunk.get("tool"))}}}\n\n'
-                            elif chunk.get("status") == "tool_completed":
-                                yield f'data: {{"type":"response.tool_call.completed","tool":{json.dumps(chunk.get("tool"))}}}\n\n'
+                        yield chunk
+
+            async def responses_stream():
+                yield f'data: {{"type":"response.created","response":{{"id":{json.dumps(response_id)},"object":"response","status":"in_progress"}}}}\n\n'
+
+                async for chunk in response_chunks():
+                    if isinstance(chunk, ChatCompletionChunk):
+                        content = chunk.choices[0].delta.content
+                        tool_calls_delta = chunk.choices[0].delta.tool_calls
+                        if content:
+                            yield f'data: {{"type":"response.output_text.delta","delta":{json.dumps(content)}}}\n\n'
+                        elif tool_calls_delta:
+                            # 将 OpenAI tool_calls delta 转为 Responses API 事件
+                            for tc in tool_calls_delta:
+                                yield f'data: {{"type":"response.tool_call.delta","tool_call":{json.dumps(tc.model_dump(exclude_none=True))}}}\n\n'
+                    elif isinstance(chunk, dict):
+                        if "sources" in chunk:
+                            yield f'data: {{"type":"response.knowledge_sources","sources":{json.dumps(chunk["sources"])}}}\n\n'
+                        elif chunk.get("status") == "tool_calling":
+                            yield f'data: {{"type":"response.tool_call.started","tool":{json.dumps(chunk.get("tool"))}}}\n\n'
+                        elif chunk.get("status") == "tool_completed":
+                            yield f'data: {{"type":"response.tool_call.completed","tool":{json.dumps(chunk.get("tool"))}}}\n\n'
 
                 yield f'data: {{"type":"response.completed","response":{{"id":{json.dumps(response_id)},"object":"response","status":"completed"}}}}\n\n'
                 yield "data: [DONE]\n\n"
@@ -822,21 +1066,7 @@ class ChatService:
                 last = messages_out[-1] if messages_out else AIMessage(content="")
                 content = last.content if isinstance(last, BaseMessage) else ""
 
-                async def _save():
-                    async with AsyncSessionLocal() as db:
-                        from app.services.chat.history_service import ChatHistoryService
-                        from app.services.chat.session_service import ChatSessionService
-
-                        bg_ss = ChatSessionService(db)
-                        bg_hs = ChatHistoryService(db)
-                        await bg_ss.update_assistant_response(
-                            thread_id=response_id, assistant_message=content
-                        )
-                        await bg_hs.save_history_from_messages(
-                            thread_id=response_id, messages=messages_out
-                        )
-
-                background_tasks.add_task(_save)
+                await self._save_turn(response_id, messages_out, content)
 
                 return ResponsesAPIResponse(
                     id=response_id,
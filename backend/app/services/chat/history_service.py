@@ -18,6 +18,7 @@ import logging
 from fastapi import Depends
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.vector.rag_utils import convert_messages_to_openai, extract_sources_from_messages
@@ -37,14 +38,9 @@ class ChatHistoryService:
     负责聊天消息的存取，与 ChatSessionService 配合使用。
     """
 
-    @transactional()
-    async def save_history_from_messages(
-        self,
-        thread_id: str,
-        messages: list[BaseMessage],
-    ) -> int:
-        """从 LangChain 消息列表同步新消息到 SQL (包括 tool_calls 和 tool 结果)"""
-        # 1. 找到最后一条 HumanMessage 的索引，这通常是当前轮次的起点
+    @staticmethod
+    def turn_messages(messages: list[BaseMessage]) -> list[dict]:
+        """本轮需要写入的消息（最后一条 HumanMessage 之后的全部消息，OpenAI 格式）"""
         # 注意：HumanMessage 本身已经由 API 层手动保存了，我们只需要保存它之后的所有消息
         last_human_idx = -1
         for i in range(len(messages) - 1, -1, -1):
@@ -53,10 +49,46 @@ class ChatHistoryService:
                 break
 
         if last_human_idx == -1:
+            return []
+        return convert_messages_to_openai(messages[last_human_idx + 1 :])
+
+    @transactional()
+    async def save_history_from_messages(
+        self,
+        thread_id: str,
+        messages: list[BaseMessage],
+        turn_id: str | None = None,
+    ) -> int:
+        """从 LangChain 消息列表同步新消息到 SQL (包括 tool_calls 和 tool 结果)
+
+        传入 turn_id 时按 (turn_id, 轮内序号) 幂等写入：重复投递同一轮次只写入缺失的消息，
+        返回实际新写入的条数。
+        """
+        new_openai_messages = self.turn_messages(messages)
+        if not new_openai_messages:
             return 0
 
-        new_langchain_messages = messages[last_human_idx + 1 :]
-        new_openai_messages = convert_messages_to_openai(new_langchain_messages)
+        if turn_id is not None:
+            rows = [
+                {
+                    "thread_id": thread_id,
+                    "role": msg_dict["role"],
+                    "content": msg_dict.get("content"),
+                    "tool_calls": msg_dict.get("tool_calls"),
+                    "tool_call_id": msg_dict.get("tool_call_id"),
+                    "additional_kwargs": msg_dict.get("additional_kwargs"),
+                    "turn_id": turn_id,
+                    "turn_seq": seq,
+                }
+                for seq, msg_dict in enumerate(new_openai_messages)
+            ]
+            stmt = (
+                pg_insert(ChatMessage)
+                .values(rows)
+                .on_conflict_do_nothing(constraint="uq_chat_messages_turn")
+                .returning(ChatMessage.id)
+            )
+            return len((await self.db.execute(stmt)).all())
 
         saved_count = 0
         for msg_dict in new_openai_messages:
@@ -109,7 +141,7 @@ class ChatHistoryService:
         result = await self.db.execute(
             select(ChatMessage)
             .where(ChatMessage.thread_id == thread_id)
-            .order_by(ChatMessage.created_at.asc())
+            .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
         )
         db_messages = result.scalars().all()
 
@@ -122,6 +122,7 @@ class ChatSessionService:
         self,
         thread_id: str,
         assistant_message: str,
+        turn_id: str | None = None,
     ) -> ChatSession | None:
         """更新助手回复
 
@@ -131,18 +132,23 @@ class ChatSessionService:
         Args:
             thread_id: LangGraph thread_id
             assistant_message: 助手回复内容
+            turn_id: 异步落库的轮次 ID，同一轮次重复更新时不再累加计数
 
         Returns:
             ChatSession 实例，如果不存在返回 None
         """
         # 原子更新 message_count
+        stmt = update(ChatSession).where(ChatSession.thread_id == thread_id)
+        values = {}
+        if turn_id is not None:
+            stmt = stmt.where(ChatSession.last_turn_id.is_distinct_from(turn_id))
+            values["last_turn_id"] = turn_id
         await self.db.execute(
-            update(ChatSession)
-            .where(ChatSession.thread_id == thread_id)
-            .values(
+            stmt.values(
                 last_message=assistant_message[:200],
                 last_message_role="assistant",
                 message_count=ChatSession.message_count + 1,
+                **values,
             )
         )
         # 自动处理提交
@@ -0,0 +1,176 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+聊天 Single-Flight 合并
+
+同一站点下并发到达的相同首轮问题（相同模型配置）只触发一次检索 + 生成，
+其余请求订阅同一次进行中的生成并回放/跟随其流式输出。
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class SharedGenerationCancelled(RuntimeError):
+    """领跑者的生成被取消，跟随者以此错误结束"""
+
+
+class SharedGeneration:
+    """一次进行中的生成：缓冲已产出的 chunk，供所有订阅者回放与跟随"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.chunks: list[Any] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 1
+        # 由生产者在生成结束后写入：最终 Graph 状态，供跟随者落库与同步会话
+        self.final_values: dict | None = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        # 每次变更换新 Event，等待方持有旧 Event 引用，不会错过唤醒
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk: Any) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.error = error
+        self.done = True
+        self._notify()
+
+    async def follow(self) -> AsyncGenerator[Any, None]:
+        """从头回放已缓冲的 chunk，并持续跟随直到生成结束"""
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+
+class ChatSingleFlight:
+    """进程内 Single-Flight 注册表（key -> 进行中的生成）"""
+
+    def __init__(self):
+        self._flights: dict[str, SharedGeneration] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._leader_runs = 0
+        self._saved_llm_calls = 0
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """归一化问题文本：去首尾空白、折叠连续空白、忽略大小写"""
+        return _WHITESPACE_RE.sub(" ", (question or "").strip()).casefold()
+
+    @classmethod
+    def build_key(
+        cls,
+        *,
+        site_id: int,
+        tenant_id: int | None,
+        question: str,
+        system_prompt: str,
+        model_config: str,
+    ) -> str:
+        """生成合并键：(租户, 站点, 归一化问题, 系统提示词, 模型配置)"""
+        raw = "|".join(
+            [
+                str(tenant_id),
+                str(site_id),
+                cls.normalize_question(question),
+                system_prompt or "",
+                model_config,
+            ]
+        )
+        return f"chat:flight:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    def join(
+        self,
+        key: str,
+        producer: Callable[[SharedGeneration], AsyncGenerator[Any, None]],
+    ) -> tuple[SharedGeneration, bool]:
+        """加入合并组，返回 (生成对象, 是否为领跑者)
+
+        领跑者的生成在独立 Task 中执行，即使领跑者断开，跟随者仍能收到完整输出。
+        """
+        flight = self._flights.get(key)
+        if flight is not None and not flight.done:
+            flight.subscribers += 1
+            self._saved_llm_calls += 1
+            logger.info(
+                f"🔗 [SingleFlight] Joined in-flight generation {key[-8:]} "
+                f"(subscribers={flight.subscribers})"
+            )
+            return flight, False
+
+        flight = SharedGeneration(key)
+        self._flights[key] = flight
+        self._leader_runs += 1
+        task = asyncio.create_task(self._drive(flight, producer))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return flight, True
+
+    async def _drive(
+        self,
+        flight: SharedGeneration,
+        producer: Callable[[SharedGeneration], AsyncGenerator[Any, None]],
+    ) -> None:
+        error: BaseException | None = None
+        try:
+            async for chunk in producer(flight):
+                flight.publish(chunk)
+        except asyncio.CancelledError:
+            # 生成被取消（如应用关闭）：跟随者应收到错误，而不是一次"成功"的空结果
+            logger.warning(f"⚠️ [SingleFlight] Shared generation {flight.key[-8:]} cancelled")
+            error = SharedGenerationCancelled("Shared generation was cancelled")
+            raise
+        except BaseException as e:
+            logger.error(f"❌ [SingleFlight] Shared generation failed: {e}", exc_info=True)
+            error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            flight.finish(error)
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "leader_runs": self._leader_runs,
+            "saved_llm_calls": self._saved_llm_calls,
+        }
+
+
+# 全局单例
+chat_single_flight = ChatSingleFlight()
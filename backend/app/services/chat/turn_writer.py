@@ -0,0 +1,280 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+对话轮次异步落库 (Write-Behind)
+
+流式响应结束后，助手回复与工具调用历史不再占用请求生命周期同步写库：
+1. 投递到进程内有界队列，由少量后台任务（CHAT_PERSIST_WORKERS）并发消费写入数据库；
+2. 队列已满或写库失败时，转投 arq (Redis) 队列由 Worker 写库，数据库暂不可用时有限次延迟重试；
+3. Redis 不可用时，退化为调用方同步写库，保证不丢数据；
+4. 应用优雅关闭时先排空队列，超时未写完的条目（含正在写入的）转投 Redis。
+
+每轮对话带唯一的 turn_id，同一事务内按 turn_id 幂等写入，重复投递或重试不会产生重复消息。
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.infra.config import settings
+from app.core.infra.tenant import get_current_tenant, temporary_tenant_context
+from app.db.database import AsyncSessionLocal
+from app.db.transaction import transactional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChatTurn:
+    """待持久化的一轮对话"""
+
+    thread_id: str
+    tenant_id: int | None
+    messages: list[BaseMessage]
+    content: str
+    # Single-Flight 跟随者：共享生成的最终状态（不含 messages），落库前先写入本会话线程
+    seed_state: dict | None = None
+    turn_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+async def _seed_thread_state(turn: ChatTurn) -> None:
+    """以共享生成的最终状态初始化会话线程的 Checkpoint（add_messages 按消息 ID 合并，可重复执行）"""
+    from app.core.ai.graph import create_agent_graph
+    from app.core.ai.graph.checkpointer import get_checkpointer
+    from app.core.ai.providers.llm_manager import llm_manager
+
+    llm = await llm_manager.get_model(tenant_id=turn.tenant_id)
+    async with get_checkpointer() as cp:
+        graph = create_agent_graph(checkpointer=cp, model=llm)
+        # 以 summarize_conversation 身份写入，路由直接到 END，后续轮次可正常续聊
+        await graph.aupdate_state(
+            {"configurable": {"thread_id": turn.thread_id}},
+            {**turn.seed_state, "messages": turn.messages},
+            as_node="summarize_conversation",
+        )
+
+
+@transactional()
+async def _write_turn(db: AsyncSession, turn: ChatTurn) -> None:
+    """同一事务内写入本轮消息与会话摘要"""
+    from app.services.chat.history_service import ChatHistoryService
+    from app.services.chat.session_service import ChatSessionService
+
+    history = ChatHistoryService(db)
+    has_messages = bool(history.turn_messages(turn.messages))
+    inserted = 0
+    if has_messages:
+        inserted = await history.save_history_from_messages(
+            thread_id=turn.thread_id, messages=turn.messages, turn_id=turn.turn_id
+        )
+    # 本轮消息已全部存在说明此前已完整提交过（重试），不再重复累加会话计数
+    if turn.content and (inserted or not has_messages):
+        await ChatSessionService(db).update_assistant_response(
+            thread_id=turn.thread_id, assistant_message=turn.content, turn_id=turn.turn_id
+        )
+
+
+async def persist_chat_turn(turn: ChatTurn) -> None:
+    """写入一轮对话：（跟随者）初始化会话线程 + 更新会话摘要 + 同步本轮消息到历史表"""
+    # 后台任务没有请求上下文，显式恢复提交时的租户
+    with temporary_tenant_context(turn.tenant_id):
+        if turn.seed_state is not None:
+            await _seed_thread_state(turn)
+        async with AsyncSessionLocal() as db:
+            await _write_turn(db, turn)
+
+
+class ChatTurnWriter:
+    """进程内有界队列 + 后台消费者池"""
+
+    def __init__(self, max_queue: int | None = None, workers: int | None = None):
+        self._max_queue = max_queue or settings.CHAT_PERSIST_QUEUE_SIZE
+        self._worker_count = workers or settings.CHAT_PERSIST_WORKERS
+        self._queue: asyncio.Queue[ChatTurn] | None = None
+        self._workers: list[asyncio.Task] = []
+        # 正在写入的轮次（turn_id -> ChatTurn），关闭超时时与队列剩余条目一起转投
+        self._inflight: dict[str, ChatTurn] = {}
+        self._stopping = False
+
+        self._persisted = 0
+        self._spilled = 0
+        self._inline = 0
+        self._failed = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not worker.done() for worker in self._workers)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._stopping = False
+        self._workers = [asyncio.create_task(self._drain()) for _ in range(self._worker_count)]
+        logger.info(
+            f"✅ [TurnWriter] Started (queue size={self._max_queue}, workers={self._worker_count})"
+        )
+
+    async def submit(
+        self,
+        thread_id: str,
+        messages: list[BaseMessage],
+        content: str,
+        tenant_id: int | None = None,
+        seed_state: dict | None = None,
+    ) -> None:
+        """提交一轮对话，正常情况下立即返回"""
+        turn = ChatTurn(
+            thread_id=thread_id,
+            tenant_id=tenant_id if tenant_id is not None else get_current_tenant(),
+            messages=messages,
+            content=content,
+            seed_state=seed_state,
+        )
+
+        if self.running and not self._stopping:
+            try:
+                self._queue.put_nowait(turn)
+                return
+            except asyncio.QueueFull:
+                logger.warning(
+                    f"⚠️ [TurnWriter] Queue full, spilling turn to Redis: thread={thread_id}"
+                )
+
+        if not await self._spill(turn):
+            await self._persist_inline(turn)
+
+    async def _drain(self) -> None:
+        while True:
+            turn = await self._queue.get()
+            self._inflight[turn.turn_id] = turn
+            try:
+                await persist_chat_turn(turn)
+                self._persisted += 1
+            except Exception as e:
+                self._failed += 1
+                logger.error(
+                    f"❌ [TurnWriter] Persist failed, handing over to worker: "
+                    f"thread={turn.thread_id}: {e}"
+                )
+                await self._spill(turn)
+            finally:
+                self._inflight.pop(turn.turn_id, None)
+                self._queue.task_done()
+
+    async def _spill(self, turn: ChatTurn) -> bool:
+        """转投 arq 队列，由 Worker 持久化（仅数据库连接类错误会重试，见 worker.chat_tasks）"""
+        try:
+            from app.services.task_service import TaskService
+
+            pool = await TaskService.get_redis_pool()
+            await pool.enqueue_job(
+                "persist_chat_turn",
+                turn.thread_id,
+                turn.tenant_id,
+                messages_to_dict(turn.messages),
+                turn.content,
+                turn.seed_state,
+                turn.turn_id,
+                # 同一轮次只保留一个待执行任务（关闭时转投的进行中条目可能随后写入成功）
+                _job_id=f"persist_chat_turn:{turn.turn_id}",
+            )
+            self._spilled += 1
+            return True
+        except Exception as e:
+            logger.error(f"❌ [TurnWriter] Redis fallback unavailable: {e}")
+            return False
+
+    async def _persist_inline(self, turn: ChatTurn) -> None:
+        """最后兜底：由调用方同步写库"""
+        try:
+            await persist_chat_turn(turn)
+            self._inline += 1
+        except Exception as e:
+            self._failed += 1
+            logger.error(f"❌ [TurnWriter] Inline persist failed: thread={turn.thread_id}: {e}")
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """优雅关闭：排空队列；超时则先将剩余与正在写入的条目转投 Redis（再失败则同步写库），再取消消费者
+
+        写入按 turn_id 幂等，进行中的条目即使随后提交成功，转投的任务也只会跳过。
+        """
+        if not self.running:
+            return
+
+        timeout = timeout or settings.CHAT_PERSIST_DRAIN_TIMEOUT
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except TimeoutError:
+            leftover = list(self._inflight.values())
+            while not self._queue.empty():
+                leftover.append(self._queue.get_nowait())
+                self._queue.task_done()
+            logger.warning(
+                f"⚠️ [TurnWriter] Drain timed out after {timeout}s, "
+                f"{len(leftover)} turns left; handing over to Redis"
+            )
+            for turn in leftover:
+                if not await self._spill(turn):
+                    await self._persist_inline(turn)
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._inflight.clear()
+        logger.info(f"🔌 [TurnWriter] Stopped ({self.stats()})")
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "in_flight": len(self._inflight),
+            "workers": self._worker_count,
+            "persisted": self._persisted,
+            "spilled_to_redis": self._spilled,
+            "persisted_inline": self._inline,
+            "failed": self._failed,
+        }
+
+
+def restore_chat_turn(
+    thread_id: str,
+    tenant_id: int | None,
+    messages: list[dict],
+    content: str,
+    seed_state: dict | None = None,
+    turn_id: str | None = None,
+) -> ChatTurn:
+    """从 arq 任务参数还原 ChatTurn（旧版任务没有 turn_id，按新轮次处理）"""
+    turn = ChatTurn(
+        thread_id=thread_id,
+        tenant_id=tenant_id,
+        messages=messages_from_dict(messages),
+        content=content,
+        seed_state=seed_state,
+    )
+    if turn_id:
+        turn.turn_id = turn_id
+    return turn
+
+
+# 全局单例
+chat_turn_writer = ChatTurnWriter()
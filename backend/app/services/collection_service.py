@@ -25,8 +25,10 @@ from app.core.web.exceptions import (
     NotFoundException,
 )
 from app.crud import crud_collection, crud_document, crud_site
+from app.crud.collection import COLLECTION_TREE_CACHE_PREFIX, collection_tree_cache_tag
+from app.crud.document import document_site_cache_tag
 from app.db.database import get_db
-from app.db.transaction import transactional
+from app.db.transaction import on_commit, transactional
 from app.models.collection import Collection as CollectionModel
 from app.schemas.collection import (
     CollectionCreate,
@@ -36,6 +38,9 @@ from app.schemas.collection import (
 
 logger = logging.getLogger(__name__)
 
+# 合集树缓存时间（秒），结构变更通过标签即时失效，过期仅影响文档浏览量
+COLLECTION_TREE_CACHE_TTL = 300
+
 
 class CollectionService:
     def __init__(self, db: AsyncSession):
@@ -50,56 +55,81 @@ class CollectionService:
         status: str | None = None,
     ) -> list[CollectionTree]:
         """
-        获取合集树形结构（优化版：批量加载文档，避免N+1查询）
+        获取合集树形结构（读穿缓存）
+
+        一次查询全部合集、一次投影查询文档节点，在内存中组装；结果按站点缓存，
+        合集增删改移与文档增删改后失效。文档浏览量随缓存过期刷新。
         """
+        from app.core.infra.cache import get_cache
+        from app.core.infra.tenant import get_current_tenant
+
         include_documents = show_type != "collection"
+        cache_key = (
+            f"{COLLECTION_TREE_CACHE_PREFIX}{site_id}:{get_current_tenant()}:{tenant_id}:"
+            f"{'all' if include_documents else 'collection'}:{status}"
+        )
 
-        # 优化：如果需要包含文档，一次性批量查询所有文档
-        documents_by_collection = {}
-        if include_documents:
-            all_documents = await crud_document.list(
-                self.db, site_id=site_id, tenant_id=tenant_id, status=status, skip=0, limit=None
+        async def load() -> list[dict]:
+            return await self._build_collection_tree(
+                site_id, include_documents, tenant_id=tenant_id, status=status
             )
-            for doc in all_documents:
-                cid = doc.collection_id
-                if cid not in documents_by_collection:
-                    documents_by_collection[cid] = []
-                documents_by_collection[cid].append(doc)
-
-        async def build_tree(parent_id: int | None = None) -> list[CollectionTree]:
-            collections = await crud_collection.list(
-                self.db, site_id=site_id, tenant_id=tenant_id, parent_id=parent_id
+
+        nodes = await get_cache().get_or_set(
+            cache_key,
+            load,
+            ttl=COLLECTION_TREE_CACHE_TTL,
+            tags=[collection_tree_cache_tag(site_id)],
+        )
+        return [CollectionTree.model_validate(node) for node in nodes]
+
+    async def _build_collection_tree(
+        self,
+        site_id: int,
+        include_documents: bool,
+        tenant_id: int | None = None,
+        status: str | None = None,
+    ) -> list[dict]:
+        """扁平查询合集与文档节点后按 parent_id 组装为嵌套字典（可直接缓存）"""
+        collections = await crud_collection.list_tree_nodes(
+            self.db, site_id=site_id, tenant_id=tenant_id
+        )
+
+        documents_by_collection: dict[int, list[dict]] = {}
+        if include_documents:
+            documents = await crud_document.list_tree_nodes(
+                self.db, site_id=site_id, tenant_id=tenant_id, status=status
             )
-            tree = []
-            for collection in collections:
-                children = await build_tree(collection.id)
-
-                if include_documents and collection.id in documents_by_collection:
-                    for doc in documents_by_collection[collection.id]:
-                        children.append(
-                            CollectionTree(
-                                id=doc.id,
-                                title=doc.title,
-                                type="document",
-                                children=None,
-                                status=doc.status,
-                                views=doc.views,
-                                tags=doc.tags,
-                                collection_id=doc.collection_id,
-                            )
-                        )
-
-                tree.append(
-                    CollectionTree(
-                        id=collection.id,
-                        title=collection.title,
-                        type="collection",
-                        children=children if children else None,
-                    )
+            for doc in documents:
+                documents_by_collection.setdefault(doc.collection_id, []).append(
+                    {
+                        "id": doc.id,
+                        "title": doc.title,
+                        "type": "document",
+                        "children": None,
+                        "status": doc.status,
+                        "views": doc.views,
+                        "tags": doc.tags,
+                        "collection_id": doc.collection_id,
+                    }
                 )
-            return tree
 
-        return await build_tree()
+        nodes = {
+            c.id: {"id": c.id, "title": c.title, "type": "collection", "children": []}
+            for c in collections
+        }
+        roots = []
+        for c in collections:
+            if c.parent_id is None:
+                roots.append(nodes[c.id])
+            elif c.parent_id in nodes:
+                nodes[c.parent_id]["children"].append(nodes[c.id])
+            # 父合集不存在的孤儿节点与原实现一致，不出现在树中
+
+        # 子合集在前、文档在后；无子节点时为 None
+        for node in nodes.values():
+            node["children"].extend(documents_by_collection.get(node["id"], ()))
+            node["children"] = node["children"] or None
+        return roots
 
     @transactional()
     async def list_collections(
@@ -163,6 +193,8 @@ class CollectionService:
         if tenant_id is not None:
             obj_in_dict["tenant_id"] = tenant_id
 
+        on_commit(self.db, self._invalidate_collection_tree, collection_in.site_id)
+
         return await crud_collection.create(self.db, obj_in=obj_in_dict)
 
     @transactional()
@@ -186,6 +218,12 @@ class CollectionService:
             )
             if parent.site_id != collection.site_id:
                 raise BadRequestException(detail=_("collection.parent_must_same_site"))
+            # 挂到自己的后代下会形成环，物化路径也将失效
+            if collection.path and parent.path.startswith(collection.path):
+                raise BadRequestException(detail=_("collection.cannot_move_to_descendant"))
+
+        on_commit(self.db, self._invalidate_client_documents, collection.site_id)
+        on_commit(self.db, self._invalidate_collection_tree, collection.site_id)
 
         return await crud_collection.update(self.db, db_obj=collection, obj_in=collection_in)
 
@@ -194,13 +232,15 @@ class CollectionService:
         """
         删除合集（带级联检查）
         """
-        await self.get_collection(collection_id=collection_id, tenant_id=tenant_id)
+        collection = await self.get_collection(collection_id=collection_id, tenant_id=tenant_id)
 
-        collection_ids = await crud_collection.get_descendant_ids(
-            self.db, collection_id=collection_id
-        )
         documents = await crud_document.list(
-            self.db, collection_ids=collection_ids, skip=0, limit=1
+            self.db,
+            collection_ids=crud_collection.subtree_ids_query(
+                site_id=collection.site_id, path=collection.path
+            ),
+            skip=0,
+            limit=1,
         )
         if documents:
             raise BadRequestException(detail=_("collection.has_documents"))
@@ -209,6 +249,8 @@ class CollectionService:
         if children:
             raise BadRequestException(detail=_("collection.has_children"))
 
+        on_commit(self.db, self._invalidate_collection_tree, collection.site_id)
+
         await crud_collection.delete(self.db, id=collection_id)
 
     @transactional()
@@ -236,10 +278,7 @@ class CollectionService:
             if target_parent.site_id != site_id:
                 raise BadRequestException(detail=_("collection.target_must_same_site"))
 
-            descendant_ids = await crud_collection.get_descendant_ids(
-                self.db, collection_id=collection_id
-            )
-            if target_parent_id in descendant_ids:
+            if collection.path and target_parent.path.startswith(collection.path):
                 raise BadRequestException(detail=_("collection.cannot_move_to_descendant"))
 
         siblings = await crud_collection.list(self.db, site_id=site_id, parent_id=target_parent_id)
@@ -258,9 +297,24 @@ class CollectionService:
                 sibling.order = index
                 self.db.add(sibling)
 
+        on_commit(self.db, self._invalidate_client_documents, site_id)
+        on_commit(self.db, self._invalidate_collection_tree, site_id)
+
         # 自动处理提交
         return collection
 
+    async def _invalidate_client_documents(self, site_id: int) -> None:
+        """合集改名/移动会改变其下文档的合集路径，清理该站点的客户端文档缓存"""
+        from app.core.infra.cache import get_cache
+
+        await get_cache().invalidate_tags(document_site_cache_tag(site_id))
+
+    async def _invalidate_collection_tree(self, site_id: int) -> None:
+        """清理该站点的合集树缓存（所有租户视角、是否含文档、状态筛选的变体）"""
+        from app.core.infra.cache import get_cache
+
+        await get_cache().invalidate_tags(collection_tree_cache_tag(site_id))
+
 
 def get_collection_service(
     db: AsyncSession = Depends(get_db),
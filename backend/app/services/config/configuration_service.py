@@ -18,6 +18,7 @@
 现已接入系统统一缓存层，支持多机环境下的配置同步。
 """
 
+import hashlib
 import json
 import logging
 from typing import Any, Optional
@@ -27,6 +28,11 @@ from app.core.infra.cache import get_cache
 
 logger = logging.getLogger(__name__)
 
+AI_SECTIONS = ["chat", "embedding", "rerank", "vl"]
+
+# 全部配置缓存项（平台与各租户）共用的标签，平台配置变更时按标签整体失效
+CONFIG_CACHE_TAG = "config"
+
 
 class ConfigurationService:
     """配置服务 (单例模式)
@@ -41,6 +47,8 @@ class ConfigurationService:
 
     def __init__(self, cache_ttl: int = 60):
         self._cache_ttl = cache_ttl
+        # 本进程已打印过的 AI 栈快照版本 (tenant_id -> version)，配置变更后版本变化才重新打印
+        self._logged_stack_versions: dict[int | None, str] = {}
 
     @classmethod
     def get_instance(cls) -> "ConfigurationService":
@@ -79,11 +87,15 @@ class ConfigurationService:
         调用此方法后，系统缓存（内存或 Redis）中相关的配置项将被移除。
         """
         cache = get_cache()
-        sections = ["chat", "embedding", "rerank", "vl"]
+        sections = [*AI_SECTIONS, "stack"]
 
         if tenant_id == -1:
             await cache.clear()
             logger.info("🧹 已清空系统全部缓存（含配置）")
+        elif tenant_id is None:
+            # 平台配置变更会影响所有回退到平台模式的租户（按标签失效，避免 Redis SCAN）
+            await cache.invalidate_tags(CONFIG_CACHE_TAG)
+            logger.info("🧹 已清除平台及全部租户的模型配置缓存")
         else:
             for sec in sections:
                 key = self._get_cache_key(sec, tenant_id)
@@ -110,7 +122,49 @@ class ConfigurationService:
             return config
 
         # 使用 get_or_set 极简实现
-        return await cache.get_or_set(cache_key, _fetcher, ttl=self._cache_ttl)
+        return await cache.get_or_set(
+            cache_key, _fetcher, ttl=self._cache_ttl, tags=[CONFIG_CACHE_TAG]
+        )
+
+    async def get_ai_stack(self, tenant_id: int | None = None) -> dict[str, Any]:
+        """获取 AI 栈快照 (四个模块的脱敏配置 + 版本号，带缓存)
+
+        版本号由各模块配置指纹计算，配置变更后随缓存失效而变化。
+        """
+        cache = get_cache()
+        cache_key = self._get_cache_key("stack", tenant_id)
+
+        async def _fetcher():
+            stack = {}
+            for section in AI_SECTIONS:
+                try:
+                    conf = await self._resolve_config(section, tenant_id)
+                    stack[section] = mask_sensitive_data(conf)
+                except Exception:
+                    stack[section] = {"error": "Not configured"}
+
+            fingerprint = "|".join(str(stack[s].get("_hash", "error")) for s in AI_SECTIONS)
+            version = hashlib.md5(fingerprint.encode()).hexdigest()[:12]
+            return {"version": version, "sections": stack}
+
+        return await cache.get_or_set(
+            cache_key, _fetcher, ttl=self._cache_ttl, tags=[CONFIG_CACHE_TAG]
+        )
+
+    async def log_ai_stack(self, tenant_id: int | None = None) -> None:
+        """打印 AI 栈快照：同一租户仅在快照版本变化时打印一次 (不影响调用方)"""
+        try:
+            snapshot = await self.get_ai_stack(tenant_id)
+            version = snapshot["version"]
+            if self._logged_stack_versions.get(tenant_id) == version:
+                return
+            self._logged_stack_versions[tenant_id] = version
+
+            from app.core.infra.config_resolver import ConfigResolver
+
+            logger.info(ConfigResolver.format_ai_stack(snapshot["sections"], tenant_id, version))
+        except Exception as e:
+            logger.warning(f"⚠️ [Configuration] 打印 AI 栈日志失败: {e}")
 
     async def get_chat_config(
         self, tenant_id: int | None = None, force: bool = False
@@ -13,11 +13,15 @@ from app.core.common.utils import NAMESPACE_CATWIKI, Paginator
 from app.core.infra.tenant import get_current_tenant, temporary_tenant_context
 from app.core.vector.vector_store import VectorStoreManager
 from app.core.web.exceptions import BadRequestException, NotFoundException
-from app.crud.collection import crud_collection
-from app.crud.document import crud_document
+from app.crud.collection import collection_tree_cache_tag, crud_collection
+from app.crud.document import (
+    DOCUMENT_CLIENT_CACHE_PREFIX,
+    crud_document,
+    document_site_cache_tag,
+)
 from app.crud.site import crud_site
 from app.db.database import get_db
-from app.db.transaction import transactional
+from app.db.transaction import on_commit, transactional
 from app.models.document import Document as DocumentModel
 from app.models.document import DocumentStatus, VectorStatus
 from app.models.task import TaskType
@@ -28,6 +32,9 @@ from app.services.task_service import TaskService
 
 logger = logging.getLogger(__name__)
 
+# 客户端文档详情缓存时间（秒）；变更路径会主动失效，TTL 仅兜底
+CLIENT_DOCUMENT_CACHE_TTL = 600
+
 
 class DocumentService:
     def __init__(
@@ -374,12 +381,12 @@ class DocumentService:
         """获取文档列表（分页）"""
         paginator = Paginator(page=page, size=size, total=0, is_pager=is_pager)
 
-        if collection_id:
-            collection_ids = await crud_collection.get_descendant_ids(
-                self.db, collection_id=collection_id
-            )
-        else:
-            collection_ids = None
+        # 合集及其后代以物化路径子查询过滤，无需先查出 ID 列表
+        collection_ids = (
+            await crud_collection.get_subtree_ids_query(self.db, collection_id=collection_id)
+            if collection_id
+            else None
+        )
 
         documents = await crud_document.list(
             self.db,
@@ -444,6 +451,8 @@ class DocumentService:
             raise BadRequestException(detail=_("doc.site_not_found", id=document_in.site_id))
 
         # 执行关键操作
+        on_commit(self.db, self._invalidate_collection_tree, document_in.site_id)
+
         document = await crud_document.create(self.db, obj_in=document_in)
         await self.site_service.increment_article_count(site_id=document_in.site_id)
 
@@ -458,6 +467,11 @@ class DocumentService:
         if not document:
             raise NotFoundException(detail=_("doc.not_found", id=document_id))
 
+        from app.db.transaction import on_commit
+
+        on_commit(self.db, self._invalidate_client_document, document_id)
+        on_commit(self.db, self._invalidate_collection_tree, document.site_id)
+
         document = await crud_document.update(self.db, db_obj=document, obj_in=document_in)
         return await enrich_document_dict(document, self.db, crud_collection)
 
@@ -474,6 +488,8 @@ class DocumentService:
         from app.db.transaction import on_commit
 
         on_commit(self.db, self._do_delete_vector, document_id)
+        on_commit(self.db, self._invalidate_client_document, document_id)
+        on_commit(self.db, self._invalidate_collection_tree, site_id)
 
         # 3. 执行数据库删除操作 (由 @transactional 合并提交)
         await crud_document.delete(self.db, id=document_id)
@@ -550,25 +566,60 @@ class DocumentService:
         user_agent: str | None = None,
         referer: str | None = None,
     ) -> dict:
-        """获取已发布文档详情（客户端，增加浏览量）"""
-        document = await crud_document.get_with_related_site(self.db, id=document_id)
-        if not document or document.status != DocumentStatus.PUBLISHED:
+        """获取已发布文档详情（客户端，增加浏览量）
+
+        文档详情（含站点与合集路径）走读穿缓存，浏览量与浏览事件每次照常写库。
+        """
+        from app.core.infra.cache import get_cache
+
+        async def load() -> dict | None:
+            document = await crud_document.get_with_related_site(self.db, id=document_id)
+            if not document or document.status != DocumentStatus.PUBLISHED:
+                return None
+            doc_dict = await enrich_document_dict(
+                document, self.db, crud_collection, include_site_info=True
+            )
+            # 只缓存列数据，去掉 ORM 内部状态与关联对象
+            return {k: v for k, v in doc_dict.items() if not k.startswith("_") and k != "site"}
+
+        doc_dict = await get_cache().get_or_set(
+            f"{DOCUMENT_CLIENT_CACHE_PREFIX}{document_id}",
+            load,
+            ttl=CLIENT_DOCUMENT_CACHE_TTL,
+            cache_none=False,
+            tags=lambda doc: [document_site_cache_tag(doc["site_id"])],
+        )
+        # 缓存键不含租户：命中其他租户的文档时按不存在处理
+        tenant_id = get_current_tenant()
+        if doc_dict is None or (tenant_id is not None and doc_dict["tenant_id"] != tenant_id):
             raise NotFoundException(detail=_("doc.not_found", id=document_id))
 
-        # 自动增加浏览量并记录浏览事件
-        document = await crud_document.increment_views(
+        # 自动增加浏览量并记录浏览事件（ORM 拦截器按租户过滤，更新不到即视为不存在）
+        views = await crud_document.record_view(
             self.db,
             document_id=document_id,
-            site_id=document.site_id,
-            tenant_id=document.tenant_id,
+            site_id=doc_dict["site_id"],
+            tenant_id=doc_dict["tenant_id"],
             ip_address=ip_address,
             user_agent=user_agent,
             referer=referer,
         )
+        if views is None:
+            raise NotFoundException(detail=_("doc.not_found", id=document_id))
 
-        return await enrich_document_dict(
-            document, self.db, crud_collection, include_site_info=True
-        )
+        return {**doc_dict, "views": views}
+
+    async def _invalidate_client_document(self, document_id: int) -> None:
+        """文档内容、发布状态、所属合集变更或删除后清理客户端文档缓存"""
+        from app.core.infra.cache import get_cache
+
+        await get_cache().delete(f"{DOCUMENT_CLIENT_CACHE_PREFIX}{document_id}")
+
+    async def _invalidate_collection_tree(self, site_id: int) -> None:
+        """文档增删改会改变合集树中的文档节点"""
+        from app.core.infra.cache import get_cache
+
+        await get_cache().invalidate_tags(collection_tree_cache_tag(site_id))
 
 
 def get_document_service(
@@ -5,7 +5,7 @@ import time
 from collections.abc import AsyncGenerator
 from typing import Any
 
-from fastapi import BackgroundTasks, Depends
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.common.i18n import _
@@ -67,7 +67,6 @@ class RobotOrchestrator:
         *,
         adapter: BaseRobotAdapter,
         session: RobotSession,
-        background_tasks: BackgroundTasks | None = None,
     ) -> None:
         """
         核心编排逻辑：流式 AI 推理 + 实时推送 + 异常处理。
@@ -134,7 +133,6 @@ class RobotOrchestrator:
                     thread_id=thread_id,
                     user=session.event.from_user,
                     content=session.event.content,
-                    background_tasks=background_tasks,
                 ):
                     token_count += 1
                     full_answer += chunk
@@ -156,7 +154,6 @@ class RobotOrchestrator:
                     thread_id=thread_id,
                     user=session.event.from_user,
                     content=session.event.content,
-                    background_tasks=background_tasks,
                 )
                 token_count = len(full_answer)
 
@@ -180,7 +177,6 @@ class RobotOrchestrator:
             except Exception:
                 logger.error("%s 错误状态更新失败", provider)
         finally:
-            # Note: background_tasks is handled by FastAPI, no need to await/call it here.
             # 释放锁
             with self._global_lock_mutex:
                 self._global_locks.pop(thread_id, None)
@@ -193,7 +189,6 @@ class RobotOrchestrator:
         thread_id: str,
         user: str,
         content: str,
-        background_tasks: BackgroundTasks | None = None,
         timeout_seconds: int = 90,
     ) -> str:
         chat_request = ChatCompletionRequest(
@@ -207,9 +202,7 @@ class RobotOrchestrator:
         answer = self.DEFAULT_EMPTY_REPLY
         try:
             response = await asyncio.wait_for(
-                self.chat_service.process_chat_request(
-                    chat_request, background_tasks or BackgroundTasks()
-                ),
+                self.chat_service.process_chat_request(chat_request),
                 timeout=timeout_seconds,
             )
             msg = self._extract_first_message_content(response)
@@ -231,16 +224,17 @@ class RobotOrchestrator:
         thread_id: str,
         user: str,
         content: str,
-        background_tasks: BackgroundTasks | None = None,
     ) -> AsyncGenerator[str, None]:
         """流式获取消息内容（直接获取纯文本碎片，不再通过 SSE 解析）。"""
         from app.core.ai.graph import create_agent_graph
         from app.core.ai.graph.checkpointer import get_checkpointer
         from app.schemas.chat import ChatCompletionChunk
 
-        background_tasks = background_tasks or BackgroundTasks()
-
+        lease = None
         try:
+            # 0. 推理准入控制（过载时按异常分支回复）
+            lease = await self.chat_service.acquire_admission(site_id)
+
             # 1. 使用 ChatService 统一初始化上下文 (llm, 初始状态, 数据库持久化等)
             llm, initial_state, config, _ = await self.chat_service.initialize_chat_context(
                 thread_id=thread_id,
@@ -254,7 +248,7 @@ class RobotOrchestrator:
             async with get_checkpointer() as cp:
                 graph = create_agent_graph(checkpointer=cp, model=llm)
                 async for chunk in self.chat_service.generate_chat_chunks(
-                    graph, initial_state, config, llm.model_name, thread_id, background_tasks
+                    graph, initial_state, config, llm.model_name, thread_id
                 ):
                     if isinstance(chunk, ChatCompletionChunk):
                         content_piece = chunk.choices[0].delta.content
@@ -264,6 +258,9 @@ class RobotOrchestrator:
         except Exception as e:
             logger.error("%s AI 流式推理失败: %s", provider, e, exc_info=True)
             yield self.DEFAULT_ERROR_REPLY
+        finally:
+            if lease is not None:
+                lease.release()
 
     def _get_thread_id(self, provider_id: str, from_user: str, chat_id: str | None = None) -> str:
         """统一生成机器人会话 ID"""
@@ -12,6 +12,8 @@ from app.core.integration.robot.services.feishu_app import FeishuRobotService
 from app.core.integration.robot.services.wecom_smart import WeComSmartService
 from app.core.web.exceptions import BadRequestException, ConflictException, NotFoundException
 from app.crud import crud_site, crud_user
+from app.crud.document import document_site_cache_tag
+from app.crud.site import SITE_CLIENT_CACHE_TAG
 from app.db.database import get_db
 from app.db.transaction import transactional
 from app.models.site import Site as SiteModel
@@ -211,17 +213,15 @@ class SiteService:
         # 注册提交后回调：由于 bot 刷新和缓存清理是副作用，应在事务成功后执行
         from app.db.transaction import on_commit
 
-        on_commit(self.db, self._after_site_change)
+        on_commit(self.db, self._after_site_change, site.id)
 
         return site
 
-    async def _after_site_change(self):
-        """站点变更后的统一处理：刷新服务与清理缓存"""
+    async def _after_site_change(self, site_id: int):
+        """站点变更后的统一处理：刷新服务与清理缓存（文档详情只清理该站点的）"""
         await self.refresh_bot_stream_services()
         cache = get_cache()
-        await cache.delete_by_prefix("service:sites:client_list")
-        await cache.delete_by_prefix("service:sites:client_detail")
-        await cache.delete_by_prefix("site:active:")
+        await cache.invalidate_tags(SITE_CLIENT_CACHE_TAG, document_site_cache_tag(site_id))
 
     @transactional()
     async def update_site(self, site_id: int, site_in: SiteUpdate) -> SiteModel:
@@ -252,7 +252,7 @@ class SiteService:
         # 注册提交后回调
         from app.db.transaction import on_commit
 
-        on_commit(self.db, self._after_site_change)
+        on_commit(self.db, self._after_site_change, site.id)
 
         return site
 
@@ -266,9 +266,11 @@ class SiteService:
         # 注册提交后回调
         from app.db.transaction import on_commit
 
-        on_commit(self.db, self._after_site_change)
+        on_commit(self.db, self._after_site_change, site_id)
 
-    @cached(ttl=60, key_prefix="service:sites:client_list")
+    @cached(
+        ttl=60, stale_ttl=300, key_prefix="service:sites:client_list", tags=[SITE_CLIENT_CACHE_TAG]
+    )
     @transactional()
     async def list_client_sites(
         self,
@@ -293,7 +295,12 @@ class SiteService:
         paginator = Paginator(page=page, size=size, total=total, is_pager=is_pager)
         return sites, paginator
 
-    @cached(ttl=60, key_prefix="service:sites:client_detail")
+    @cached(
+        ttl=60,
+        stale_ttl=300,
+        key_prefix="service:sites:client_detail",
+        tags=[SITE_CLIENT_CACHE_TAG],
+    )
     @transactional()
     async def get_client_site(
         self, site_id: int | None = None, slug: str | None = None
@@ -0,0 +1,103 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+站点浏览量合并写入
+
+每次浏览都对 sites 的同一行执行 UPDATE，热门站点会在行锁上排队。浏览量改为：
+1. 事务提交后 HINCRBY 累加到 Redis 哈希（站点 ID -> 待写入增量）；
+2. Worker 定时任务把整张哈希 RENAME 到本次刷新独占的键，一条 UPDATE 批量写回
+   sites.view_count；写库失败时把该批次加回待写入哈希，下次刷新重试；
+3. Redis 不可用时退化为直接更新该站点的计数。
+
+多个 Worker 同时刷新时各自取走不同的批次，不会重复写入或互相覆盖。
+站点列表读到的浏览量因此最多滞后一个刷新周期；Worker 在写库途中崩溃时丢失该批次。
+"""
+
+import logging
+import uuid
+
+from redis.exceptions import ResponseError
+from sqlalchemy import Update, case, update
+
+from app.core.infra.config import settings
+from app.core.infra.tenant import temporary_tenant_context
+from app.db.database import AsyncSessionLocal
+from app.models.site import Site
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = f"{settings.REDIS_PREFIX}site:views:pending"
+# 正在写回的批次，每次刷新使用唯一后缀
+FLUSHING_KEY_PREFIX = f"{settings.REDIS_PREFIX}site:views:flushing:"
+
+
+def site_views_update(counts: dict[int, int]) -> Update:
+    """一条语句累加多个站点的浏览量；绕过 onupdate，不刷新 updated_at"""
+    return (
+        update(Site)
+        .where(Site.id.in_(list(counts)))
+        .values(
+            view_count=Site.view_count + case(counts, value=Site.id, else_=0),
+            updated_at=Site.updated_at,
+        )
+    )
+
+
+async def apply_site_views(counts: dict[int, int]) -> None:
+    if not counts:
+        return
+    # 跨租户批量更新，不附加租户过滤
+    with temporary_tenant_context(None):
+        async with AsyncSessionLocal() as db:
+            await db.execute(site_views_update(counts))
+            await db.commit()
+
+
+async def record_site_view(site_id: int) -> None:
+    """累加一次站点浏览（在浏览事件所在事务提交后调用）"""
+    try:
+        from app.services.task_service import TaskService
+
+        pool = await TaskService.get_redis_pool()
+        await pool.hincrby(PENDING_KEY, str(site_id), 1)
+    except Exception as e:
+        logger.warning(f"⚠️ [SiteViews] Redis unavailable, updating site {site_id} directly: {e}")
+        await apply_site_views({site_id: 1})
+
+
+async def flush_site_views(redis) -> int:
+    """将 Redis 中累积的浏览量写回数据库，返回写入的浏览次数"""
+    batch_key = f"{FLUSHING_KEY_PREFIX}{uuid.uuid4().hex}"
+    try:
+        # RENAME 原子地取走当前批次：并发刷新只有一个能取到，之后的浏览累加到新的哈希中
+        await redis.rename(PENDING_KEY, batch_key)
+    except ResponseError:
+        # 没有待写入的浏览量
+        return 0
+
+    raw = await redis.hgetall(batch_key)
+    counts = {int(site_id): int(count) for site_id, count in raw.items() if int(count)}
+    try:
+        await apply_site_views(counts)
+    except Exception:
+        # 加回待写入哈希，由下次刷新重试
+        async with redis.pipeline(transaction=True) as pipe:
+            for site_id, count in counts.items():
+                pipe.hincrby(PENDING_KEY, str(site_id), count)
+            pipe.delete(batch_key)
+            await pipe.execute()
+        raise
+    await redis.delete(batch_key)
+    return sum(counts.values())
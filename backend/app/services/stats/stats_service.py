@@ -29,7 +29,7 @@ class StatsService:
         self.db = db
         self.session_service = session_service
 
-    @cached(ttl=300, key_prefix="service:stats:site")
+    @cached(ttl=300, stale_ttl=300, key_prefix="service:stats:site")
     async def get_site_stats(self, site_id: int) -> dict:
         """获取站点聚合统计数据
 
@@ -0,0 +1,69 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from arq import Retry
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+logger = logging.getLogger(__name__)
+
+# 对话轮次任务的最大尝试次数（含首次）
+PERSIST_CHAT_TURN_MAX_TRIES = 5
+# 第 N 次重试前等待 N * 该秒数
+PERSIST_CHAT_TURN_RETRY_DELAY = 10
+
+
+def _is_transient(exc: Exception) -> bool:
+    """数据库连接类错误可重试；数据或约束错误重试无益"""
+    if isinstance(exc, OperationalError | InterfaceError | OSError | TimeoutError):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
+
+
+async def persist_chat_turn(
+    ctx: dict,
+    thread_id: str,
+    tenant_id: int | None,
+    messages: list[dict],
+    content: str,
+    seed_state: dict | None = None,
+    turn_id: str | None = None,
+):
+    """
+    arq 任务入口：持久化 API 进程转投过来的对话轮次 (队列满 / 写库失败 / 关闭时未写完)
+
+    arq 只重试显式抛出 Retry 的任务：数据库暂不可用时延迟重试，至多
+    PERSIST_CHAT_TURN_MAX_TRIES 次；其余错误或重试耗尽时记录错误日志后放弃该轮次。
+    """
+    from app.services.chat.turn_writer import persist_chat_turn as _persist
+    from app.services.chat.turn_writer import restore_chat_turn
+
+    turn = restore_chat_turn(thread_id, tenant_id, messages, content, seed_state, turn_id)
+    job_try = ctx.get("job_try", 1)
+    try:
+        await _persist(turn)
+    except Exception as e:
+        if _is_transient(e) and job_try < PERSIST_CHAT_TURN_MAX_TRIES:
+            logger.warning(
+                f"⚠️ [Job:{ctx['job_id']}] 对话轮次写库失败，稍后重试 "
+                f"({job_try}/{PERSIST_CHAT_TURN_MAX_TRIES}): thread={thread_id}: {e}"
+            )
+            raise Retry(defer=job_try * PERSIST_CHAT_TURN_RETRY_DELAY) from e
+        logger.error(
+            f"❌ [Job:{ctx['job_id']}] [Tenant:{tenant_id}] 对话轮次持久化失败，已放弃: "
+            f"thread={thread_id}, turn={turn.turn_id}, try={job_try}: {e}"
+        )
+        raise
+    logger.info(f"💾 [Job:{ctx['job_id']}] [Tenant:{tenant_id}] 对话轮次已持久化: {thread_id}")
@@ -18,7 +18,7 @@ from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import AsyncSessionLocal
-from app.db.transaction import transactional
+from app.db.transaction import on_commit, transactional
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +29,8 @@ async def _do_import_parsing(
 ):
     """执行导入解析的库操作"""
     from app.core.doc_processor import DocProcessorFactory
+    from app.core.infra.cache import get_cache
+    from app.crud.collection import collection_tree_cache_tag
     from app.crud.document import crud_document
     from app.crud.site import crud_site
     from app.crud.task import crud_task
@@ -99,6 +101,8 @@ async def _do_import_parsing(
 
         document = await crud_document.create(db, obj_in=document_in)
         await crud_site.increment_article_count(db, site_id=payload.get("site_id"))
+        # 新文档出现在管理端合集树中
+        on_commit(db, get_cache().invalidate_tags, collection_tree_cache_tag(document.site_id))
         await crud_document.update_vector_status(
             db, document_id=document.id, status=VectorStatus.NONE
         )
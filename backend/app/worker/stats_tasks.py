@@ -0,0 +1,26 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def flush_site_view_counts(ctx: dict):
+    """arq 定时任务：将 Redis 中累积的站点浏览量批量写回数据库"""
+    from app.services.stats.site_view_counter import flush_site_views
+
+    flushed = await flush_site_views(ctx["redis"])
+    if flushed:
+        logger.info(f"👀 [SiteViews] 已写回 {flushed} 次站点浏览")
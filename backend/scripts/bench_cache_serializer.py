@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存序列化基准测试
+
+对比 msgpack 与 pickle 在典型缓存对象（站点 to_dict、站点统计、模型配置段）上的
+编解码耗时与负载大小。无需数据库或 Redis：
+
+    cd backend && python scripts/bench_cache_serializer.py [--rounds 20000]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.infra import cache_serializer
+from app.models.site import Site
+
+
+def sample_site() -> dict:
+    """crud_site.get / get_by_slug 缓存的站点字典"""
+    now = datetime.now(UTC)
+    site = Site(
+        id=42,
+        tenant_id=7,
+        name="产品文档中心",
+        slug="product-docs",
+        description="面向客户的产品使用手册、常见问题与版本发布说明。" * 3,
+        icon="https://cdn.example.com/icons/product-docs.png",
+        status="active",
+        article_count=328,
+        theme_color="blue",
+        layout_mode="sidebar",
+        quick_questions=["如何重置密码？", "如何导出数据？", "支持哪些登录方式？"],
+        bot_config={
+            "web_widget": {"enabled": True, "title": "智能助手", "color": "#1677ff"},
+            "api_bot": {"enabled": False},
+        },
+        created_at=now - timedelta(days=120),
+        updated_at=now,
+    )
+    return site.to_dict()
+
+
+def sample_stats() -> dict:
+    """StatsService.get_site_stats 的返回值"""
+    now = datetime.now(UTC)
+    return {
+        "total_documents": 328,
+        "total_views": 185_230,
+        "views_today": 1_204,
+        "unique_ips_today": 311,
+        "total_unique_ips": 40_122,
+        "total_chat_sessions": 9_876,
+        "total_chat_messages": 51_234,
+        "active_chat_users": 1_024,
+        "new_sessions_today": 87,
+        "new_messages_today": 402,
+        "daily_trends": [
+            {
+                "date": (now - timedelta(days=i)).strftime("%m-%d"),
+                "sessions": 80 + i,
+                "messages": 400 + i,
+            }
+            for i in range(6, -1, -1)
+        ],
+        "recent_sessions": [
+            {
+                "thread_id": f"thread-{i:04d}-3f9a2c",
+                "title": f"关于第 {i} 个问题的咨询",
+                "created_at": now - timedelta(minutes=i * 7),
+                "message_count": 4 + i,
+            }
+            for i in range(5)
+        ],
+    }
+
+
+def sample_config() -> dict:
+    """ConfigurationService.get_chat_config 的返回值"""
+    return {
+        "mode": "custom",
+        "enabled": True,
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "api_key": "sk-" + "x" * 48,
+        "base_url": "https://api.openai.com/v1",
+        "temperature": 0.3,
+        "max_tokens": 4096,
+        "extra_body": {},
+        "_hash": "5d41402abc4b2a76b9719d911017c592",
+    }
+
+
+def bench(name: str, value, rounds: int) -> None:
+    print(f"\n{name}")
+    print(f"  {'serializer':<10} {'size(B)':>8} {'encode(us)':>11} {'decode(us)':>11}")
+    for serializer in cache_serializer.SERIALIZERS:
+        data = cache_serializer.dumps(value, serializer)
+        assert cache_serializer.loads(data) == value, f"{serializer} round-trip mismatch"
+        encode = timeit.timeit(lambda: cache_serializer.dumps(value, serializer), number=rounds)
+        decode = timeit.timeit(lambda: cache_serializer.loads(data), number=rounds)
+        print(
+            f"  {serializer:<10} {len(data):>8} "
+            f"{encode / rounds * 1e6:>11.2f} {decode / rounds * 1e6:>11.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="缓存序列化基准测试")
+    parser.add_argument("--rounds", type=int, default=20_000)
+    args = parser.parse_args()
+
+    bench("site dict (crud_site.get)", sample_site(), args.rounds)
+    bench("site stats (StatsService.get_site_stats)", sample_stats(), args.rounds)
+    bench("chat config section", sample_config(), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
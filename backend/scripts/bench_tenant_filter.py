@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+租户过滤编译缓存基准测试
+
+以大量租户依次执行同一组查询，对比两种租户过滤实现的 SQLAlchemy 编译缓存表现：
+
+- legacy: 旧实现，租户 ID 作为字面量指纹拼入语句，每个租户各编译一份
+- current: app.db.events.apply_tenant_filter，租户 ID 为绑定参数，所有租户共用编译结果
+
+并以不加租户过滤的执行作为基线。
+
+使用内存 SQLite，无需数据库服务：
+
+    cd backend && python scripts/bench_tenant_filter.py [--tenants 1000] [--rounds 2]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import bindparam, create_engine, event, func, literal_column, select, true
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app.core.infra.tenant import get_current_tenant, set_current_tenant
+from app.db.base import Base
+from app.db.events import apply_tenant_filter
+from app.models.document import Document
+from app.models.site import Site
+
+
+def _legacy_criteria(cls):
+    # 与旧实现一致：在函数内导入，避免被 lambda 分析器当作闭包函数调用
+    from app.core.infra.tenant import get_current_tenant
+
+    tenant_id = get_current_tenant()
+    if tenant_id is not None and hasattr(cls, "tenant_id"):
+        return cls.tenant_id == bindparam("current_tenant_id", value=tenant_id)
+    return true()
+
+
+def legacy_tenant_filter(execute_state):
+    """旧实现：with_loader_criteria + literal_column 租户指纹"""
+    tenant_id = get_current_tenant()
+    if tenant_id is not None:
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Base, _legacy_criteria, include_aliases=True)
+        )
+        execute_state.statement = execute_state.statement.where(
+            literal_column(str(tenant_id)) == literal_column(str(tenant_id))
+        )
+
+
+def queries(slug: str):
+    """客户端常见查询：按 slug 取站点、站点文档统计、最近发布文档"""
+    return [
+        select(Site).where(Site.slug == slug, Site.status == "active"),
+        select(func.count(Document.id), func.coalesce(func.sum(Document.views), 0)).where(
+            Document.site_id == 1
+        ),
+        select(Document)
+        .where(Document.status == "published")
+        .order_by(Document.updated_at.desc())
+        .limit(10),
+    ]
+
+
+def run(name: str, hook, tenants: int, rounds: int) -> None:
+    class BenchSession(Session):
+        pass
+
+    event.listen(BenchSession, "do_orm_execute", hook)
+    engine = create_engine("sqlite://")
+    Site.__table__.create(engine)
+    Document.__table__.create(engine)
+
+    stats = {"hits": 0, "misses": 0, "compile_seconds": 0.0}
+
+    compiler_cls = engine.dialect.statement_compiler
+
+    def timed_compiler(*args, **kwargs):
+        start = time.perf_counter()
+        compiled = compiler_cls(*args, **kwargs)
+        stats["compile_seconds"] += time.perf_counter() - start
+        return compiled
+
+    engine.dialect.statement_compiler = timed_compiler
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_cache(conn, cursor, statement, parameters, context, executemany):
+        if context.cache_hit is CacheStats.CACHE_HIT:
+            stats["hits"] += 1
+        else:
+            stats["misses"] += 1
+
+    start = time.perf_counter()
+    with BenchSession(engine) as db:
+        for _ in range(rounds):
+            for tenant_id in range(1, tenants + 1):
+                set_current_tenant(tenant_id)
+                for stmt in queries(f"site-{tenant_id}"):
+                    db.execute(stmt).all()
+    elapsed = time.perf_counter() - start
+    set_current_tenant(None)
+
+    total = stats["hits"] + stats["misses"]
+    print(f"\n{name}")
+    print(f"  executions      {total}")
+    print(f"  cache hits      {stats['hits']} ({stats['hits'] / total:.1%})")
+    print(f"  cache misses    {stats['misses']}")
+    print(f"  cached entries  {len(engine._compiled_cache)}")
+    print(f"  compile time    {stats['compile_seconds'] * 1000:.1f} ms")
+    print(f"  total time      {elapsed * 1000:.1f} ms")
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="租户过滤编译缓存基准测试")
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.tenants} tenants x {args.rounds} rounds x {len(queries(''))} queries")
+    run("baseline (no tenant filter)", lambda execute_state: None, args.tenants, args.rounds)
+    run("legacy (literal tenant fingerprint)", legacy_tenant_filter, args.tenants, args.rounds)
+    run("current (bound tenant parameter)", apply_tenant_filter, args.tenants, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
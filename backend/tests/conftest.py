@@ -17,6 +17,7 @@ Pytest 配置和共享 fixtures
 """
 
 import os
+from contextlib import contextmanager
 
 import pytest
 
@@ -34,3 +35,27 @@ os.environ.setdefault("DB_PASSWORD", "test")
 @pytest.fixture
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    断言代码块内执行的 SQL 次数不超过上限，防止 N+1 回归
+
+    使用示例：
+        def test_tree(assert_max_queries):
+            with assert_max_queries(2):
+                ...
+    """
+    from app.db.query_stats import track_queries
+
+    @contextmanager
+    def _assert_max_queries(limit: int):
+        with track_queries() as stats:
+            yield stats
+        statements = "\n".join(f"  {n}x {sql}" for sql, n in stats.statements.most_common())
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, got {stats.count}:\n{statements}"
+        )
+
+    return _assert_max_queries
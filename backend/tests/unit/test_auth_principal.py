@@ -0,0 +1,60 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+认证主体缓存单元测试
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.infra import cache as cache_module
+from app.core.infra.cache import InMemoryCache
+from app.core.web import deps
+from app.crud.user import crud_user
+from app.models.user import User, UserStatus
+
+
+@pytest.mark.asyncio
+async def test_principal_is_cached_per_token_and_invalidated_on_user_change(monkeypatch):
+    monkeypatch.setattr(cache_module, "_cache_instance", InMemoryCache())
+    monkeypatch.setattr(
+        "sqlalchemy.orm.make_transient_to_detached", lambda instance: None, raising=True
+    )
+    user = User(id=7, tenant_id=None, email="a@example.com", status=UserStatus.ACTIVE)
+    get_user = AsyncMock(return_value=user)
+    monkeypatch.setattr(crud_user, "get", get_user)
+    db = MagicMock()
+    db.merge = AsyncMock(side_effect=lambda instance, load: instance)
+
+    def request():
+        return SimpleNamespace(state=SimpleNamespace())
+
+    first = await deps._get_principal(request(), db, 7, issued_at=100)
+    cached = await deps._get_principal(request(), db, 7, issued_at=100)
+    assert first is user
+    assert cached.email == "a@example.com"
+    assert get_user.await_count == 1
+
+    # 新登录（签发时间不同）使用独立缓存键
+    await deps._get_principal(request(), db, 7, issued_at=200)
+    assert get_user.await_count == 2
+
+    # 禁用、改角色、重置密码都会经由 _clear_cache 失效该用户的全部认证主体
+    await crud_user._clear_cache(7, "a@example.com")
+    await deps._get_principal(request(), db, 7, issued_at=100)
+    await deps._get_principal(request(), db, 7, issued_at=200)
+    assert get_user.await_count == 4
@@ -0,0 +1,78 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+内存缓存字节预算单元测试
+"""
+
+import pytest
+
+from app.core.infra.cache import InMemoryCache
+from app.core.infra.cache_metrics import estimate_size
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_weight():
+    blob = "x" * 1000
+    budget = estimate_size(blob) * 3
+    cache = InMemoryCache(max_size=100, max_bytes=budget)
+
+    for key in ("a", "b", "c"):
+        await cache.set(key, "x" * 1000)
+    await cache.get("a")  # a 变为最近使用
+
+    # 一个 2 倍大小的值需要淘汰两个最久未使用的条目 (b, c)
+    await cache.set("big", "y" * 2000)
+
+    assert await cache.get("a") is not None
+    assert await cache.get("b") is None and await cache.get("c") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["bytes"] <= budget
+
+
+@pytest.mark.asyncio
+async def test_oversized_value_is_not_cached_and_bytes_track_removals():
+    cache = InMemoryCache(max_bytes=500)
+    await cache.set("small", "s")
+    await cache.set("small", "x" * 10_000)  # 覆盖为超预算的值：旧值移除，新值不缓存
+
+    assert await cache.get("small") is None
+    assert cache.stats()["bytes"] == 0
+
+    await cache.set("k", [1, 2, 3])
+    assert cache.stats()["bytes"] == estimate_size([1, 2, 3])
+    await cache.delete("k")
+    assert cache.stats()["bytes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_size_is_sampled_without_byte_budget(monkeypatch):
+    from app.core.infra import cache as cache_module
+
+    calls = []
+
+    def counting_estimate(value):
+        calls.append(value)
+        return estimate_size(value)
+
+    monkeypatch.setattr(cache_module, "estimate_size", counting_estimate)
+    cache = InMemoryCache(max_size=100)
+    for i in range(32):
+        await cache.set(f"ns:list:{i}", ["v"])
+
+    assert len(calls) == 32 // InMemoryCache.SIZE_SAMPLE_EVERY
+    ns = cache.stats()["namespaces"]["ns:list"]
+    assert ns["sets"] == 32
+    assert ns["avg_value_bytes"] == estimate_size(["v"])
@@ -0,0 +1,68 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存分命名空间指标单元测试
+"""
+
+import pytest
+
+from app.core.infra.cache import InMemoryCache
+from app.core.infra.cache_metrics import namespace_of
+
+
+def test_namespace_of():
+    assert namespace_of("site:slug:docs") == "site:slug"
+    assert namespace_of("service:stats:site:t1:abcd") == "service:stats"
+    assert namespace_of("plain") == "plain"
+
+
+@pytest.mark.asyncio
+async def test_records_hits_misses_loads_sizes_and_evictions():
+    cache = InMemoryCache(max_size=2)
+
+    async def load_site():
+        return {"name": "docs", "description": "x" * 200}
+
+    await cache.get_or_set("site:id:1", load_site)
+    await cache.get_or_set("site:id:1", load_site)
+    await cache.set("config:chat:platform", {"model": "m"})
+    await cache.set("config:chat:tenant:1", {"model": "m"})  # 淘汰 site:id:1
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_set("config:embedding:platform", _failing_loader)
+
+    site = cache.stats()["namespaces"]["site:id"]
+    assert (site["hits"], site["misses"], site["loads"], site["sets"]) == (1, 1, 1, 1)
+    assert site["hit_rate"] == 0.5
+    assert site["max_value_bytes"] > 200
+    assert site["evictions"] == 1
+
+    assert cache.stats()["namespaces"]["config:embedding"]["load_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prometheus_export():
+    cache = InMemoryCache()
+    await cache.set("site:id:1", {"a": 1})
+    await cache.get("site:id:1")
+
+    text = cache.prometheus_metrics()
+    assert "# TYPE catwiki_cache_hits_total counter" in text
+    assert 'catwiki_cache_hits_total{backend="memory",namespace="site:id"} 1' in text
+    assert 'catwiki_cache_sets_total{backend="memory",namespace="site:id"} 1' in text
+
+
+async def _failing_loader():
+    raise RuntimeError("db down")
@@ -0,0 +1,60 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存序列化单元测试
+"""
+
+import pickle
+import uuid
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.core.infra import cache_serializer
+from app.models.user import UserRole
+
+
+def test_msgpack_round_trip_preserves_types():
+    value = {
+        "created_at": datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=UTC),
+        "naive": datetime(2026, 1, 2, 3, 4, 5),
+        "day": date(2026, 1, 2),
+        "id": uuid.uuid4(),
+        "price": Decimal("9.90"),
+        "pair": (1, ("a", None)),
+        "items": [1, 1.5, True, "文档", b"raw", {}],
+    }
+
+    data = cache_serializer.dumps(value, "msgpack")
+    assert data[0] == cache_serializer.FORMAT_MSGPACK
+    restored = cache_serializer.loads(data)
+    assert restored == value
+    assert type(restored["pair"]) is tuple
+    assert restored["created_at"].tzinfo is not None
+
+
+@pytest.mark.parametrize("value", [UserRole.ADMIN, {"role": UserRole.ADMIN}, {1: "a"}, {1, 2}])
+def test_unsupported_types_fall_back_to_pickle(value):
+    data = cache_serializer.dumps(value, "msgpack")
+    assert data[0] == cache_serializer.FORMAT_PICKLE
+    assert cache_serializer.loads(data) == value
+
+
+def test_reads_legacy_pickle_and_rejects_unknown_format():
+    assert cache_serializer.loads(pickle.dumps({"a": 1})) == {"a": 1}
+
+    with pytest.raises(ValueError):
+        cache_serializer.loads(b"\x7f{}")
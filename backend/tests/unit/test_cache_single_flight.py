@@ -0,0 +1,143 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存 get_or_set 并发回源合并单元测试
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.infra.cache import InMemoryCache, RedisCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_run_loader_once():
+    cache = InMemoryCache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"site": 1}
+
+    results = await asyncio.gather(*(cache.get_or_set("hot", loader, ttl=60) for _ in range(50)))
+
+    assert calls == 1
+    assert all(r == {"site": 1} for r in results)
+    assert cache._inflight == {}
+    assert await cache.get("hot") == {"site": 1}
+
+
+@pytest.mark.asyncio
+async def test_loader_error_propagates_to_all_waiters():
+    cache = InMemoryCache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("db down")
+
+    results = await asyncio.gather(
+        *(cache.get_or_set("hot", loader) for _ in range(10)), return_exceptions=True
+    )
+
+    assert calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    # 失败不写缓存，下一次调用重新加载
+    assert await cache.get("hot") is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_loader_hands_over_to_waiter():
+    cache = InMemoryCache()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    leader = asyncio.create_task(cache.get_or_set("hot", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_set("hot", loader))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    assert await waiter == 2
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_waiter_stops_polling_once_fill_lock_released():
+    import fakeredis
+
+    cache = RedisCache("redis://localhost:6379/15", prefix="test:")
+    cache.client = fakeredis.FakeAsyncRedis()
+    # 另一实例持有回源锁，其结果为 None 且不缓存
+    lock_name = cache._get_full_key("lock:fill:doc:1")
+    await cache.client.set(lock_name, b"other", px=10_000)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return None
+
+    started = time.monotonic()
+    waiter = asyncio.create_task(cache.get_or_set("doc:1", loader, ttl=60, cache_none=False))
+    await asyncio.sleep(0.2)
+    assert not waiter.done() and calls == 0
+
+    await cache.client.delete(lock_name)
+    assert await waiter is None
+    assert calls == 1
+    assert time.monotonic() - started < cache.fill_wait_timeout / 2
+    await cache.client.aclose()
+
+
+class _BrokenCache(InMemoryCache):
+    async def get(self, key, default=None):
+        raise ConnectionError("cache down")
+
+
+@pytest.mark.asyncio
+async def test_cached_falls_back_to_function_when_backend_fails(monkeypatch):
+    from app.core.infra import cache as cache_module
+
+    monkeypatch.setattr(cache_module, "_cache_instance", _BrokenCache())
+    calls = 0
+
+    @cache_module.cached(ttl=60, key_prefix="fallback")
+    async def load(site_id: int):
+        nonlocal calls
+        calls += 1
+        if site_id < 0:
+            raise ValueError("bad site")
+        return {"site": site_id}
+
+    assert await load(1) == {"site": 1}
+    assert calls == 1
+
+    # 业务函数自身的异常不触发降级重试
+    monkeypatch.setattr(cache_module, "_cache_instance", InMemoryCache())
+    with pytest.raises(ValueError):
+        await load(-1)
+    assert calls == 2
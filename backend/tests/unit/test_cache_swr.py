@@ -0,0 +1,108 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+stale-while-revalidate 单元测试
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.infra import cache as cache_module
+from app.core.infra.cache import InMemoryCache, _rebind_session
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_single_refresh_runs(clock):
+    cache = InMemoryCache()
+    version = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal version
+        version += 1
+        return version
+
+    async def slow_refresh():
+        await release.wait()
+        return await load()
+
+    async def call():
+        return await cache.get_or_revalidate(
+            "service:stats:1", load, ttl=10, stale_ttl=60, refresh=slow_refresh
+        )
+
+    assert await call() == 1
+
+    # 软过期后：立即返回旧值，后台只刷新一次
+    clock[0] += 15
+    assert await asyncio.gather(*(call() for _ in range(5))) == [1] * 5
+    assert len(cache._refreshing) == 1
+
+    release.set()
+    await asyncio.gather(*cache._refreshing.values())
+    assert await call() == 2
+    assert cache.stats()["namespaces"]["service:stats"]["stale_hits"] == 5
+
+    # 硬过期后同步回源
+    clock[0] += 100
+    assert await call() == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_value(clock):
+    cache = InMemoryCache()
+
+    async def broken():
+        raise RuntimeError("db down")
+
+    async def call():
+        return await cache.get_or_revalidate(
+            "k", lambda: "v1", ttl=10, stale_ttl=60, refresh=broken
+        )
+
+    assert await call() == "v1"
+    clock[0] += 15
+    assert await call() == "v1"
+    await asyncio.gather(*cache._refreshing.values())
+    assert await call() == "v1"
+
+
+def test_rebind_session_swaps_service_sessions_without_touching_original():
+    old, new = object.__new__(AsyncSession), object.__new__(AsyncSession)
+
+    class Child:
+        def __init__(self, db):
+            self.db = db
+
+    class Service:
+        def __init__(self, db):
+            self.db = db
+            self.child = Child(db)
+
+    service = Service(old)
+    (clone, site_id), kwargs = _rebind_session((service, 1), {"db": old}, new)
+
+    assert clone.db is new and clone.child.db is new
+    assert service.db is old and service.child.db is old
+    assert site_id == 1 and kwargs["db"] is new
@@ -0,0 +1,158 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存标签失效单元测试
+"""
+
+import pytest
+
+from app.core.infra import cache as cache_module
+from app.core.infra.cache import InMemoryCache, cached
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_removes_only_tagged_keys():
+    cache = InMemoryCache()
+    await cache.set("site:1:a", 1, tags=["site:1", "tenant:7"])
+    await cache.set("site:1:b", 2, tags=["site:1"])
+    await cache.set("site:2:a", 3, tags=["site:2", "tenant:7"])
+    await cache.set("plain", 4)
+
+    assert await cache.invalidate_tags("site:1") == 2
+    assert await cache.get("site:1:a") is None
+    assert await cache.get("site:2:a") == 3
+
+    assert await cache.invalidate_tags("tenant:7", "missing") == 1
+    assert await cache.get("plain") == 4
+    # 条目移除后标签索引同步清理，不残留空集合
+    assert cache._tag_keys == {}
+
+
+@pytest.mark.asyncio
+async def test_overwrite_and_eviction_drop_stale_tag_links():
+    cache = InMemoryCache(max_size=2)
+    await cache.set("a", 1, tags=["x"])
+    await cache.set("a", 2, tags=["y"])
+    assert await cache.invalidate_tags("x") == 0
+    assert await cache.get("a") == 2
+
+    await cache.set("b", 1, tags=["y"])
+    await cache.set("c", 1, tags=["y"])  # 淘汰最久未使用的 "a"
+    assert cache._tag_keys["y"] == {"b", "c"}
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_release_tags_before_live_entries_are_evicted(monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    cache = InMemoryCache(max_size=2)
+    await cache.set("live", 1, ttl=600, tags=["y"])
+    await cache.set("old", 1, ttl=10, tags=["x"])
+
+    clock[0] += 60
+    await cache.set("new", 1, ttl=600, tags=["y"])  # 容量不足时先清过期条目，而不是淘汰 "live"
+
+    assert await cache.get("live") == 1
+    assert cache._tag_keys == {"y": {"live", "new"}}
+    assert "old" not in cache._key_tags
+
+
+@pytest.mark.asyncio
+async def test_cached_decorator_attaches_dynamic_tags(monkeypatch):
+    cache = InMemoryCache()
+    monkeypatch.setattr(cache_module, "_cache_instance", cache)
+    calls = []
+
+    @cached(ttl=60, key_prefix="test:site_stats", tags=lambda site_id: [f"site:{site_id}"])
+    async def site_stats(site_id: int):
+        calls.append(site_id)
+        return {"site_id": site_id}
+
+    await site_stats(1)
+    await site_stats(1)
+    await site_stats(2)
+    assert calls == [1, 2]
+
+    await cache.invalidate_tags("site:1")
+    await site_stats(1)
+    await site_stats(2)
+    assert calls == [1, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_derives_tags_from_loaded_value():
+    cache = InMemoryCache()
+
+    async def load():
+        return {"id": 5, "site_id": 3}
+
+    value = await cache.get_or_set(
+        "doc:client:5", load, tags=lambda doc: [f"doc:site:{doc['site_id']}"]
+    )
+    assert value["site_id"] == 3
+    assert await cache.invalidate_tags("doc:site:3") == 1
+    assert await cache.get("doc:client:5") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_tag_index_drops_expired_members(monkeypatch):
+    import fakeredis
+
+    from app.core.infra.cache import RedisCache
+
+    cache = RedisCache("redis://localhost:6379/15", prefix="test:")
+    cache.client = fakeredis.FakeAsyncRedis()
+    clock = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    tag_key = cache._get_tag_key("site:1")
+
+    for i in range(5):
+        await cache.set(f"doc:{i}", i, ttl=60, tags=["site:1"])
+    assert await cache.client.zcard(tag_key) == 5
+
+    # 旧键全部过期后，新写入会清理索引中的过期成员，集合大小不随历史累积
+    clock[0] += 120
+    for i in range(5, 7):
+        await cache.set(f"doc:{i}", i, ttl=60, tags=["site:1"])
+    assert await cache.client.zcard(tag_key) == 2
+    assert await cache.tagged_keys("site:1") == ["doc:5", "doc:6"]
+
+    await cache.client.delete(cache._get_full_key("doc:5"))
+    assert await cache.invalidate_tags("site:1") == 1
+    assert not await cache.client.exists(tag_key)
+    await cache.client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_site_change_evicts_only_that_sites_documents(monkeypatch):
+    from unittest.mock import AsyncMock, MagicMock
+
+    from app.crud.document import document_site_cache_tag
+    from app.crud.site import SITE_CLIENT_CACHE_TAG
+    from app.services.site_service import SiteService
+
+    cache = InMemoryCache()
+    monkeypatch.setattr(cache_module, "_cache_instance", cache)
+    await cache.set("doc:client:1", {"site_id": 1}, tags=[document_site_cache_tag(1)])
+    await cache.set("doc:client:2", {"site_id": 2}, tags=[document_site_cache_tag(2)])
+    await cache.set("site:active:id:1", {"id": 1}, tags=[SITE_CLIENT_CACHE_TAG])
+
+    service = SiteService(MagicMock())
+    monkeypatch.setattr(service, "refresh_bot_stream_services", AsyncMock())
+    await service._after_site_change(1)
+
+    assert await cache.get("doc:client:1") is None
+    assert await cache.get("site:active:id:1") is None
+    assert await cache.get("doc:client:2") == {"site_id": 2}
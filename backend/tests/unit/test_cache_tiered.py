@@ -0,0 +1,98 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+两级缓存失效消息处理单元测试（不连接 Redis）
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.infra.cache import RedisCache, TieredCache
+
+
+@pytest.fixture
+def tiered():
+    return TieredCache(RedisCache("redis://localhost:6379/15", prefix="test:"), l1_ttl=30)
+
+
+def _message(origin: str, op: str, args: list[str]) -> bytes:
+    return json.dumps({"origin": origin, "op": op, "args": args}).encode()
+
+
+@pytest.mark.asyncio
+async def test_remote_invalidation_evicts_l1(tiered):
+    await tiered.l1.set("site:slug:a", 1)
+    await tiered.l1.set("site:slug:b", 2)
+    await tiered.l1.set("config:chat:platform", 3)
+
+    await tiered._apply(_message("other", "delete", ["site:slug:a"]))
+    assert await tiered.l1.get("site:slug:a") is None
+    assert await tiered.l1.get("site:slug:b") == 2
+
+    await tiered._apply(_message("other", "prefix", ["config:"]))
+    assert await tiered.l1.get("config:chat:platform") is None
+
+    await tiered._apply(_message("other", "clear", []))
+    assert tiered.l1.stats()["size"] == 0
+    assert tiered.stats()["invalidation"]["received"] == 3
+
+
+@pytest.mark.asyncio
+async def test_own_messages_and_garbage_are_ignored(tiered):
+    await tiered.l1.set("k", 1)
+
+    await tiered._apply(_message(tiered._origin, "delete", ["k"]))
+    await tiered._apply(b"not json")
+    assert await tiered.l1.get("k") == 1
+    assert tiered.stats()["invalidation"]["received"] == 0
+
+
+def test_l1_ttl_never_exceeds_entry_ttl(tiered):
+    assert tiered._l1_ttl(5) == 5
+    assert tiered._l1_ttl(600) == 30
+    assert tiered._l1_ttl(None) == 30
+
+
+@pytest.mark.asyncio
+async def test_start_subscribes_before_warm_up_and_writes_start_listener():
+    import fakeredis
+
+    server = fakeredis.FakeServer()
+    tiered = TieredCache(RedisCache("redis://localhost:6379/15", prefix="test:"), l1_ttl=30)
+    tiered.l2.client = fakeredis.FakeAsyncRedis(server=server)
+
+    # 未读取过也已订阅：随后预热的 L1 不会被订阅建立时的清空丢弃，且能收到失效消息
+    await tiered.start()
+    await tiered.warm_many({"site:slug:a": 1, "site:slug:b": 2}, ttl=60, shared=False)
+    publisher = fakeredis.FakeAsyncRedis(server=server)
+    await publisher.publish(tiered.channel, _message("other", "delete", ["site:slug:a"]))
+    for _ in range(100):
+        if tiered.stats()["invalidation"]["received"]:
+            break
+        await asyncio.sleep(0.01)
+    assert await tiered.l1.get("site:slug:a") is None
+    assert await tiered.l1.get("site:slug:b") == 2
+    await tiered.close()
+    assert tiered._listener is None
+
+    # 未经 start 时，写入 L1 的路径同样会启动订阅
+    other = TieredCache(RedisCache("redis://localhost:6379/15", prefix="test:"), l1_ttl=30)
+    other.l2.client = fakeredis.FakeAsyncRedis(server=server)
+    await other.warm_many({"k": 1}, shared=False)
+    assert other._listener is not None and not other._listener.done()
+    await other.close()
+    await publisher.aclose()
@@ -0,0 +1,86 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+启动缓存预热单元测试
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.lifecycle import warmup
+
+
+@pytest.mark.asyncio
+async def test_warm_up_respects_budget_and_keeps_partial_counts(monkeypatch):
+    calls = []
+
+    async def fast(run):
+        calls.append("fast")
+        run.loaded["fast"] += 3
+
+    async def failing(run):
+        calls.append("failing")
+        raise RuntimeError("db down")
+
+    async def slow(run):
+        calls.append("slow")
+        run.loaded["slow"] += 1
+        await asyncio.sleep(10)
+
+    async def never(run):
+        calls.append("never")
+
+    monkeypatch.setattr(
+        warmup,
+        "WARMUP_STEPS",
+        (("fast", fast), ("failing", failing), ("slow", slow), ("never", never)),
+    )
+
+    loaded = await warmup.warm_up_caches(budget=0.1)
+
+    # 失败的步骤不影响后续步骤；预算耗尽后剩余步骤被跳过，已加载的计数保留
+    assert calls == ["fast", "failing", "slow"]
+    assert loaded == {"fast": 3, "slow": 1}
+
+
+@pytest.mark.asyncio
+async def test_warm_fills_skip_invalidation_and_shared_tier_when_not_leader():
+    import fakeredis
+
+    from app.core.infra.cache import RedisCache, TieredCache
+
+    l2 = RedisCache("redis://localhost:6379/15", prefix="test:")
+    l2.client = fakeredis.FakeAsyncRedis()
+    cache = TieredCache(l2)
+    published = []
+
+    async def record_publish(channel, payload):
+        published.append(payload)
+
+    l2.client.publish = record_publish
+
+    await cache.warm_many({"site:id:1": {"id": 1}}, ttl=600, shared=False)
+    assert await cache.l1.get("site:id:1") == {"id": 1}
+    assert await l2.get("site:id:1") is None
+
+    await cache.warm_many({"site:id:2": {"id": 2}}, ttl=600)
+    assert await l2.get("site:id:2") == {"id": 2}
+    assert published == []
+
+    # 只有一个实例能拿到共享层预热权
+    assert await cache.lock("warmup", timeout=60).acquire(blocking=False)
+    assert not await cache.lock("warmup", timeout=60).acquire(blocking=False)
+    await l2.client.aclose()
@@ -0,0 +1,145 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+聊天准入控制单元测试
+"""
+
+import asyncio
+
+import pytest
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+
+from app.core.web.exceptions import TooManyRequestsException
+from app.services.chat.admission import ChatAdmissionController
+
+
+@pytest.mark.asyncio
+async def test_tenant_limit_queues_then_admits_on_release():
+    controller = ChatAdmissionController(
+        max_concurrent=4, max_per_tenant=1, max_queue=2, wait_timeout=1, enabled=True
+    )
+    first = await controller.acquire(1)
+
+    waiter = asyncio.create_task(controller.acquire(1))
+    await asyncio.sleep(0)
+    assert controller.stats()["queue_depth"] == 1
+
+    # 其他租户不受影响
+    other = await controller.acquire(2)
+
+    first.release()
+    second = await waiter
+    stats = controller.stats()
+    assert stats["active_by_tenant"] == {"1": 1, "2": 1}
+    assert stats["queue_depth"] == 0
+    assert stats["admitted"] == 3
+
+    second.release()
+    other.release()
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_full_fails_fast_with_retry_after():
+    controller = ChatAdmissionController(
+        max_concurrent=1, max_per_tenant=1, max_queue=0, wait_timeout=1, enabled=True
+    )
+    lease = await controller.acquire(1)
+
+    with pytest.raises(TooManyRequestsException) as exc_info:
+        await controller.acquire(1)
+
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+    assert controller.stats()["rejected_queue_full"] == 1
+    lease.release()
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_rejects_and_leaves_queue():
+    controller = ChatAdmissionController(
+        max_concurrent=1, max_per_tenant=1, max_queue=1, wait_timeout=0.01, enabled=True
+    )
+    lease = await controller.acquire(1)
+
+    with pytest.raises(TooManyRequestsException):
+        await controller.acquire(1)
+
+    stats = controller.stats()
+    assert stats["rejected_timeout"] == 1
+    assert stats["queue_depth"] == 0
+    lease.release()
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_holds_lease_until_stream_ends():
+    controller = ChatAdmissionController(
+        max_concurrent=1, max_per_tenant=1, max_queue=0, wait_timeout=1, enabled=True
+    )
+
+    async def build_response():
+        async def body():
+            yield "a"
+            yield "b"
+
+        return StreamingResponse(body())
+
+    lease = await controller.acquire(1)
+    response = await lease.hold(build_response())
+    assert controller.stats()["active"] == 1
+
+    assert [chunk async for chunk in response.body_iterator] == ["a", "b"]
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled_controller_admits_everything():
+    controller = ChatAdmissionController(
+        max_concurrent=1, max_per_tenant=1, max_queue=0, wait_timeout=1, enabled=False
+    )
+    leases = [await controller.acquire(1) for _ in range(3)]
+    assert controller.stats()["active"] == 3
+    for lease in leases:
+        async with lease:
+            pass
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_lease_released_when_send_fails_before_iteration():
+    controller = ChatAdmissionController(
+        max_concurrent=1, max_per_tenant=1, max_queue=0, wait_timeout=1, enabled=True
+    )
+
+    async def build_response():
+        async def body():
+            yield "a"
+
+        return StreamingResponse(body())
+
+    lease = await controller.acquire(1)
+    response = await lease.hold(build_response())
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        # 客户端在首包前断开
+        raise OSError("client disconnected")
+
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    assert controller.stats()["active"] == 0
@@ -0,0 +1,94 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+聊天 Single-Flight 合并单元测试
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.chat.single_flight import ChatSingleFlight, SharedGenerationCancelled
+
+
+class TestBuildKey:
+    def test_normalized_question_shares_key(self):
+        base = {"site_id": 1, "tenant_id": 1, "system_prompt": "", "model_config": "m"}
+        k1 = ChatSingleFlight.build_key(question="  How to   Deploy? ", **base)
+        k2 = ChatSingleFlight.build_key(question="how to deploy?", **base)
+        assert k1 == k2
+
+    def test_site_isolated(self):
+        base = {"tenant_id": 1, "question": "q", "system_prompt": "", "model_config": "m"}
+        assert ChatSingleFlight.build_key(site_id=1, **base) != ChatSingleFlight.build_key(
+            site_id=2, **base
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_subscribers_share_one_generation():
+    registry = ChatSingleFlight()
+    runs = 0
+    release = asyncio.Event()
+
+    async def producer(flight):
+        nonlocal runs
+        runs += 1
+        yield "a"
+        await release.wait()
+        yield "b"
+        flight.final_values = {"messages": []}
+
+    async def consume(flight):
+        return [chunk async for chunk in flight.follow()]
+
+    leader, is_leader = registry.join("k", producer)
+    follower, is_follower_leader = registry.join("k", producer)
+    assert is_leader and not is_follower_leader
+    assert leader is follower
+
+    tasks = [asyncio.create_task(consume(leader)), asyncio.create_task(consume(follower))]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert runs == 1
+    assert results == [["a", "b"], ["a", "b"]]
+    assert leader.final_values == {"messages": []}
+    assert registry.stats() == {"in_flight": 0, "leader_runs": 1, "saved_llm_calls": 1}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_fails_followers():
+    registry = ChatSingleFlight()
+    started = asyncio.Event()
+
+    async def producer(flight):
+        yield "a"
+        started.set()
+        await asyncio.sleep(3600)
+        yield "never"
+
+    flight, _ = registry.join("k", producer)
+    await started.wait()
+    (task,) = registry._tasks
+    task.cancel()
+
+    received = []
+    with pytest.raises(SharedGenerationCancelled):
+        async for chunk in flight.follow():
+            received.append(chunk)
+    assert received == ["a"]
+    assert registry.stats()["in_flight"] == 0
@@ -0,0 +1,139 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+对话轮次异步落库单元测试
+"""
+
+import asyncio
+
+import pytest
+from arq import Retry
+from langchain_core.messages import AIMessage, HumanMessage
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.services.chat import turn_writer
+from app.services.chat.turn_writer import ChatTurnWriter, restore_chat_turn
+from app.worker import chat_tasks
+
+
+@pytest.fixture
+def persisted(monkeypatch):
+    written = []
+
+    async def fake_persist(turn):
+        await asyncio.sleep(0.001)
+        written.append(turn.thread_id)
+
+    monkeypatch.setattr(turn_writer, "persist_chat_turn", fake_persist)
+    return written
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_immediately_and_stop_drains(persisted):
+    writer = ChatTurnWriter(max_queue=10, workers=2)
+    await writer.start()
+
+    for i in range(5):
+        await writer.submit(f"t{i}", [], "answer", tenant_id=1)
+    assert len(persisted) < 5
+
+    await writer.stop(timeout=1)
+    assert sorted(persisted) == [f"t{i}" for i in range(5)]
+    assert writer.stats()["persisted"] == 5
+
+
+@pytest.mark.asyncio
+async def test_stop_timeout_spills_in_flight_and_queued_turns(monkeypatch):
+    started = asyncio.Event()
+
+    async def stuck_persist(turn):
+        started.set()
+        await asyncio.sleep(10)
+
+    spilled = []
+
+    async def fake_spill(self, turn):
+        spilled.append(turn.thread_id)
+        return True
+
+    monkeypatch.setattr(turn_writer, "persist_chat_turn", stuck_persist)
+    monkeypatch.setattr(ChatTurnWriter, "_spill", fake_spill)
+    writer = ChatTurnWriter(max_queue=10, workers=1)
+    await writer.start()
+
+    await writer.submit("in-flight", [], "a", tenant_id=1)
+    await writer.submit("queued", [], "a", tenant_id=1)
+    await started.wait()
+    await writer.stop(timeout=0.01)
+
+    # 取消消费者之前，进行中与排队中的轮次都已转投
+    assert spilled == ["in-flight", "queued"]
+    assert not writer.running
+
+
+@pytest.mark.asyncio
+async def test_queue_full_spills_and_falls_back_inline(persisted, monkeypatch):
+    spilled = []
+
+    async def fake_spill(self, turn):
+        spilled.append(turn.thread_id)
+        return turn.thread_id != "no-redis"
+
+    monkeypatch.setattr(ChatTurnWriter, "_spill", fake_spill)
+    writer = ChatTurnWriter(max_queue=1)
+
+    # 未启动 (或队列已满) 时直接转投 Redis，Redis 不可用则同步写库
+    await writer.submit("to-redis", [], "a", tenant_id=1)
+    await writer.submit("no-redis", [], "a", tenant_id=1)
+
+    assert spilled == ["to-redis", "no-redis"]
+    assert persisted == ["no-redis"]
+    assert writer.stats()["persisted_inline"] == 1
+
+
+def test_restore_chat_turn_round_trip():
+    from langchain_core.messages import messages_to_dict
+
+    messages = [HumanMessage(content="q"), AIMessage(content="a")]
+    turn = restore_chat_turn("t", 3, messages_to_dict(messages), "a", {"summary": "s"}, "turn-1")
+
+    assert turn.tenant_id == 3
+    assert turn.turn_id == "turn-1"
+    assert turn.seed_state == {"summary": "s"}
+    assert [m.content for m in turn.messages] == ["q", "a"]
+    assert isinstance(turn.messages[1], AIMessage)
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_transient_db_errors_with_bounded_tries(monkeypatch):
+    errors = [OperationalError("INSERT", {}, ConnectionRefusedError())]
+
+    async def flaky_persist(turn):
+        raise errors[0]
+
+    monkeypatch.setattr(turn_writer, "persist_chat_turn", flaky_persist)
+    args = ("t1", 1, [], "answer", None, "turn-1")
+
+    with pytest.raises(Retry) as retry:
+        await chat_tasks.persist_chat_turn({"job_id": "j", "job_try": 2}, *args)
+    assert retry.value.defer_score == 2 * chat_tasks.PERSIST_CHAT_TURN_RETRY_DELAY * 1000
+
+    # 最后一次尝试与非连接类错误都不再重试
+    last_try = {"job_id": "j", "job_try": chat_tasks.PERSIST_CHAT_TURN_MAX_TRIES}
+    with pytest.raises(OperationalError):
+        await chat_tasks.persist_chat_turn(last_try, *args)
+    errors[0] = IntegrityError("INSERT", {}, ValueError())
+    with pytest.raises(IntegrityError):
+        await chat_tasks.persist_chat_turn({"job_id": "j", "job_try": 1}, *args)
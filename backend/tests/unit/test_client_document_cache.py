@@ -0,0 +1,49 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+客户端文档缓存租户隔离单元测试
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.infra import cache as cache_module
+from app.core.infra.cache import InMemoryCache
+from app.core.infra.tenant import temporary_tenant_context
+from app.core.web.exceptions import NotFoundException
+from app.crud.document import crud_document
+from app.services import document_service as document_service_module
+from app.services.document_service import DocumentService
+
+
+@pytest.mark.asyncio
+async def test_cached_document_of_other_tenant_is_not_found(monkeypatch):
+    cache = InMemoryCache()
+    monkeypatch.setattr(cache_module, "_cache_instance", cache)
+    record_view = AsyncMock(return_value=8)
+    monkeypatch.setattr(crud_document, "record_view", record_view)
+    key = f"{document_service_module.DOCUMENT_CLIENT_CACHE_PREFIX}5"
+    await cache.set(key, {"id": 5, "site_id": 3, "tenant_id": 2, "title": "Doc"})
+    service = DocumentService(MagicMock(), MagicMock(), MagicMock())
+
+    # 缓存由租户 2 的请求写入，租户 1 读到同一键时不返回、也不记录浏览
+    with temporary_tenant_context(1), pytest.raises(NotFoundException):
+        await service.get_client_document(5)
+    record_view.assert_not_awaited()
+
+    with temporary_tenant_context(2):
+        doc = await service.get_client_document(5)
+    assert doc["title"] == "Doc" and doc["views"] == 8
@@ -0,0 +1,196 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+合集物化路径单元测试
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.infra.tenant import temporary_tenant_context
+from app.crud.collection import crud_collection
+from app.models.collection import Collection
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Collection.__table__.create(engine)
+    with temporary_tenant_context(None), Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _add(db, title: str, parent: Collection | None = None) -> Collection:
+    collection = Collection(
+        title=title, site_id=1, tenant_id=1, parent_id=parent.id if parent else None
+    )
+    db.add(collection)
+    db.flush()
+    return collection
+
+
+def _subtree(db, collection: Collection) -> list[int]:
+    query = crud_collection.subtree_ids_query(site_id=collection.site_id, path=collection.path)
+    return sorted(db.scalars(query).all())
+
+
+def _hierarchy(db, ids: list[int]) -> dict[int, dict]:
+    """与 get_hierarchy_map 相同的两步查询（同步会话）"""
+    targets = db.execute(crud_collection.hierarchy_targets_query(ids)).all()
+    query = crud_collection.ancestor_titles_query(targets)
+    titles = db.execute(query).all() if query is not None else []
+    return crud_collection._assemble_hierarchy(targets, titles)
+
+
+def _paths(db) -> dict[str, str]:
+    return dict(db.execute(select(Collection.title, Collection.path)).all())
+
+
+def test_path_is_maintained_on_insert_and_move(db):
+    guide = _add(db, "Guide")
+    install = _add(db, "Install", guide)
+    linux = _add(db, "Linux", install)
+    faq = _add(db, "FAQ")
+    assert linux.path == f"/{guide.id}/{install.id}/{linux.id}/"
+
+    # 移动子树：自身及后代的路径前缀整体替换
+    install.parent_id = faq.id
+    db.flush()
+    assert _paths(db) == {
+        "Guide": f"/{guide.id}/",
+        "Install": f"/{faq.id}/{install.id}/",
+        "Linux": f"/{faq.id}/{install.id}/{linux.id}/",
+        "FAQ": f"/{faq.id}/",
+    }
+
+    install.parent_id = None
+    db.flush()
+    assert _paths(db)["Linux"] == f"/{install.id}/{linux.id}/"
+
+
+def test_ancestor_and_subtree_lookups(db):
+    guide = _add(db, "Guide")
+    install = _add(db, "Install", guide)
+    linux = _add(db, "Linux", install)
+    _add(db, "FAQ")
+
+    assert _subtree(db, guide) == [guide.id, install.id, linux.id]
+    assert _subtree(db, install) == [install.id, linux.id]
+
+    hierarchy = _hierarchy(db, [linux.id])
+    assert hierarchy[linux.id]["ancestors"] == [
+        {"id": guide.id, "title": "Guide"},
+        {"id": install.id, "title": "Install"},
+    ]
+    assert hierarchy[linux.id]["path"] == "Guide > Install > Linux"
+
+
+def test_hierarchy_for_many_collections_is_two_queries(db, assert_max_queries):
+    roots = [_add(db, f"Root {i}") for i in range(10)]
+    leaves = [_add(db, f"Leaf {i}", _add(db, f"Mid {i}", root)) for i, root in enumerate(roots)]
+    ids = [c.id for c in roots + leaves] + [9999]
+
+    with assert_max_queries(2):
+        hierarchy = _hierarchy(db, ids)
+
+    assert len(hierarchy) == 20
+    assert hierarchy[roots[3].id] == {
+        "id": roots[3].id,
+        "title": "Root 3",
+        "parent_id": None,
+        "ancestors": [],
+        "path": "Root 3",
+    }
+    assert hierarchy[leaves[3].id]["path"] == "Root 3 > Mid 3 > Leaf 3"
+
+
+def test_moves_use_current_path_after_ancestor_moved(db):
+    guide = _add(db, "Guide")
+    install = _add(db, "Install", guide)
+    linux = _add(db, "Linux", install)
+    faq = _add(db, "FAQ")
+
+    install.parent_id = faq.id
+    db.flush()
+    # 已加载的后代随祖先移动同步路径，再次移动时以当前路径为前缀
+    assert linux.path == f"/{faq.id}/{install.id}/{linux.id}/"
+
+    linux.parent_id = guide.id
+    install.parent_id = guide.id
+    install.parent_id = None
+    db.flush()
+    assert _paths(db) == {
+        "Guide": f"/{guide.id}/",
+        "Install": f"/{install.id}/",
+        "Linux": f"/{guide.id}/{linux.id}/",
+        "FAQ": f"/{faq.id}/",
+    }
+
+
+def test_empty_path_never_matches_as_prefix(db):
+    guide = _add(db, "Guide")
+    install = _add(db, "Install", guide)
+    db.execute(Collection.__table__.update().where(Collection.id == guide.id).values(path=""))
+
+    db.expire(guide)
+
+    assert _subtree(db, guide) == []
+    # 祖先 ID 取自目标自身的路径，与祖先路径是否损坏无关
+    assert _hierarchy(db, [install.id])[install.id]["ancestors"] == [
+        {"id": guide.id, "title": "Guide"}
+    ]
+
+
+def test_path_lookups_use_indexes(db):
+    """前缀区间与主键 IN 查询都应走索引，不出现全表扫描"""
+    guide = _add(db, "Guide")
+    linux = _add(db, "Linux", _add(db, "Install", guide))
+    for i in range(50):
+        _add(db, f"Other {i}", _add(db, f"Root {i}"))
+    # 同一站点下 site_id 索引没有区分度，统计信息让规划器按选择性挑选索引
+    db.execute(text("ANALYZE"))
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        _subtree(db, guide)
+        _hierarchy(db, [linux.id])
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = [
+        " | ".join(
+            row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+        )
+        for sql, params in statements
+    ]
+    assert len(plans) == 3
+    assert "ix_collection_path (path>? AND path<?)" in plans[0], plans[0]
+    for plan in plans[1:]:
+        assert "SEARCH collection USING INTEGER PRIMARY KEY" in plan, plan
+
+
+def test_prefix_range_uses_pattern_ops_operators_on_postgres():
+    query = crud_collection.subtree_ids_query(site_id=1, path="/1/5/")
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "collection.path ~>=~ '/1/5/' AND collection.path ~<~ '/1/50'" in sql
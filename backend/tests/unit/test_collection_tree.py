@@ -0,0 +1,86 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+合集树组装与缓存单元测试
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.infra import cache as cache_module
+from app.core.infra.cache import InMemoryCache
+from app.crud import crud_collection, crud_document
+from app.services.collection_service import CollectionService
+
+
+def _collection(id, title, parent_id=None):
+    return SimpleNamespace(id=id, title=title, parent_id=parent_id)
+
+
+def _document(id, title, collection_id):
+    return SimpleNamespace(
+        id=id, title=title, status="published", views=3, tags=[], collection_id=collection_id
+    )
+
+
+@pytest.fixture
+def flat_rows(monkeypatch):
+    collections = AsyncMock(
+        return_value=[
+            _collection(1, "Guide"),
+            _collection(2, "FAQ"),
+            _collection(3, "Install", parent_id=1),
+            _collection(4, "Orphan", parent_id=99),
+        ]
+    )
+    documents = AsyncMock(return_value=[_document(10, "Linux", 3), _document(11, "Intro", 1)])
+    monkeypatch.setattr(crud_collection, "list_tree_nodes", collections)
+    monkeypatch.setattr(crud_document, "list_tree_nodes", documents)
+    monkeypatch.setattr(cache_module, "_cache_instance", InMemoryCache())
+    return collections, documents
+
+
+@pytest.mark.asyncio
+async def test_tree_is_assembled_from_flat_rows(flat_rows):
+    tree = await CollectionService(MagicMock()).get_collection_tree(site_id=1, show_type="all")
+
+    assert [node.title for node in tree] == ["Guide", "FAQ"]
+    guide = tree[0]
+    assert [(c.title, c.type) for c in guide.children] == [
+        ("Install", "collection"),
+        ("Intro", "document"),
+    ]
+    assert [c.title for c in guide.children[0].children] == ["Linux"]
+    assert tree[1].children is None
+
+
+@pytest.mark.asyncio
+async def test_tree_is_cached_per_site_until_invalidated(flat_rows):
+    collections, documents = flat_rows
+    service = CollectionService(MagicMock())
+
+    await service.get_collection_tree(site_id=1, show_type="collection")
+    await service.get_collection_tree(site_id=1, show_type="collection")
+    assert collections.await_count == 1
+    assert documents.await_count == 0
+
+    await service.get_collection_tree(site_id=1, show_type="all")
+    assert collections.await_count == 2 and documents.await_count == 1
+
+    await service._invalidate_collection_tree(1)
+    await service.get_collection_tree(site_id=1, show_type="collection")
+    assert collections.await_count == 3
@@ -0,0 +1,100 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+配置服务 AI 栈快照单元测试
+"""
+
+import pytest
+
+from app.core.infra.config_resolver import ConfigResolver
+from app.services.config.configuration_service import ConfigurationService
+
+
+@pytest.mark.asyncio
+async def test_ai_stack_snapshot_is_cached_and_versioned(monkeypatch):
+    calls = []
+    model = {"name": "model-a"}
+
+    async def fake_resolve_section(section, tenant_id=None):
+        calls.append(section)
+        return {
+            "model": model["name"],
+            "api_key": "sk-secret",
+            "_hash": f"{section}-{model['name']}",
+        }
+
+    monkeypatch.setattr(ConfigResolver, "resolve_section", fake_resolve_section)
+    service = ConfigurationService()
+    await service.clear_cache(tenant_id=9001)
+
+    first = await service.get_ai_stack(tenant_id=9001)
+    again = await service.get_ai_stack(tenant_id=9001)
+    assert first["version"] == again["version"]
+    assert len(calls) == 4
+    assert first["sections"]["chat"]["api_key"] != "sk-secret"
+
+    # 配置变更并失效缓存后，版本号随之变化
+    model["name"] = "model-b"
+    await service.clear_cache(tenant_id=9001)
+    changed = await service.get_ai_stack(tenant_id=9001)
+    assert changed["version"] != first["version"]
+    assert len(calls) == 8
+
+
+@pytest.mark.asyncio
+async def test_log_ai_stack_only_once_per_version(monkeypatch):
+    async def fake_resolve_section(section, tenant_id=None):
+        return {"model": "m", "_hash": section}
+
+    logged = []
+    monkeypatch.setattr(ConfigResolver, "resolve_section", fake_resolve_section)
+    monkeypatch.setattr(
+        ConfigResolver, "format_ai_stack", staticmethod(lambda *a, **k: logged.append(a) or "")
+    )
+    service = ConfigurationService()
+    await service.clear_cache(tenant_id=9002)
+
+    await service.log_ai_stack(tenant_id=9002)
+    await service.log_ai_stack(tenant_id=9002)
+    assert len(logged) == 1
+
+
+@pytest.mark.asyncio
+async def test_platform_change_invalidates_all_tenants_by_tag(monkeypatch):
+    from app.core.infra import cache as cache_module
+    from app.core.infra.cache import InMemoryCache
+
+    async def fake_resolve_section(section, tenant_id=None):
+        return {"model": "m", "_hash": f"{section}-{tenant_id}"}
+
+    cache = InMemoryCache()
+    monkeypatch.setattr(cache_module, "_cache_instance", cache)
+    monkeypatch.setattr(ConfigResolver, "resolve_section", fake_resolve_section)
+
+    async def no_scan(prefix):
+        raise AssertionError("prefix scan")
+
+    monkeypatch.setattr(cache, "delete_by_prefix", no_scan)
+    service = ConfigurationService()
+    await service.get_ai_stack(tenant_id=None)
+    await service.get_ai_stack(tenant_id=9003)
+    await cache.set("site:1", {"keep": True})
+    assert await cache.get("config:stack:tenant:9003") is not None
+
+    await service.clear_cache(tenant_id=None)
+
+    assert await cache.get("config:stack:tenant:9003") is None
+    assert await cache.get("config:chat:platform") is None
+    assert await cache.get("site:1") == {"keep": True}
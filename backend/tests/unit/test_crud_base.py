@@ -67,3 +67,45 @@ async def test_crud_base_create_with_model():
     assert result.name == "test_name"
     db.add.assert_called_once()
     db.flush.assert_called_once()
+
+
+class CachedModel(MockModel):
+    def to_dict(self):
+        return {"id": self.id, "name": self.name}
+
+
+@pytest.mark.asyncio
+async def test_cached_get_many_batches_cache_and_db(monkeypatch):
+    from app.core.infra import cache as cache_module
+    from app.core.infra.cache import InMemoryCache
+
+    cache = InMemoryCache()
+    monkeypatch.setattr(cache_module, "_cache_instance", cache)
+    await cache.set("mock:id:1", {"id": 1, "name": "cached"})
+
+    queried = []
+
+    async def fake_get_multi(self, db, *, ids):
+        queried.append(ids)
+        return [CachedModel(id=i, name=f"db-{i}") for i in ids if i != 404]
+
+    monkeypatch.setattr(CRUDBase, "get_multi", fake_get_multi)
+    monkeypatch.setattr(
+        "sqlalchemy.orm.make_transient_to_detached", lambda instance: None, raising=True
+    )
+    crud = CRUDBase(CachedModel)
+    db = MagicMock()
+    db.merge = AsyncMock(side_effect=lambda instance, load: instance)
+
+    result = await crud._cached_get_many(db, [3, 1, 404, 2, 3], "mock:id:")
+
+    assert [(r.id, r.name) for r in result] == [(3, "db-3"), (1, "cached"), (2, "db-2")]
+    assert queried == [[3, 404, 2]]
+    assert await cache.get_many(["mock:id:2", "mock:id:3", "mock:id:404"]) == {
+        "mock:id:2": {"id": 2, "name": "db-2"},
+        "mock:id:3": {"id": 3, "name": "db-3"},
+    }
+
+    # 再次查询全部命中缓存，不再访问数据库
+    await crud._cached_get_many(db, [1, 2, 3], "mock:id:")
+    assert len(queried) == 1
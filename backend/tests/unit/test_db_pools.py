@@ -0,0 +1,69 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+连接池预算规划与统计单元测试
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.db import pools
+from app.db.pools import PoolSize, plan_pools
+
+
+def test_budget_is_split_across_pools():
+    shared = plan_pools(budget=30, share_vector_engine=True)
+    assert set(shared) == {"app", "checkpointer"}
+    assert shared["checkpointer"] == PoolSize(2, 4)
+    assert shared["app"] == PoolSize(8, 16)
+
+    dedicated = plan_pools(budget=30, share_vector_engine=False)
+    assert sum(size.capacity for size in dedicated.values()) == 30
+    assert dedicated["vector"].capacity == 6
+
+    legacy = plan_pools(budget=0, share_vector_engine=False)
+    assert legacy["app"] == legacy["vector"]
+    assert legacy["checkpointer"].capacity == 10
+
+
+@pytest.mark.asyncio
+async def test_pool_reports_usage_wait_and_timeouts(monkeypatch):
+    monkeypatch.setattr(pools, "_stats_sources", {})
+    monkeypatch.setattr(pools, "_wait_stats", {})
+    pool = pools.instrumented_pool_class("probe")(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.05
+    )
+    pools.register_engine_pool("probe", SimpleNamespace(pool=pool), PoolSize(1, 0))
+
+    conn = await greenlet_spawn(pool.connect)
+    probe = pools.pool_stats()["pools"]["probe"]
+    assert (probe["capacity"], probe["open"], probe["in_use"], probe["requests"]) == (1, 1, 1, 1)
+
+    # 连接池已满：第二次取连接等待超时
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    conn.close()
+
+    stats = pools.pool_stats()
+    probe = stats["pools"]["probe"]
+    assert probe["in_use"] == 0 and probe["waiting"] == 0
+    assert probe["requests"] == 2 and probe["timeouts"] == 1
+    assert probe["max_wait_ms"] >= 50
+    assert stats["primary_capacity"] == 1
+    pool.dispose()
@@ -0,0 +1,96 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+读写分离路由单元测试（两个内存 SQLite 分别充当主库与副本）
+"""
+
+import pytest
+from sqlalchemy import create_engine, select, update
+
+from app.core.infra.tenant import temporary_tenant_context
+from app.db.routing import RoutingSession, primary_reads, replica_monitor, replica_reads
+from app.models.site import Site
+
+
+@pytest.fixture
+def engines():
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        Site.__table__.create(engine)
+        with engine.begin() as conn:
+            conn.execute(Site.__table__.insert().values(name=name, slug="docs", tenant_id=1))
+    with temporary_tenant_context(None):
+        yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def _site_name(db) -> str:
+    return db.scalars(select(Site.name)).one()
+
+
+def test_reads_use_replica_only_inside_read_context(engines):
+    primary, replica = engines
+    with RoutingSession(primary, replica_bind=replica) as db:
+        assert _site_name(db) == "primary"
+
+    with replica_reads(), RoutingSession(primary, replica_bind=replica) as db:
+        assert _site_name(db) == "replica"
+        with primary_reads():
+            assert _site_name(db) == "primary"
+
+    with replica_reads(), RoutingSession(primary, replica_bind=None) as db:
+        assert _site_name(db) == "primary"
+
+
+def test_write_makes_request_sticky_to_primary(engines):
+    primary, replica = engines
+    with replica_reads() as state:
+        with RoutingSession(primary, replica_bind=replica) as db:
+            assert _site_name(db) == "replica"
+            db.execute(update(Site).values(name="renamed"))
+            assert state.sticky
+            assert _site_name(db) == "renamed"
+            db.commit()
+
+        # 同一请求内新开的会话同样回到主库
+        with RoutingSession(primary, replica_bind=replica) as db:
+            assert _site_name(db) == "renamed"
+
+    with replica_reads() as state, RoutingSession(primary, replica_bind=replica) as db:
+        db.add(Site(name="new", slug="new", tenant_id=1))
+        db.flush()
+        assert state.sticky
+        assert db.scalars(select(Site.slug).order_by(Site.slug)).all() == ["docs", "new"]
+
+
+def test_unhealthy_replica_falls_back_to_primary(engines, monkeypatch):
+    primary, replica = engines
+    monkeypatch.setattr(replica_monitor, "healthy", False)
+    with replica_reads(), RoutingSession(primary, replica_bind=replica) as db:
+        assert _site_name(db) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_cache_fills_read_primary_inside_replica_context(engines):
+    from app.core.infra.cache import InMemoryCache
+
+    primary, replica = engines
+    cache = InMemoryCache()
+    with replica_reads(), RoutingSession(primary, replica_bind=replica) as db:
+        assert _site_name(db) == "replica"
+        # 副本可能落后于刚提交的写入，回源结果会被缓存整个 TTL，因此必须读主库
+        assert await cache.get_or_set("site:name", lambda: _site_name(db)) == "primary"
+        assert _site_name(db) == "replica"
@@ -93,25 +93,39 @@ class TestCacheIsolation:
 class TestDatabaseInterceptors:
     """测试数据库拦截器逻辑 (app.db.events)"""
 
-    def test_tenant_filter_criteria(self):
-        from sqlalchemy import BinaryExpression
+    def test_tenant_filter_isolates_tenants_and_shares_compiled_sql(self):
+        from sqlalchemy import create_engine, event, select, update
+        from sqlalchemy.orm import Session
 
-        from app.db.events import _tenant_filter_criteria
+        from app.db.events import apply_tenant_filter
         from app.models.site import Site
 
-        # 1. 设置租户 1
-        set_current_tenant(1)
-        criterion = _tenant_filter_criteria(Site)
-        assert isinstance(criterion, BinaryExpression)
-        # 验证绑定了正确的租户 ID (内部比较逻辑)
-        assert criterion.right.value == 1
-
-        # 2. 未设置租户 (应该返回 true)
+        class TenantSession(Session):
+            pass
+
+        event.listen(TenantSession, "do_orm_execute", apply_tenant_filter)
+        engine = create_engine("sqlite://")
+        Site.__table__.create(engine)
+        with TenantSession(engine) as db:
+            db.add_all(Site(name=f"s{t}", slug=f"s{t}", tenant_id=t) for t in (1, 2, 3))
+            db.commit()
+
+        for tenant_id in (1, 2, 3):
+            set_current_tenant(tenant_id)
+            with TenantSession(engine) as db:
+                assert db.scalars(select(Site.slug)).all() == [f"s{tenant_id}"]
+                bumped = db.execute(
+                    update(Site).values(article_count=Site.article_count + 1).returning(Site.slug)
+                ).all()
+                assert bumped == [(f"s{tenant_id}",)]
+
+        # 租户 ID 作为绑定参数：三个租户共用 SELECT 与 UPDATE 两份编译结果
+        assert len(engine._compiled_cache) == 2
+
+        # 未设置租户（系统任务）时不附加过滤
         set_current_tenant(None)
-        criterion_none = _tenant_filter_criteria(Site)
-
-        # true() 在 SQLAlchemy 中通常是这种类型
-        assert not hasattr(criterion_none, "left")
+        with TenantSession(engine) as db:
+            assert len(db.scalars(select(Site)).all()) == 3
 
     def test_apply_tenant_on_insert(self):
         from app.db.events import apply_tenant_on_insert
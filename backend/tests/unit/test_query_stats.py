@@ -0,0 +1,95 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+查询统计与 N+1 检测单元测试
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import app.db  # noqa: F401  注册核心数据库事件
+from app.core.infra.tenant import temporary_tenant_context
+from app.db.query_stats import track_queries
+from app.models.site import Site
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Site.__table__.create(engine)
+    with temporary_tenant_context(None), Session(engine) as session:
+        session.add_all(Site(name=f"s{i}", slug=f"s{i}", tenant_id=1) for i in range(5))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_nested_tracking_counts_repeated_statements(db):
+    with track_queries() as outer:
+        db.scalars(select(Site)).all()
+        with track_queries() as inner:
+            for site_id in range(1, 6):
+                db.get(Site, site_id, populate_existing=True)
+
+    assert inner.count == 5
+    assert outer.count == 6
+    assert outer.seconds >= inner.seconds > 0
+    [(statement, times)] = inner.repeated(threshold=5)
+    assert times == 5 and statement.startswith("SELECT")
+    assert inner.repeated(threshold=6) == inner.repeated(threshold=0) == []
+
+
+def test_assert_max_queries_fails_on_regression(db, assert_max_queries):
+    with assert_max_queries(1):
+        db.scalars(select(Site)).all()
+
+    with pytest.raises(AssertionError, match="at most 1 queries, got 2"):
+        with assert_max_queries(1):
+            db.scalars(select(Site)).all()
+            db.scalars(select(Site.slug)).all()
+
+
+@pytest.mark.asyncio
+async def test_request_log_includes_queries_of_streamed_body(db, caplog):
+    pytest.importorskip("uvicorn")
+    import asyncio
+    import logging
+
+    from starlette.responses import StreamingResponse
+
+    from app.core.web.middleware import RequestLoggingMiddleware
+
+    async def endpoint(scope, receive, send):
+        async def body():
+            yield b"a"
+            db.scalars(select(Site)).all()
+            db.scalars(select(Site.slug)).all()
+            yield b"b"
+
+        await StreamingResponse(body())(scope, receive, send)
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/stream", "headers": []}
+    with caplog.at_level(logging.INFO, logger="app.core.web.middleware"):
+        await RequestLoggingMiddleware(endpoint)(scope, receive, send)
+
+    [line] = [r.getMessage() for r in caplog.records if "Completed" in r.getMessage()]
+    assert "Status: 200 - Queries: 2" in line
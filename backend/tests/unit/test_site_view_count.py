@@ -0,0 +1,135 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+站点浏览量计数单元测试
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from app.core.infra.tenant import temporary_tenant_context
+from app.crud.document_view_event import crud_document_view_event
+from app.models.site import Site
+from app.services.stats import site_view_counter
+from app.services.stats.site_view_counter import record_site_view
+
+
+@pytest.mark.asyncio
+async def test_view_event_defers_site_counter_until_commit():
+    db = MagicMock()
+    db.info = {}
+    db.execute, db.flush = AsyncMock(), AsyncMock()
+
+    await crud_document_view_event.create(db, document_id=5, site_id=7, tenant_id=1)
+
+    db.add.assert_called_once()
+    # 事务内不再更新 sites 热点行，提交后才累加到 Redis
+    db.execute.assert_not_awaited()
+    [(callback, args, _)] = db.info["after_commit"]
+    assert callback is record_site_view and args == (7,)
+
+
+@pytest.mark.asyncio
+async def test_flush_applies_batched_views_and_retries_failed_batch(monkeypatch):
+    import fakeredis
+
+    redis = fakeredis.FakeAsyncRedis()
+    applied = []
+
+    async def failing_apply(counts):
+        raise RuntimeError("db down")
+
+    async def fake_apply(counts):
+        applied.append(counts)
+
+    for site_id in (1, 1, 2):
+        await redis.hincrby(site_view_counter.PENDING_KEY, str(site_id), 1)
+
+    monkeypatch.setattr(site_view_counter, "apply_site_views", failing_apply)
+    with pytest.raises(RuntimeError):
+        await site_view_counter.flush_site_views(redis)
+
+    # 失败的批次加回待写入哈希，与期间新增的浏览一起在下次刷新时写回
+    await redis.hincrby(site_view_counter.PENDING_KEY, "2", 1)
+    monkeypatch.setattr(site_view_counter, "apply_site_views", fake_apply)
+    assert await site_view_counter.flush_site_views(redis) == 4
+    assert await site_view_counter.flush_site_views(redis) == 0
+    assert applied == [{1: 2, 2: 2}]
+    assert await redis.keys(f"{site_view_counter.FLUSHING_KEY_PREFIX}*") == []
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_flushes_apply_each_view_once(monkeypatch):
+    import fakeredis
+
+    redis = fakeredis.FakeAsyncRedis()
+    applied = []
+
+    async def slow_apply(counts):
+        # 写库期间让出事件循环：其他刷新与新的浏览在此交错
+        await asyncio.sleep(0.01)
+        applied.append(counts)
+
+    monkeypatch.setattr(site_view_counter, "apply_site_views", slow_apply)
+    for site_id in (1, 1, 2):
+        await redis.hincrby(site_view_counter.PENDING_KEY, str(site_id), 1)
+
+    async def late_view():
+        await asyncio.sleep(0.005)
+        await redis.hincrby(site_view_counter.PENDING_KEY, "3", 1)
+
+    flushed = await asyncio.gather(
+        site_view_counter.flush_site_views(redis),
+        site_view_counter.flush_site_views(redis),
+        late_view(),
+    )
+    flushed_again = await site_view_counter.flush_site_views(redis)
+
+    # 每次浏览恰好写入一次，不重复也不丢失
+    assert sum(flushed[:2]) + flushed_again == 4
+    totals: dict[int, int] = {}
+    for counts in applied:
+        for site_id, count in counts.items():
+            totals[site_id] = totals.get(site_id, 0) + count
+    assert totals == {1: 2, 2: 1, 3: 1}
+    assert await redis.keys(f"{site_view_counter.FLUSHING_KEY_PREFIX}*") == []
+    await redis.aclose()
+
+
+def test_batched_update_adds_per_site_counts():
+    engine = create_engine("sqlite://")
+    Site.__table__.create(engine)
+    with engine.begin() as conn:
+        for slug in ("a", "b", "c"):
+            conn.execute(Site.__table__.insert().values(name=slug, slug=slug, tenant_id=1))
+    with temporary_tenant_context(None), engine.begin() as conn:
+        conn.execute(site_view_counter.site_views_update({1: 5, 3: 2}))
+        counts = conn.execute(select(Site.id, Site.view_count).order_by(Site.id)).all()
+    assert [tuple(row) for row in counts] == [(1, 5), (2, 0), (3, 2)]
+    engine.dispose()
+
+
+def test_counter_defaults_to_zero():
+    engine = create_engine("sqlite://")
+    Site.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(Site.__table__.insert().values(name="Docs", slug="docs", tenant_id=1))
+    with temporary_tenant_context(None), engine.connect() as conn:
+        assert conn.scalar(select(Site.view_count)) == 0
+    engine.dispose()
@@ -0,0 +1,59 @@
+# Copyright 2026 CatWiki Authors
+#
+# Licensed under the CatWiki Open Source License (Modified Apache 2.0);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/CatWiki/CatWiki/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+客户端租户解析缓存单元测试
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.infra import cache as cache_module
+from app.core.infra.cache import InMemoryCache
+from app.crud.site import crud_site
+from app.crud.tenant import crud_tenant
+
+
+def _db_returning(value):
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_slug_and_site_mappings_are_cached_until_cleared(monkeypatch):
+    monkeypatch.setattr(cache_module, "_cache_instance", InMemoryCache())
+
+    db = _db_returning(3)
+    assert await crud_tenant.resolve_id_by_slug(db, slug="acme") == 3
+    assert await crud_tenant.resolve_id_by_slug(db, slug="acme") == 3
+    assert await crud_site.resolve_tenant_id(db, site_id=9) == 3
+    assert await crud_site.resolve_tenant_id(db, site_id=9) == 3
+    assert db.execute.await_count == 2
+
+    # 租户改 slug / 站点变更后映射失效，重新回源
+    await crud_tenant._clear_cache(3, "acme", "acme-new")
+    await crud_site._clear_cache(9, "docs")
+    assert await crud_tenant.resolve_id_by_slug(db, slug="acme") == 3
+    assert await crud_site.resolve_tenant_id(db, site_id=9) == 3
+    assert db.execute.await_count == 4
+
+    # 不存在的 slug 不缓存
+    missing = _db_returning(None)
+    assert await crud_tenant.resolve_id_by_slug(missing, slug="nope") is None
+    assert await crud_tenant.resolve_id_by_slug(missing, slug="nope") is None
+    assert missing.execute.await_count == 2